@@ -0,0 +1,46 @@
+import argparse
+import numpy as np
+from utils.telemetry import read_telemetry
+
+PERCENTILES = [50, 90, 99]
+
+def print_summary(columns):
+    """Print percentiles and maxima of every column"""
+    frames = len(columns["frame"])
+    duration = columns["frame_ms"].sum() / 1000
+    print(f"{frames} frames over {duration:.1f}s, "
+          f"{columns['gc_collections'].sum()} garbage collections taking {columns['gc_ms'].sum():.1f} ms")
+    print(f"{'column':<22}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'max':>10}")
+    for name, values in columns.items():
+        if name in ("frame", "game_time"):
+            continue
+        stats = np.percentile(values, PERCENTILES).tolist() + [values.max()]
+        print(f"{name:<22}" + "".join(f"{value:>10.2f}" for value in stats))
+
+def print_spikes(columns, factor, top):
+    """Print the slowest frames over factor times the median, with what they spent time on"""
+    frame_ms = columns["frame_ms"]
+    threshold = np.median(frame_ms) * factor
+    spikes = np.flatnonzero(frame_ms > threshold)
+    print(f"\n{len(spikes)} spike frames over {threshold:.2f} ms ({factor}x median)")
+    sections = [name for name in columns if name.endswith("_ms") and name not in ("frame_ms", "update_ms", "gc_ms")]
+    for index in spikes[np.argsort(frame_ms[spikes])[::-1][:top]]:
+        costly = sorted(sections, key=lambda name: columns[name][index], reverse=True)[:3]
+        breakdown = ", ".join(f"{name[:-3]} {columns[name][index]:.2f}" for name in costly)
+        print(f"  frame {columns['frame'][index]} at {columns['game_time'][index]:.1f}s: "
+              f"{frame_ms[index]:.2f} ms (update {columns['update_ms'][index]:.2f}: {breakdown}; "
+              f"gc {columns['gc_ms'][index]:.2f}; enemies {columns['enemies'][index]})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a telemetry file recorded with telemetry-file")
+    parser.add_argument("path", help="Telemetry file to read")
+    parser.add_argument("--spike-factor", type=float, default=2.0, help="Frames this many times the median frame time are spikes")
+    parser.add_argument("--top", type=int, default=10, help="Number of spike frames to list")
+    args = parser.parse_args()
+
+    columns = read_telemetry(args.path)
+    if len(columns["frame"]) == 0:
+        print("No frames recorded")
+    else:
+        print_summary(columns)
+        print_spikes(columns, args.spike_factor, args.top)
\ No newline at end of file
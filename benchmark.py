@@ -0,0 +1,189 @@
+import gc
+import sys
+import json
+import time
+import argparse
+import subprocess
+from panda3d.core import loadPrcFileData
+
+# Each mode runs in its own process since threading-model is fixed once the window opens
+MODES = {
+    "serial": "frame-pipeline 0",
+    "pipelined": "frame-pipeline 1",
+}
+
+def pipeline_stages(threading_model):
+    """Count the extra frames the render pipeline holds a frame for, from threading-model"""
+    cull, _, draw = threading_model.partition('/')
+    return int(bool(cull)) + int(bool(draw) and draw != cull)
+
+def setup_game(mode, offscreen, gc_auto=False):
+    """Start the game in the given mode, unpaused"""
+    loadPrcFileData('', MODES[mode])
+    if gc_auto:
+        loadPrcFileData('', 'gc-safe-points 0')
+    loadPrcFileData('', 'audio-library-name null')
+    if offscreen:
+        loadPrcFileData('', 'window-type offscreen\nwin-size 1280 720')
+    import core.config
+    from core.game import Game
+
+    game = Game()
+    game.toggle_pause()
+    # Keep a steady scene: no boss, and enemies that touch the player die instead
+    game.world.boss_system.boss_spawn_time = float('inf')
+    return game
+
+def run_frames(game, frames):
+    """Step the game, returning each frame's wall time in seconds"""
+    player = game.world.player_system.player
+    times = []
+    for _ in range(frames):
+        player.is_invincible = True
+        start = time.perf_counter()
+        game.taskMgr.step()
+        times.append(time.perf_counter() - start)
+    return times
+
+def measure_reaction(game, probes=10):
+    """Count the frames between moving the player and an enemy turning toward it"""
+    from entities.enemy.enemy import Enemy
+    enemy_system = game.world.enemy_system
+    player = game.world.player_system.player
+    lags = []
+    for probe in range(probes):
+        side = 1 if probe % 2 else -1
+        # Start near enough that the enemy's AI runs every frame
+        player.update_position(side * 0.4 - player.pos[0], 0.3 - player.pos[1])
+        enemy = enemy_system.add_enemy(Enemy, (0.0, 0.5), 0.12)
+        run_frames(game, 3)
+
+        # Input: the player jumps to the other side of the enemy
+        player.update_position(-side * 0.8, 0)
+        before = enemy.get_position()[0]
+        for frame in range(1, 10):
+            run_frames(game, 1)
+            if not enemy.sprite:
+                break
+            x = enemy.get_position()[0]
+            if (x - before) * -side > 0:
+                lags.append(frame - 1)
+                break
+            before = x
+        enemy_system.destroy_enemy(enemy)
+    return sum(lags) / len(lags) if lags else float('nan')
+
+def count_allocations(game, frames):
+    """Count the memory blocks frames leave allocated, on average, after a full collection
+
+    Temporaries freed within a frame don't count; anything a frame keeps,
+    including cycles only the collector would free, does.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    gc.collect()
+    before = sys.getallocatedblocks()
+    run_frames(game, frames)
+    gc.collect()
+    allocations = (sys.getallocatedblocks() - before) / frames
+    if enabled:
+        gc.enable()
+    return allocations
+
+def measure_paused_cpu(game, seconds):
+    """Get the CPU seconds used per second while paused, at full speed and in idle mode"""
+    game.toggle_pause()
+    usage = []
+    for idle in (False, True):
+        game.idle_mode.enabled = idle
+        # Let idle mode settle in after its delay before measuring
+        while idle and not game.idle_mode.idle:
+            game.taskMgr.step()
+        cpu, wall = time.process_time(), time.perf_counter()
+        while time.perf_counter() - wall < seconds:
+            game.taskMgr.step()
+        usage.append((time.process_time() - cpu) / (time.perf_counter() - wall))
+    return usage
+
+def run_child(args):
+    """Benchmark one mode and print its results as JSON"""
+    game = setup_game(args.mode, args.offscreen, args.gc_auto)
+    from panda3d.core import ConfigVariableString
+    game.world.enemy_system.enemy_limit = args.enemies
+    run_frames(game, args.warmup)
+
+    collections = game.gc_manager.get_stats()
+    times = sorted(run_frames(game, args.frames))
+    after = game.gc_manager.get_stats()
+    mean = sum(times) / len(times)
+    median = times[len(times) // 2]
+    allocations = count_allocations(game, args.frames)
+    reaction_frames = measure_reaction(game)
+    paused_cpu, idle_cpu = measure_paused_cpu(game, args.idle_seconds)
+    render_frames = pipeline_stages(ConfigVariableString("threading-model", "").getValue())
+    print(json.dumps({
+        "mode": args.mode,
+        "frame_ms": mean * 1000,
+        "p50_ms": median * 1000,
+        "p95_ms": times[int(len(times) * 0.95)] * 1000,
+        "fps": 1 / mean,
+        "sim_lag_frames": reaction_frames,
+        "render_lag_frames": render_frames,
+        # Estimated, not measured: the lag frames from input read to the frame
+        # showing its effect being drawn, each taken to last the median frame time
+        "input_latency_estimate_ms": (1 + reaction_frames + render_frames) * median * 1000,
+        # Collections during the timed frames, and their longest pause
+        "gc_collections": after["collections"] - collections["collections"],
+        "gc_max_ms": after["max_ms"] if after["collections"] > collections["collections"] else 0.0,
+        "allocations_per_frame": allocations,
+        # CPU use on the pause screen, across every thread of the process
+        "paused_cpu": paused_cpu,
+        "idle_cpu": idle_cpu,
+    }))
+
+def run_all(args):
+    """Benchmark every mode in a child process and print a comparison"""
+    results = []
+    for mode in MODES:
+        command = [sys.executable, __file__, "--child", "--mode", mode,
+                   "--frames", str(args.frames), "--warmup", str(args.warmup),
+                   "--enemies", str(args.enemies), "--idle-seconds", str(args.idle_seconds)]
+        if args.offscreen:
+            command.append("--offscreen")
+        if args.gc_auto:
+            command.append("--gc-auto")
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<10} {'frame ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'fps':>7} {'sim lag':>8} {'draw lag':>9} {'est latency ms':>15}"
+          f" {'gc':>4} {'gc max ms':>10} {'blocks/frame':>13} {'paused cpu':>11} {'idle cpu':>9}")
+    for result in results:
+        print(f"{result['mode']:<10} {result['frame_ms']:>9.2f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['fps']:>7.1f} "
+              f"{result['sim_lag_frames']:>8.1f} {result['render_lag_frames']:>9d} {result['input_latency_estimate_ms']:>15.2f}"
+              f" {result['gc_collections']:>4d} {result['gc_max_ms']:>10.2f} {result['allocations_per_frame']:>13.2f}"
+              f" {result['paused_cpu']:>10.0%} {result['idle_cpu']:>9.0%}")
+
+    # Steady-state frames should leave next to nothing allocated
+    over = [result["mode"] for result in results if result["allocations_per_frame"] > args.max_allocations]
+    if over:
+        print(f"Over {args.max_allocations} retained blocks per frame: {', '.join(over)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare frame time, estimated input latency, garbage collection and idle CPU use of the serial and pipelined frame modes")
+    parser.add_argument("--frames", type=int, default=600, help="Frames to time in each mode")
+    parser.add_argument("--warmup", type=int, default=120, help="Frames to run before timing")
+    parser.add_argument("--enemies", type=int, default=300, help="Enemy count to hold during the run")
+    parser.add_argument("--offscreen", action="store_true", help="Render to an offscreen buffer instead of a window")
+    parser.add_argument("--idle-seconds", type=float, default=3.0, help="Seconds to measure paused CPU use for, with and without idle mode")
+    parser.add_argument("--gc-auto", action="store_true", help="Leave garbage collection automatic instead of at safe points")
+    parser.add_argument("--max-allocations", type=float, default=2.0,
+                        help="Fail if frames leave more memory blocks allocated than this on average")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+    else:
+        run_all(args)
\ No newline at end of file
@@ -0,0 +1,185 @@
+import os
+import json
+import hashlib
+import inspect
+import argparse
+from panda3d.core import PNMImage, Texture, SamplerState
+import effects.texture_factory as texture_factory
+import effects.atlas as atlas
+from utils.resource_loader import COOKED_DIR, MANIFEST_NAME
+
+# Bump when the cooked output format changes so every asset is rebuilt
+COOK_VERSION = 2
+
+# Source images shipped in images/ that are loaded as standalone textures;
+# sprite images are packed into the atlas instead
+SOURCE_IMAGES = ["map.png", "town.png"]
+
+def hash_bytes(*parts):
+    """Hash the given byte strings into a hex digest"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+def load_manifest(output_dir):
+    """Load the manifest of previously cooked assets"""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r') as f:
+        return json.load(f).get("assets", {})
+
+def save_manifest(output_dir, assets):
+    """Write the cooked asset manifest"""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path, 'w') as f:
+        json.dump({"version": COOK_VERSION, "assets": assets}, f, indent=2, sort_keys=True)
+
+def cook_image(image, output_path, options):
+    """Convert an image into a precooked .txo texture"""
+    if options.premultiply:
+        image.premultiplyAlpha()
+
+    texture = Texture()
+    texture.load(image)
+    texture.setWrapU(SamplerState.WM_clamp)
+    texture.setWrapV(SamplerState.WM_clamp)
+
+    if options.mipmaps:
+        texture.setMinfilter(SamplerState.FT_linear_mipmap_linear)
+        texture.generateRamMipmapImages()
+
+    compressed = False
+    if options.compress:
+        compressed = texture.compressRamImage(Texture.CM_dxt5)
+        if compressed:
+            texture.setCompression(Texture.CM_dxt5)
+        else:
+            print(f"  Compression unavailable, writing {output_path} uncompressed")
+
+    if not texture.write(output_path):
+        raise IOError(f"Failed to write {output_path}")
+    return compressed
+
+def cook_atlas(source_dir, output_dir, options, settings, old_entry):
+    """Pack and cook the sprite atlas pages and UV manifest if any input changed"""
+    atlas_settings = json.dumps({
+        "page_size": options.page_size,
+        "padding": options.padding,
+        "max_sprite_size": options.max_sprite_size,
+    }, sort_keys=True).encode()
+
+    # Any sprite image, generator or packer change repacks the whole atlas
+    parts = [settings, atlas_settings, inspect.getsource(texture_factory).encode(),
+             inspect.getsource(atlas).encode()]
+    image_names = [source if isinstance(source, str) else source[0] for source in atlas.ATLAS_IMAGES.values()]
+    for name in sorted(image_names):
+        source_path = os.path.join(source_dir, name)
+        if os.path.exists(source_path):
+            with open(source_path, 'rb') as f:
+                parts.append(name.encode() + f.read())
+    source_hash = hash_bytes(*parts)
+
+    manifest_path = os.path.join(output_dir, atlas.ATLAS_MANIFEST)
+    if (not options.force and old_entry and old_entry.get("hash") == source_hash
+            and os.path.exists(manifest_path)
+            and all(os.path.exists(os.path.join(output_dir, page)) for page in old_entry["pages"])):
+        return old_entry, False
+
+    images, frames = atlas.collect_atlas_images(lambda name: os.path.join(source_dir, name))
+    pages, regions = atlas.pack_atlas(images, options.page_size, options.padding, options.max_sprite_size)
+
+    page_names = []
+    compressed = False
+    for index, page in enumerate(pages):
+        page_name = f"atlas_{index}.txo"
+        print(f"Cooking atlas page {index} ({page.getXSize()}x{page.getYSize()}) -> {page_name}")
+        compressed = cook_image(page, os.path.join(output_dir, page_name), options)
+        page_names.append(page_name)
+
+    with open(manifest_path, 'w') as f:
+        json.dump({
+            "pages": page_names,
+            "regions": regions,
+            "frames": frames,
+            "premultiplied": options.premultiply,
+        }, f, indent=2, sort_keys=True)
+    print(f"Packed {len(regions)} sprites into {len(pages)} atlas pages")
+
+    return {
+        "source": "atlas",
+        "hash": source_hash,
+        "output": atlas.ATLAS_MANIFEST,
+        "pages": page_names,
+        "mipmaps": options.mipmaps,
+        "compressed": compressed,
+        "premultiplied": options.premultiply,
+    }, True
+
+def cook_assets(source_dir, output_dir, options):
+    """Cook every standalone texture and the sprite atlas whose hash changed"""
+    os.makedirs(output_dir, exist_ok=True)
+    old_assets = load_manifest(output_dir)
+    assets = {}
+    settings = json.dumps({
+        "version": COOK_VERSION,
+        "mipmaps": options.mipmaps,
+        "compress": options.compress,
+        "premultiply": options.premultiply,
+    }, sort_keys=True).encode()
+
+    jobs = []
+    for name in SOURCE_IMAGES:
+        source_path = os.path.join(source_dir, name)
+        if not os.path.exists(source_path):
+            print(f"Skipping missing source image: {source_path}")
+            continue
+        with open(source_path, 'rb') as f:
+            source_hash = hash_bytes(f.read(), settings)
+        jobs.append((name, source_path, source_hash, lambda path=source_path: PNMImage(path)))
+
+    cooked = 0
+    for name, source, source_hash, build_image in jobs:
+        output_name = os.path.splitext(name)[0] + ".txo"
+        output_path = os.path.join(output_dir, output_name)
+        previous = old_assets.get(name)
+
+        if (not options.force and previous and previous.get("hash") == source_hash
+                and os.path.exists(output_path)):
+            assets[name] = previous
+            continue
+
+        print(f"Cooking {name} -> {output_path}")
+        compressed = cook_image(build_image(), output_path, options)
+        assets[name] = {
+            "source": source,
+            "hash": source_hash,
+            "output": output_name,
+            "mipmaps": options.mipmaps,
+            "compressed": compressed,
+            "premultiplied": options.premultiply,
+        }
+        cooked += 1
+
+    assets["atlas"], atlas_cooked = cook_atlas(source_dir, output_dir, options, settings, old_assets.get("atlas"))
+    cooked += atlas_cooked
+
+    save_manifest(output_dir, assets)
+    return cooked, len(jobs) + 1 - cooked
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bake game textures into precooked .txo files")
+    parser.add_argument("--source", default="images", help="Directory containing source images")
+    parser.add_argument("--output", default=COOKED_DIR, help="Directory to write cooked assets to")
+    parser.add_argument("--no-mipmaps", dest="mipmaps", action="store_false", help="Skip mipmap generation")
+    parser.add_argument("--compress", action="store_true", help="Store textures DXT5-compressed")
+    parser.add_argument("--premultiply", action="store_true", help="Premultiply color by alpha")
+    parser.add_argument("--page-size", type=int, default=2048, help="Atlas page width and maximum height")
+    parser.add_argument("--padding", type=int, default=8, help="Edge-extruded border around each atlas sprite")
+    parser.add_argument("--max-sprite-size", type=int, default=512, help="Downscale atlas sprites larger than this")
+    parser.add_argument("--force", action="store_true", help="Rebuild every asset regardless of hashes")
+    options = parser.parse_args()
+
+    cooked, skipped = cook_assets(options.source, options.output, options)
+    print(f"Cooked {cooked} assets, {skipped} up to date")
\ No newline at end of file
@@ -1,4 +1,5 @@
-from panda3d.core import loadPrcFileData
+from panda3d.core import (loadPrcFileData, ConfigVariableString, ConfigVariableInt, ConfigVariableBool,
+                          ConfigVariableDouble)
 
 
 
@@ -12,6 +13,56 @@ win-size 1920 1080
 window-title Castle Bullet
 ''')
 
+# Straight-line bullets: "cpu" steps them in Python every frame, "gpu" keeps
+# them as spawn state and moves them in a vertex shader
+bullet_mode = ConfigVariableString("bullet-mode", "cpu", "How straight-line bullets are simulated: cpu or gpu")
+
+# Near, on-screen enemies think every frame; the rest share this many AI
+# updates per frame and catch up on the time they missed
+enemy_ai_budget = ConfigVariableInt("enemy-ai-budget", 48, "Off-screen or distant enemies whose AI may run in one frame")
+
+# Pipelined frames: Panda3D culls and draws on its own threads while a worker
+# thread computes the next simulation tick. Must be set before the window opens.
+frame_pipeline = ConfigVariableBool("frame-pipeline", False, "Overlap simulation, cull and draw across threads")
+if frame_pipeline.getValue():
+    loadPrcFileData('', 'threading-model Cull/Draw')
+
+# Sample nodes, textures, tasks, event hooks and Python objects at every
+# restart and area transition, logging anything that keeps growing
+leak_audit = ConfigVariableBool("leak-audit", False, "Audit resource counts at restarts and transitions")
+
+# Estimated GPU + RAM memory for textures before unused ones are evicted
+texture_budget_mb = ConfigVariableInt("texture-budget-mb", 256, "Texture memory budget in megabytes")
+
+# Per-frame metrics recorded to a columnar binary file; read it back with
+# analyze_telemetry.py. Empty disables recording.
+telemetry_file = ConfigVariableString("telemetry-file", "", "File to record per-frame telemetry to")
+
+# Span tracing: F9 dumps the last trace-seconds as Chrome trace JSON, and so
+# does any frame slower than trace-slow-frame-ms (0 turns that off)
+trace = ConfigVariableBool("trace", False, "Record timing spans for Chrome trace dumps")
+trace_seconds = ConfigVariableDouble("trace-seconds", 5.0, "Seconds of spans kept for a trace dump")
+trace_slow_frame_ms = ConfigVariableDouble("trace-slow-frame-ms", 50.0, "Dump a trace after frames slower than this")
+
+# Prometheus text metrics at http://127.0.0.1:<port>/metrics; 0 disables the server
+metrics_port = ConfigVariableInt("metrics-port", 0, "Localhost port to serve Prometheus metrics on")
+
+# Objects alive after loading are frozen out of garbage collection. With
+# gc-safe-points, automatic collection is off during play and runs when play
+# stops (pause, game over, area transitions), unless gc-young-limit new
+# objects pile up first.
+gc_safe_points = ConfigVariableBool("gc-safe-points", True, "Only collect garbage at safe points while playing")
+gc_young_limit = ConfigVariableInt("gc-young-limit", 10000, "Young objects that force a collection during play")
+
+# While paused, on the game over screen or left alone in town, the simulation
+# is suspended and frames are capped at this rate; 0 keeps full speed
+idle_frame_rate = ConfigVariableDouble("idle-frame-rate", 10.0, "Frame rate cap while idle")
+
+# Offscreen frame capture to NumPy arrays: the buffer's width and height, and
+# how many simulation steps apart frames are captured (0 captures on request only)
+capture_size = ConfigVariableInt("capture-size", "320 180", "Width and height of captured frames")
+capture_stride = ConfigVariableInt("capture-stride", 0, "Steps between captured frames, 0 for on request only")
+
 
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
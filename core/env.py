@@ -0,0 +1,226 @@
+import numpy as np
+from panda3d.core import InputDevice
+from core.world import World
+
+# Gymnasium is optional; without it the environments keep the same API but
+# have no action or observation spaces
+try:
+    import gymnasium
+except ImportError:
+    gymnasium = None
+
+# An action is (move_x, move_y, aim_x, aim_y, dash): both sticks in [-1, 1],
+# and a dash along the movement stick whenever dash is above 0.5
+ACTION_SIZE = 5
+
+# Observation rows, relative to the player and closest first; absent rows are zeros
+PLAYER_FEATURES = 5  # x, y, dash ready, dashing, invincible
+BOSS_FEATURES = 3    # dx, dy, present
+ENEMY_FEATURES = 3   # dx, dy, present
+BULLET_FEATURES = 5  # dx, dy, vx, vy, present
+ORB_FEATURES = 3     # dx, dy, present; one row each for the green and blue orb
+
+# Default numbers of the closest enemies and boss bullets observed
+NEAREST_ENEMIES = 8
+NEAREST_BULLETS = 8
+
+def observation_size(nearest_enemies, nearest_bullets):
+    """Get the length of an observation holding the given numbers of enemies and bullets"""
+    return (PLAYER_FEATURES + BOSS_FEATURES + nearest_enemies * ENEMY_FEATURES +
+            nearest_bullets * BULLET_FEATURES + 2 * ORB_FEATURES)
+
+def write_nearest(rows, offsets, velocities=None):
+    """Fill rows with the offsets closest to the origin, closest first, flagging each present"""
+    rows[:] = 0
+    if len(offsets) == 0:
+        return
+    distances = np.einsum("ij,ij->i", offsets, offsets)
+    count = min(len(rows), len(offsets))
+    nearest = np.argpartition(distances, count - 1)[:count] if count < len(offsets) else np.arange(count)
+    nearest = nearest[np.argsort(distances[nearest])]
+    rows[:count, 0:2] = offsets[nearest]
+    if velocities is not None:
+        rows[:count, 2:4] = velocities[nearest]
+    rows[:count, -1] = 1
+
+class VirtualControl:
+    """One stick axis or button of a virtual gamepad"""
+
+    def __init__(self):
+        self.value = 0.0
+        self.pressed = False
+
+class VirtualGamepad:
+    """Stands in for a gamepad so actions reach the player through its usual input path"""
+
+    def __init__(self):
+        self.axes = {axis: VirtualControl() for axis in (InputDevice.Axis.left_x, InputDevice.Axis.left_y,
+                                                         InputDevice.Axis.right_x, InputDevice.Axis.right_y)}
+        self.button = VirtualControl()  # Every button stays released
+
+    def findAxis(self, axis):
+        return self.axes[axis]
+
+    def findButton(self, name):
+        return self.button
+
+    def set_sticks(self, move_x, move_y, aim_x, aim_y):
+        """Hold both sticks at the given positions"""
+        self.axes[InputDevice.Axis.left_x].value = move_x
+        self.axes[InputDevice.Axis.left_y].value = move_y
+        self.axes[InputDevice.Axis.right_x].value = aim_x
+        self.axes[InputDevice.Axis.right_y].value = aim_y
+
+class GameEnv(gymnasium.Env if gymnasium else object):
+    """Gymnasium-style environment over a headless world
+
+    Each step holds the action's sticks on a virtual gamepad for frame_skip
+    steps of dt seconds. Rewards are the points scored, a little for
+    surviving and a penalty for dying. An episode ends when the player dies
+    or the boss is killed, or is truncated after max_steps.
+    """
+
+    metadata = {"render_modes": ["rgb_array"]}
+
+    def __init__(self, seed=None, dt=1 / 60, frame_skip=1, max_steps=3600,
+                 nearest_enemies=NEAREST_ENEMIES, nearest_bullets=NEAREST_BULLETS, world=None,
+                 render_mode=None, render_size=None):
+        self.world = world or World(seed=seed)
+        # Pixel frames are rendered offscreen on request, sized by render_size or capture-size
+        self.render_mode = render_mode
+        if render_mode == "rgb_array":
+            self.world.enable_capture(render_size, stride=0)
+        self.gamepad = VirtualGamepad()
+        self.world.gamepad = self.gamepad
+        self.dt = dt
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.nearest_enemies = nearest_enemies
+        self.nearest_bullets = nearest_bullets
+        self.observation_size = observation_size(nearest_enemies, nearest_bullets)
+
+        # Reward shaping
+        self.survival_reward = 0.001  # Per step alive
+        self.death_penalty = 1.0
+
+        # Observation sections as (start, end) offsets
+        boss_end = PLAYER_FEATURES + BOSS_FEATURES
+        enemies_end = boss_end + nearest_enemies * ENEMY_FEATURES
+        bullets_end = enemies_end + nearest_bullets * BULLET_FEATURES
+        self.sections = {
+            "boss": (PLAYER_FEATURES, boss_end),
+            "enemies": (boss_end, enemies_end),
+            "bullets": (enemies_end, bullets_end),
+            "green_orb": (bullets_end, bullets_end + ORB_FEATURES),
+            "blue_orb": (bullets_end + ORB_FEATURES, self.observation_size),
+        }
+
+        if gymnasium:
+            self.action_space = gymnasium.spaces.Box(-1.0, 1.0, (ACTION_SIZE,), np.float32)
+            self.observation_space = gymnasium.spaces.Box(-np.inf, np.inf, (self.observation_size,), np.float32)
+
+        self.steps = 0
+        self.last_score = 0
+
+    def reset(self, seed=None, options=None):
+        """Start a new episode, returning its first observation and info"""
+        self.world.restart(seed)
+        self.gamepad.set_sticks(0.0, 0.0, 0.0, 0.0)
+        self.steps = 0
+        self.last_score = 0
+        return self.observe(), self.get_info()
+
+    def step(self, action):
+        """Apply an action and advance, returning observation, reward, terminated, truncated and info"""
+        self.apply_action(action)
+        for _ in range(self.frame_skip):
+            self.world.step(self.dt)
+            if self.is_done():
+                break
+        return self.collect()
+
+    def is_done(self):
+        """Check whether the episode has ended, after which its world isn't stepped again"""
+        return self.world.game_over or bool(self.world.boss_system.boss_death_sequence)
+
+    def apply_action(self, action):
+        """Hold the action's sticks and start its dash"""
+        move_x, move_y, aim_x, aim_y, dash = np.clip(action, -1.0, 1.0).tolist()
+        self.gamepad.set_sticks(move_x, move_y, aim_x, aim_y)
+        world = self.world
+        if dash > 0.5 and not world.paused and not world.game_over:
+            world.player_system.perform_dash(move_x, move_y)
+
+    def collect(self, out=None):
+        """Score the steps since the last action, returning the step results"""
+        world = self.world
+        self.steps += 1
+        won = world.boss_system.boss_death_sequence or world.in_town
+        terminated = world.game_over or won
+        truncated = not terminated and self.steps >= self.max_steps
+
+        reward = world.score - self.last_score + self.survival_reward
+        if world.game_over:
+            reward -= self.death_penalty
+        self.last_score = world.score
+        return self.observe(out), reward, terminated, truncated, self.get_info()
+
+    def get_info(self):
+        """Get the episode's progress"""
+        world = self.world
+        return {
+            "score": world.score,
+            "game_time": world.actual_game_time,
+            "won": bool(world.boss_system.boss_death_sequence or world.in_town),
+        }
+
+    def observe(self, out=None):
+        """Write the observation into out, or a new array, and return it"""
+        if out is None:
+            out = np.empty(self.observation_size, dtype=np.float32)
+        world = self.world
+        player_system = world.player_system
+        player = player_system.player
+        player_pos = np.array(player.pos, dtype=np.float64)
+        out[:PLAYER_FEATURES] = (player.pos[0], player.pos[1], player_system.can_dash(),
+                                 player.is_dashing, player.is_invincible)
+
+        start, end = self.sections["boss"]
+        boss = world.boss_system.boss
+        if boss:
+            boss_x, boss_y = boss.get_position()
+            out[start:end] = (boss_x - player_pos[0], boss_y - player_pos[1], 1)
+        else:
+            out[start:end] = 0
+
+        start, end = self.sections["enemies"]
+        enemies = world.enemy_system
+        write_nearest(out[start:end].reshape(self.nearest_enemies, ENEMY_FEATURES),
+                      enemies.positions[:len(enemies.enemies)] - player_pos)
+
+        start, end = self.sections["bullets"]
+        positions, velocities = world.boss_system.get_projectile_states()
+        write_nearest(out[start:end].reshape(self.nearest_bullets, BULLET_FEATURES),
+                      positions - player_pos, velocities)
+
+        orbs = world.orb_system
+        for name, orb in (("green_orb", orbs.green_orb), ("blue_orb", orbs.blue_orb)):
+            start, end = self.sections[name]
+            if orb and orb.spawn_time is not None:
+                orb_x, orb_y = orb.get_position()
+                out[start:end] = (orb_x - player_pos[0], orb_y - player_pos[1], 1)
+            else:
+                out[start:end] = 0
+        return out
+
+    def render(self):
+        """Render the current frame as a (height, width, 3) RGB array view, in rgb_array mode"""
+        if self.render_mode == "rgb_array":
+            return self.world.capture_frame()
+        return None
+
+    def close(self):
+        """Clean up the world"""
+        if self.world:
+            self.world.cleanup()
+            self.world = None
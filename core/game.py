@@ -1,50 +1,43 @@
 from direct.showbase.ShowBase import ShowBase
 from direct.task import Task
-from panda3d.core import WindowProperties, InputDevice, CardMaker, TransparencyAttrib
+from panda3d.core import WindowProperties, GraphicsWindow, InputDevice, AudioSound
 import time
 
 from utils.resource_loader import get_resource_path
 from utils.debug import out
-from core.town import TownArea
-
-from systems.player_system import PlayerSystem
-from systems.enemy_system import EnemySystem
-from systems.boss_system import BossSystem
-from systems.projectile_system import ProjectileSystem
-from systems.orb_system import OrbSystem
-from effects.effects_system import EffectsSystem
-from ui.ui_system import UISystem
+from utils.leak_auditor import LeakAuditor
+from utils.telemetry import TelemetryRecorder
+from utils.tracer import tracer, traced
+from utils.metrics import PerformanceMetrics, MetricsServer
+from utils.gc_manager import GCManager
+from utils.idle_mode import IdleMode
+from core.config import (leak_audit, telemetry_file,
+                         trace, trace_seconds, trace_slow_frame_ms, metrics_port,
+                         gc_safe_points, gc_young_limit, idle_frame_rate, capture_stride)
+from core.world import World, TIMED_SECTIONS
 
 class Game(ShowBase):
     def __init__(self):
         ShowBase.__init__(self)
         
-        # Game state
-        self.paused = True
-        self.game_over = False
-        self.level = 1
-        self.score = 0
-        self.actual_game_time = 0
+        # Span tracing starts first so loading shows up in dumps
+        if trace.getValue():
+            tracer.enable(trace_seconds.getValue())
+        self.trace_slow_frame_ms = trace_slow_frame_ms.getValue()
+        self.last_trace_dump = 0
         self.last_time_update = time.time()
-        self.game_start_time = time.time()
         
         # Initialize window properties
         self.setup_window()
         
-        # Load and set up background
-        self.setup_background()
-        
-        # Initialize systems
-        self.ui_system = UISystem(self)
-        self.effects_system = EffectsSystem(self)
-        self.projectile_system = ProjectileSystem(self)
-        self.player_system = PlayerSystem(self)
-        self.enemy_system = EnemySystem(self)
-        self.boss_system = BossSystem(self)
-        self.orb_system = OrbSystem(self)
+        # The simulation, drawn into this window and run on the wall clock
+        self.world = World(self.render2d, self.aspect_ratio, camera=self.cam2d, clock=time.time)
+        self.world.on_area_change = self.on_area_change
+        self.texture_manager = self.world.texture_manager
         
-        # Initialize town area
-        self.town_area = None
+        # Capture frames offscreen every capture-stride steps if asked to
+        if capture_stride.getValue():
+            self.enable_capture()
         
         # Load sounds
         self.load_sounds()
@@ -53,20 +46,51 @@ class Game(ShowBase):
         self.setup_input()
         
         # Show initial pause text since game starts paused
-        self.ui_system.show_pause()
+        self.world.ui_system.show_pause()
         
         # Add the game loop update task
         self.taskMgr.add(self.update, "gameUpdate")
+        
+        # Throttle down while paused or left alone, waking on any input
+        self.idle_mode = IdleMode(self, idle_frame_rate.getValue())
+        
+        # Per-section frame timing, optionally recorded to a telemetry file
+        self.frame_timer = self.world.frame_timer
+        self.telemetry = None
+        if telemetry_file.getValue():
+            self.telemetry = TelemetryRecorder(telemetry_file.getValue(), self.get_telemetry_columns())
+        
+        # Optional live metrics, served from a background thread
+        self.metrics = None
+        self.metrics_server = None
+        if metrics_port.getValue():
+            self.metrics = PerformanceMetrics()
+            self.metrics_server = MetricsServer(self.metrics, metrics_port.getValue())
+            # Published from its own task, which keeps running while idle mode
+            # has the game update suspended
+            self.taskMgr.doMethodLater(self.metrics.publish_interval, self.publish_metrics, "publishMetrics")
+        
+        # Optional leak auditing, starting from the freshly loaded game
+        self.leak_auditor = LeakAuditor(self) if leak_audit.getValue() else None
+        self.audit_checkpoint("start")
+        
+        # Everything loaded so far lives for the session, so freeze it out of collections
+        self.gc_manager = GCManager(gc_safe_points.getValue(), gc_young_limit.getValue())
+        self.gc_manager.start()
 
     def setup_window(self):
         """Set up window properties and camera"""
-        wp = WindowProperties()
-        wp.setSize(1920, 1080)
-        self.win.requestProperties(wp)
-        
-        # Calculate and store aspect ratio
-        props = self.win.getProperties()
-        self.aspect_ratio = props.getXSize() / props.getYSize()
+        if isinstance(self.win, GraphicsWindow):
+            wp = WindowProperties()
+            wp.setSize(1920, 1080)
+            self.win.requestProperties(wp)
+            
+            # Calculate and store aspect ratio
+            props = self.win.getProperties()
+            self.aspect_ratio = props.getXSize() / props.getYSize()
+        else:
+            # Offscreen buffers (window-type offscreen) have a fixed size
+            self.aspect_ratio = self.win.getXSize() / self.win.getYSize()
         
         # Disable mouse control of the camera
         self.disableMouse()
@@ -75,36 +99,29 @@ class Game(ShowBase):
         lens = self.cam.node().getLens()
         lens.setFov(0.5)
 
-    def setup_background(self):
-        """Load and set up the game background"""
-        self.background = self.loader.loadTexture(get_resource_path("map.png"))
-        cm = CardMaker("background")
-        cm.setFrame(-self.aspect_ratio * 0.58, self.aspect_ratio * 0.8, -1, 1)
-        self.background_node = self.render2d.attachNewNode(cm.generate())
-        self.background_node.setTexture(self.background)
-
     def load_sounds(self):
-        """Load and set up game sounds"""
+        """Load and set up game sounds, handing them to the world to play"""
+        world = self.world
         try:
             # Background music
-            self.music = self.loader.loadSfx(get_resource_path("music.mp3"))
-            if self.music:
-                self.music.setLoop(True)
-                self.music.setVolume(0)
-                self.music.play()
+            world.music = self.loader.loadSfx(get_resource_path("music.mp3"))
+            if world.music:
+                world.music.setLoop(True)
+                world.music.setVolume(0)
+                world.music.play()
                 self.music_playing = True
                 self.music_paused = False
-                self.music.stop()
+                world.music.stop()
             
             # Effect sounds
-            self.enemy_death_sound = self.loader.loadSfx(get_resource_path("enemy_death.mp3"))
-            self.enemy_death_sound.setVolume(0.2)
-            self.gun_sound = self.loader.loadSfx(get_resource_path("gun.mp3"))
-            self.gun_sound.setVolume(0.03)
-            self.dash_ready_sound = self.loader.loadSfx(get_resource_path("powerup1.mp3"))
-            self.dash_ready_sound.setVolume(0.8)
-            self.dash_sound = self.loader.loadSfx(get_resource_path("zoom.mp3"))
-            self.dash_sound.setVolume(0.8)
+            world.enemy_death_sound = self.loader.loadSfx(get_resource_path("enemy_death.mp3"))
+            world.enemy_death_sound.setVolume(0.2)
+            world.gun_sound = self.loader.loadSfx(get_resource_path("gun.mp3"))
+            world.gun_sound.setVolume(0.03)
+            world.dash_ready_sound = self.loader.loadSfx(get_resource_path("powerup1.mp3"))
+            world.dash_ready_sound.setVolume(0.8)
+            world.dash_sound = self.loader.loadSfx(get_resource_path("zoom.mp3"))
+            world.dash_sound.setVolume(0.8)
         except Exception as e:
             out(f"Error loading sounds: {e}")
             self.music_playing = False
@@ -124,17 +141,20 @@ class Game(ShowBase):
         self.accept("f", self.toggle_fullscreen)
         self.accept("m", self.toggle_music)
         
+        # Dump recent timing spans
+        if tracer.enabled:
+            self.accept("f9", self.dump_trace, ["hotkey"])
+        
         # Initialize gamepad
-        self.gamepad = None
         self.init_gamepad()
 
     def init_gamepad(self):
         """Initialize gamepad if available"""
         devices = self.devices.getDevices(InputDevice.DeviceClass.gamepad)
         if devices:
-            self.gamepad = devices[0]
-            self.attachInputDevice(self.gamepad, prefix="gamepad")
-            out(f"Gamepad connected: {self.gamepad.name}", 2)
+            gamepad = self.world.gamepad = devices[0]
+            self.attachInputDevice(gamepad, prefix="gamepad")
+            out(f"Gamepad connected: {gamepad.name}", 2)
             
             # Set up gamepad button handlers
             self.accept("gamepad-face_a", self.toggle_music)
@@ -146,49 +166,129 @@ class Game(ShowBase):
 
     def handle_dash(self):
         """Handle gamepad dash input"""
-        if self.gamepad:
-            left_x = self.gamepad.findAxis(InputDevice.Axis.left_x).value
-            left_y = self.gamepad.findAxis(InputDevice.Axis.left_y).value
-            self.player_system.perform_dash(left_x, left_y)
+        gamepad = self.world.gamepad
+        if gamepad:
+            left_x = gamepad.findAxis(InputDevice.Axis.left_x).value
+            left_y = gamepad.findAxis(InputDevice.Axis.left_y).value
+            self.world.player_system.perform_dash(left_x, left_y)
 
     def update(self, task):
         """Main game update loop"""
+        world = self.world
         # Update game time
         current_time = time.time()
-        if not self.paused and not self.game_over:
-            self.actual_game_time += current_time - self.last_time_update
+        frame_dt = current_time - self.last_time_update
         self.last_time_update = current_time
+        frame_start = tracer.now()
+        
+        # The previous frame's spans are still buffered, so a hitch can be dumped now;
+        # the first frame's time includes loading, so it is never a hitch
+        if (tracer.enabled and self.trace_slow_frame_ms and task.frame > 0
+                and frame_dt * 1000 > self.trace_slow_frame_ms
+                and current_time - self.last_trace_dump > tracer.window_seconds):
+            self.dump_trace(f"slow frame {frame_dt * 1000:.1f} ms")
         
-        # Check for boss spawn
-        if (self.actual_game_time >= self.boss_system.boss_spawn_time and 
-            not self.boss_system.boss and not self.game_over):
-            self.boss_system.spawn_boss()
+        # Collect garbage while nothing is moving rather than mid-fight
+        if world.game_over:
+            self.gc_manager.update("game over")
+        elif world.paused:
+            self.gc_manager.update("pause")
+        else:
+            self.gc_manager.update()
+        
+        world.step(frame_dt)
         
-        # Update all systems
-        self.player_system.update(task)
-        self.enemy_system.update(task)
-        self.boss_system.update(task)
-        self.projectile_system.update(task)
-        self.orb_system.update(task)
-        self.effects_system.update_explosions(task)
-        self.ui_system.update_debug_text()
+        if self.telemetry:
+            self.record_telemetry()
+        if self.metrics:
+            self.metrics.record_frame(frame_dt * 1000, self.frame_timer.times)
+        tracer.add_span("Game.update", frame_start, tracer.now())
         
         return Task.cont
 
+    def dump_trace(self, reason):
+        """Write the recent timing spans to a Chrome trace file"""
+        self.last_trace_dump = time.time()
+        tracer.dump(reason)
+
+    def get_telemetry_columns(self):
+        """Get the (name, dtype) of every per-frame telemetry column"""
+        columns = [("frame", "u4"), ("game_time", "f8"), ("frame_ms", "f4"), ("update_ms", "f4")]
+        columns += [(f"{section}_ms", "f4") for section in TIMED_SECTIONS]
+        columns += [(name, "u4") for name in ("enemies", "enemy_ai_updates", "projectiles", "boss_projectiles",
+                                              "explosions", "orbs", "sprites", "sprites_visible",
+                                              "score", "enemy_limit", "gc_collections")]
+        columns.append(("gc_ms", "f4"))
+        return columns
+
+    def get_playing_sounds(self):
+        """Count the game's sounds that are currently playing"""
+        sounds = [getattr(self.world, name, None) for name in
+                  ("music", "gun_sound", "enemy_death_sound", "dash_ready_sound", "dash_sound")]
+        return sum(1 for sound in sounds if sound and sound.status() == AudioSound.PLAYING)
+
+    def publish_metrics(self, task=None):
+        """Publish a metrics snapshot with freshly gathered gauges"""
+        self.metrics.publish(self.get_metric_gauges())
+        return Task.again
+
+    def get_metric_gauges(self):
+        """Get current gauges for the metrics endpoint as (name, labels, value, help)"""
+        world = self.world
+        gauges = [("entities", {"kind": kind}, count, "Live entities and sprites by kind")
+                  for kind, count in world.get_entity_counts().items()]
+        textures = self.texture_manager.get_stats()
+        gauges += [
+            ("texture_bytes", {"memory": "gpu"}, textures["gpu_bytes"], "Estimated resident texture memory"),
+            ("texture_bytes", {"memory": "ram"}, textures["ram_bytes"], "Estimated resident texture memory"),
+            ("texture_budget_bytes", {}, textures["budget_bytes"], "Texture memory budget"),
+            ("texture_evictions_total", {}, textures["evictions"], "Textures evicted to stay within budget"),
+            ("audio_voices", {}, self.get_playing_sounds(), "Sounds currently playing"),
+            ("score", {}, world.score, "Current score"),
+            ("enemy_limit", {}, world.enemy_system.enemy_limit, "Enemies kept alive at once"),
+            ("enemy_ai_updates", {}, world.enemy_system.ai_updates, "Enemies whose AI ran last frame"),
+            ("paused", {}, int(world.paused or world.game_over), "Whether the game is paused or over"),
+            ("idle", {}, int(self.idle_mode.idle), "Whether idle mode has the simulation suspended"),
+        ]
+        collections = self.gc_manager.get_stats()
+        gauges += [
+            ("gc_collections_total", {}, collections["collections"], "Garbage collections run"),
+            ("gc_pause_ms_total", {}, round(collections["total_ms"], 3), "Time spent in garbage collection"),
+            ("gc_frozen_objects", {}, collections["frozen"], "Objects frozen out of garbage collection"),
+        ]
+        return gauges
+
+    def record_telemetry(self):
+        """Record this frame's timings and entity counts"""
+        world = self.world
+        values = world.get_entity_counts()
+        values.update({
+            "game_time": world.actual_game_time,
+            "frame_ms": world.frame_dt * 1000,
+            "update_ms": self.frame_timer.total(),
+            "enemy_ai_updates": world.enemy_system.ai_updates,
+            "score": world.score,
+            "enemy_limit": world.enemy_system.enemy_limit,
+        })
+        for section, ms in self.frame_timer.times.items():
+            values[section + "_ms"] = ms
+        self.telemetry.record(values)
+
     def toggle_pause(self):
         """Toggle game pause state"""
-        if self.game_over:
+        world = self.world
+        if world.game_over:
             self.restart_game()
         else:
-            self.paused = not self.paused
-            if self.paused:
-                self.ui_system.show_pause()
-                if self.music:
-                    self.music.stop()
+            world.paused = not world.paused
+            if world.paused:
+                world.ui_system.show_pause()
+                if world.music:
+                    world.music.stop()
             else:
-                self.ui_system.hide_pause()
-                if self.music:
-                    self.music.play()
+                world.ui_system.hide_pause()
+                if world.music:
+                    world.music.play()
 
     def toggle_fullscreen(self):
         """Toggle fullscreen mode"""
@@ -199,71 +299,65 @@ class Game(ShowBase):
 
     def toggle_music(self):
         """Toggle music on/off"""
-        if self.music:
+        music = self.world.music
+        if music:
             if self.music_playing:
-                self.music.setVolume(0)
+                music.setVolume(0)
                 self.music_playing = False
             else:
-                self.music.setVolume(0.3)
+                music.setVolume(0.3)
                 self.music_playing = True
 
+    @traced("Game.restart_game")
     def restart_game(self):
         """Restart the game"""
-        self.actual_game_time = 0
         self.last_time_update = time.time()
-        self.game_start_time = time.time()
-        self.level = 1
-        self.score = 0
-        
-        # Reset game state
-        self.game_over = False
-        self.ui_system.hide_game_over()
-        self.ui_system.hide_pause()
-        self.paused = False
-        
-        # Reset all systems
-        self.player_system.cleanup()
-        self.enemy_system.reset()
-        self.boss_system.cleanup()
-        self.projectile_system.cleanup()
-        self.orb_system.cleanup()
-        self.effects_system.cleanup()
-        
-        # Reinitialize systems as needed
-        self.player_system = PlayerSystem(self)
+        self.world.restart()
+        self.world.sprite_pool.report()
+        self.texture_manager.report()
+        self.gc_manager.report()
         
         # Restart music
-        if self.music:
-            self.music.play()
-
-    def transition_to_town(self):
-        """Handle transition to town area"""
-        # Clear combat entities
-        self.enemy_system.cleanup()
-        self.boss_system.cleanup()
-        self.projectile_system.cleanup()
-        self.orb_system.cleanup()
-        
-        # Hide combat background
-        self.background_node.hide()
-        
-        # Initialize and show town area
-        if not self.town_area:
-            self.town_area = TownArea(self)
-        self.town_area.enter()
+        if self.world.music:
+            self.world.music.play()
         
+        # The old run's objects are gone, so collect and freeze the new ones
+        self.gc_manager.collect("restart", refreeze=True)
+        self.audit_checkpoint("restart")
+
+    def on_area_change(self, area):
+        """Settle the window and memory after the world moves to another area"""
         # Reset camera
         self.camera.setPos(0, 0, 0)
+        
+        self.gc_manager.collect(area, refreeze=True)
+        self.audit_checkpoint(area)
+
+    def enable_capture(self):
+        """Capture the world's frames through an offscreen buffer sharing this window's graphics state"""
+        return self.world.enable_capture(engine=self.graphicsEngine, pipe=self.pipe, host=self.win)
+
+    def capture_frame(self):
+        """Render a frame offscreen and return it as an RGB array view"""
+        if not self.world.frame_capture:
+            self.enable_capture()
+        return self.world.capture_frame()
+
+    def audit_checkpoint(self, label):
+        """Sample resource counts for the leak auditor, if it is enabled"""
+        if self.leak_auditor:
+            self.leak_auditor.checkpoint(label)
 
     def cleanup(self):
         """Clean up game resources"""
-        self.player_system.cleanup()
-        self.enemy_system.cleanup()
-        self.boss_system.cleanup()
-        self.projectile_system.cleanup()
-        self.orb_system.cleanup()
-        self.effects_system.cleanup()
-        self.ui_system.cleanup()
-        
-        if self.town_area:
-            self.town_area.exit()
+        if self.leak_auditor:
+            self.leak_auditor.report()
+        if self.telemetry:
+            self.telemetry.close()
+        if self.metrics_server:
+            self.taskMgr.remove("publishMetrics")
+            self.metrics_server.shutdown()
+        self.gc_manager.report()
+        self.gc_manager.stop()
+        self.idle_mode.cleanup()
+        self.world.cleanup()
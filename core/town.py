@@ -1,15 +1,15 @@
 from direct.showbase.ShowBase import ShowBase
 from panda3d.core import TextureStage, TransparencyAttrib, CardMaker
-from utils.resource_loader import get_resource_path
 
 class TownArea:
     def __init__(self, game):
         self.game = game  # Reference to main game instance
         
         # Load and set up the town background
-        self.background = game.loader.loadTexture(get_resource_path("town.png"))
+        self.background = game.texture_manager.acquire("town.png")
+        self.holding_background = True
         cm = CardMaker("town_background")
-        cm.setFrame(-game.aspect_ratio * 0.58, game.aspect_ratio * 0.8, -1, 1)
+        cm.setFrame(*game.background_frame)
         self.background_node = game.render2d.attachNewNode(cm.generate())
         self.background_node.setTexture(self.background)
         
@@ -18,11 +18,23 @@ class TownArea:
     
     def enter(self):
         """Called when entering the town area"""
+        if not self.holding_background:
+            self.game.texture_manager.acquire("town.png")
+            self.holding_background = True
         self.background_node.show()
+        self.game.enemy_system.load_obstacles("town.png")
         
     def exit(self):
         """Called when leaving the town area"""
         self.background_node.hide()
+        if self.holding_background:
+            self.game.texture_manager.release("town.png")
+            self.holding_background = False
+
+    def cleanup(self):
+        """Leave the town and remove its background"""
+        self.exit()
+        self.background_node.removeNode()
 
     def update(self, task):
         """Update logic for town area"""
@@ -0,0 +1,205 @@
+import os
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from core.world import WorldBatch
+from core.env import GameEnv, ACTION_SIZE, NEAREST_ENEMIES, NEAREST_BULLETS, observation_size, gymnasium
+
+class SharedBuffers:
+    """Every environment's action and step results, as arrays over one shared memory block
+
+    The owner creates the block; workers attach to it by name and read and
+    write their own rows in place.
+    """
+
+    def __init__(self, num_envs, obs_size, name=None):
+        layout = [
+            ("observations", np.float32, (num_envs, obs_size)),
+            ("actions", np.float32, (num_envs, ACTION_SIZE)),
+            ("rewards", np.float32, (num_envs,)),
+            ("scores", np.int64, (num_envs,)),
+            ("terminated", np.bool_, (num_envs,)),
+            ("truncated", np.bool_, (num_envs,)),
+            ("won", np.bool_, (num_envs,)),
+        ]
+        # Each array starts on an 8 byte boundary
+        sizes = [-(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8 for _, dtype, shape in layout]
+        self.fields = [field for field, _, _ in layout]
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=sum(sizes))
+        offset = 0
+        for (field, dtype, shape), size in zip(layout, sizes):
+            setattr(self, field, np.ndarray(shape, dtype, buffer=self.memory.buf, offset=offset))
+            offset += size
+
+    def close(self, unlink=False):
+        """Detach from the block, destroying it too if unlink is set"""
+        # The memory can't be closed while arrays still point into it
+        for field in self.fields:
+            setattr(self, field, None)
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+def run_worker(connection, memory_name, num_envs, start, stop, seed, env_options):
+    """Step environments start to stop in lockstep, driven by commands from the owner"""
+    envs = []
+    batch = None
+    try:
+        batch = WorldBatch(stop - start, seed=seed)
+        envs = [GameEnv(world=world, **env_options) for world in batch.worlds]
+        buffers = SharedBuffers(num_envs, envs[0].observation_size, memory_name)
+        connection.send(("ok", None))
+        while True:
+            command, argument = connection.recv()
+            if command == "close":
+                break
+            if command == "reset":
+                for index, env in enumerate(envs, start):
+                    observation, info = env.reset(argument[index] if argument else None)
+                    buffers.observations[index] = observation
+                    write_info(buffers, index, info)
+            elif command == "step":
+                step_batch(batch, envs, buffers, start)
+            connection.send(("ok", None))
+        buffers.close()
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        if batch:
+            batch.cleanup()
+        connection.close()
+
+def step_batch(batch, envs, buffers, start):
+    """Apply every environment's action, step their worlds together and write the results
+
+    As in GameEnv.step, an environment whose episode ends during the frame
+    skip isn't stepped again. Finished environments are reset at once, so
+    their observation row holds the first observation of the next episode.
+    """
+    for index, env in enumerate(envs, start):
+        env.apply_action(buffers.actions[index])
+    head = envs[0]
+    done = np.zeros(len(envs), dtype=bool)
+    for _ in range(head.frame_skip):
+        batch.step(head.dt, [env.world for env, finished in zip(envs, done) if not finished])
+        done |= [env.is_done() for env in envs]
+        if done.all():
+            break
+
+    for index, env in enumerate(envs, start):
+        _, reward, terminated, truncated, info = env.collect(buffers.observations[index])
+        buffers.rewards[index] = reward
+        buffers.terminated[index] = terminated
+        buffers.truncated[index] = truncated
+        write_info(buffers, index, info)
+        if terminated or truncated:
+            env.reset()
+            env.observe(buffers.observations[index])
+
+def write_info(buffers, index, info):
+    """Write one environment's episode progress"""
+    buffers.scores[index] = info["score"]
+    buffers.won[index] = info["won"]
+
+class VectorGameEnv:
+    """num_envs game environments stepped by a pool of worker processes
+
+    Actions and results pass through shared memory; the pipes to the workers
+    carry only commands. Each worker steps its share of the environments in
+    lockstep through a WorldBatch. Environments are reset automatically when
+    they finish, and the results are copied out unless copy is False.
+    """
+
+    def __init__(self, num_envs, workers=None, seed=None, copy=True, **env_options):
+        self.num_envs = num_envs
+        self.copy = copy
+        obs_size = observation_size(env_options.get("nearest_enemies", NEAREST_ENEMIES),
+                                    env_options.get("nearest_bullets", NEAREST_BULLETS))
+        self.buffers = SharedBuffers(num_envs, obs_size)
+
+        if gymnasium:
+            self.single_action_space = gymnasium.spaces.Box(-1.0, 1.0, (ACTION_SIZE,), np.float32)
+            self.single_observation_space = gymnasium.spaces.Box(-np.inf, np.inf, (obs_size,), np.float32)
+            self.action_space = gymnasium.spaces.Box(-1.0, 1.0, (num_envs, ACTION_SIZE), np.float32)
+            self.observation_space = gymnasium.spaces.Box(-np.inf, np.inf, (num_envs, obs_size), np.float32)
+
+        # Spawned rather than forked, since a forked child would share the
+        # parent's Panda3D state
+        context = multiprocessing.get_context("spawn")
+        workers = max(1, min(num_envs, workers or os.cpu_count() or 1))
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        self.connections = []
+        self.processes = []
+        for worker in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=run_worker, name=f"env-worker-{worker}", daemon=True,
+                args=(child, self.buffers.memory.name, num_envs, int(bounds[worker]), int(bounds[worker + 1]),
+                      None if seed is None else seed + worker, env_options)
+            )
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.wait()
+
+    def send(self, command, argument=None):
+        """Send a command to every worker"""
+        for connection in self.connections:
+            connection.send((command, argument))
+
+    def wait(self):
+        """Wait for every worker to finish its command"""
+        errors = []
+        for connection in self.connections:
+            status, message = connection.recv()
+            if status == "error":
+                errors.append(message)
+        if errors:
+            self.close()
+            raise RuntimeError("Environment worker failed:\n" + errors[0])
+
+    def results(self, array):
+        """Get a result array, copied out of shared memory if requested"""
+        return array.copy() if self.copy else array
+
+    def get_info(self):
+        """Get every environment's episode progress"""
+        buffers = self.buffers
+        return {"score": self.results(buffers.scores), "won": self.results(buffers.won)}
+
+    def reset(self, seed=None, options=None):
+        """Start a new episode in every environment, seeding them seed, seed + 1, ... if given"""
+        seeds = None if seed is None else [seed + index for index in range(self.num_envs)]
+        self.send("reset", seeds)
+        self.wait()
+        return self.results(self.buffers.observations), self.get_info()
+
+    def step(self, actions):
+        """Step every environment by its row of actions"""
+        buffers = self.buffers
+        buffers.actions[:] = actions
+        self.send("step")
+        self.wait()
+        return (self.results(buffers.observations), self.results(buffers.rewards),
+                self.results(buffers.terminated), self.results(buffers.truncated), self.get_info())
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        if not self.processes:
+            return
+        for connection in self.connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.processes = []
+        self.connections = []
+        self.buffers.close(unlink=True)
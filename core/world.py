@@ -0,0 +1,370 @@
+import random
+from direct.showbase.DirectObject import DirectObject
+from panda3d.core import NodePath, CardMaker
+
+from utils.telemetry import FrameTimer
+from utils.tracer import traced
+from utils.frame_capture import FrameCapture
+from core.config import texture_budget_mb, capture_size, capture_stride
+from core.town import TownArea
+
+from systems.player_system import PlayerSystem
+from systems.enemy_system import EnemySystem, steer_together
+from systems.boss_system import BossSystem
+from systems.projectile_system import ProjectileSystem
+from systems.orb_system import OrbSystem
+from systems.timeline_system import TimelineSystem
+from systems.animation_system import AnimationSystem
+from effects.effects_system import EffectsSystem
+from ui.ui_system import UISystem, HeadlessUI
+from managers.sprite_pool import SpritePool
+from managers.texture_manager import TextureManager, MEGABYTE
+from effects.sprite_batcher import SpriteBatcher
+from effects.atlas import SpriteAtlas
+
+# Frame sections timed for telemetry, in update order
+TIMED_SECTIONS = ["player", "enemies", "boss", "projectiles", "orbs", "timelines",
+                  "animation", "explosions", "dash_trail", "ui", "batcher"]
+
+# Texture budget and sprite atlas, loaded once and shared by every world in the process
+shared_assets = None
+
+def get_shared_assets():
+    """Get the process-wide texture manager and sprite atlas, loading them on first use"""
+    global shared_assets
+    if shared_assets is None:
+        texture_manager = TextureManager(texture_budget_mb.getValue() * MEGABYTE)
+        # Sprite images share atlas pages so different kinds batch together
+        sprite_atlas = SpriteAtlas()
+        sprite_atlas.load()
+        for index, page in enumerate(sprite_atlas.pages):
+            texture_manager.adopt(f"atlas_{index}", page)
+        shared_assets = (texture_manager, sprite_atlas)
+    return shared_assets
+
+class World(DirectObject):
+    """Game state and every gameplay system, without a window or ShowBase
+
+    The windowed Game hosts one world drawn into its render2d and timed by the
+    wall clock. A headless world builds into its own detached scene graph and
+    runs on a simulated clock advanced by each step, so a process can hold
+    and step as many as it likes.
+    """
+
+    def __init__(self, render2d=None, aspect_ratio=16 / 9, camera=None, clock=None, seed=None):
+        self.headless = render2d is None
+        self.render2d = NodePath("world") if self.headless else render2d
+        self.aspect_ratio = aspect_ratio
+        self.clock = clock          # Wall clock to follow, or None to simulate time
+        self.simulated_time = 0.0
+        self.random = random.Random(seed)
+
+        # Game state
+        self.paused = True
+        self.game_over = False
+        self.in_town = False
+        self.level = 1
+        self.score = 0
+        self.actual_game_time = 0
+        self.frame_dt = 0
+        self.game_start_time = self.now()
+
+        # Provided by a host with a window; a headless world has no input devices or sound
+        self.gamepad = None
+        self.music = None
+        self.enemy_death_sound = None
+        self.gun_sound = None
+        self.dash_ready_sound = None
+        self.dash_sound = None
+        self.on_area_change = None  # Called with the area's name after a transition
+
+        self.texture_manager, self.sprite_atlas = get_shared_assets()
+
+        # Load and set up background
+        self.setup_background()
+
+        # Every dynamic sprite is drawn through the batcher
+        self.sprite_batcher = SpriteBatcher(self.render2d, self.sprite_atlas, camera)
+
+        # Prewarm pooled sprites before anything spawns
+        self.setup_sprite_pool()
+
+        # Initialize systems
+        self.timeline_system = TimelineSystem(self)
+        self.animation_system = AnimationSystem(self)
+        self.ui_system = HeadlessUI() if self.headless else UISystem(self)
+        self.effects_system = EffectsSystem(self)
+        self.projectile_system = ProjectileSystem(self)
+        self.player_system = PlayerSystem(self)
+        self.enemy_system = EnemySystem(self)
+        self.boss_system = BossSystem(self)
+        self.orb_system = OrbSystem(self)
+
+        # Initialize town area
+        self.town_area = None
+
+        # Per-section timing of each step
+        self.frame_timer = FrameTimer()
+
+        # Offscreen frames of this world, once capture is enabled
+        self.frame_capture = None
+
+    def now(self):
+        """Get the current time in seconds, from the wall clock or the simulated one"""
+        return self.clock() if self.clock else self.simulated_time
+
+    def setup_background(self):
+        """Load and set up the game background"""
+        self.background = self.texture_manager.acquire("map.png")
+        self.holding_background = True
+        # Area backgrounds and their obstacle maps all cover this frame
+        self.background_frame = (-self.aspect_ratio * 0.58, self.aspect_ratio * 0.8, -1, 1)
+        cm = CardMaker("background")
+        cm.setFrame(*self.background_frame)
+        self.background_node = self.render2d.attachNewNode(cm.generate())
+        self.background_node.setTexture(self.background)
+
+    def setup_sprite_pool(self):
+        """Register pooled sprite kinds and prewarm them for the level"""
+        self.sprite_pool = SpritePool(self)
+        self.sprite_pool.register("enemy", 0.1, "enemy", layer=0)
+        self.sprite_pool.register("projectile", 0.02, "bullet", layer=2)
+        self.sprite_pool.register("boss_projectile", 0.06, "bullet", layer=2)
+        self.prewarm_sprites()
+
+    def prewarm_sprites(self):
+        """Make sure the pool can cover a typical level without allocating"""
+        self.sprite_pool.prewarm("enemy", 32)
+        self.sprite_pool.prewarm("projectile", 64)
+        self.sprite_pool.prewarm("boss_projectile", 32)
+
+    def enable_capture(self, size=None, stride=None, engine=None, pipe=None, host=None):
+        """Render this world into an offscreen buffer on request, and every stride steps
+
+        Size and stride default to capture-size and capture-stride. A hosted
+        world is seen through its camera; a headless one through a camera
+        framing the same view.
+        """
+        if size is None:
+            size = (capture_size[0], capture_size[1])
+        if stride is None:
+            stride = capture_stride.getValue()
+        camera = self.sprite_batcher.camera
+        self.frame_capture = FrameCapture(
+            self.render2d, size, stride,
+            lens=camera.node().getLens() if camera else None, camera_parent=camera,
+            engine=engine, pipe=pipe, host=host
+        )
+        return self.frame_capture
+
+    def capture_frame(self):
+        """Render the world now and return the frame as an RGB array view"""
+        # A headless world only writes its sprites out when they're drawn
+        if self.headless:
+            self.sprite_batcher.update()
+        return self.frame_capture.capture()
+
+    def step(self, dt):
+        """Advance the world by dt seconds"""
+        self.begin_step(dt)
+        self.player_system.update(None)
+        self.frame_timer.lap("player")
+        self.enemy_system.update(None)
+        self.frame_timer.lap("enemies")
+        self.finish_step()
+
+    def begin_step(self, dt):
+        """Advance the clocks and start timing a step"""
+        if self.clock is None:
+            self.simulated_time += dt
+        self.frame_dt = dt
+        if not self.paused and not self.game_over:
+            self.actual_game_time += dt
+
+        # Check for boss spawn
+        if (self.actual_game_time >= self.boss_system.boss_spawn_time and
+            not self.boss_system.boss and not self.game_over):
+            self.boss_system.spawn_boss()
+
+        self.frame_timer.start()
+
+    def finish_step(self):
+        """Update every system after the enemies"""
+        timer = self.frame_timer
+        self.boss_system.update(None)
+        timer.lap("boss")
+        self.projectile_system.update(None)
+        timer.lap("projectiles")
+        self.orb_system.update(None)
+        timer.lap("orbs")
+        self.timeline_system.update(None)
+        timer.lap("timelines")
+        self.animation_system.update(None)
+        timer.lap("animation")
+        self.effects_system.update_explosions(None)
+        timer.lap("explosions")
+        self.effects_system.update_dash_trail(None)
+        timer.lap("dash_trail")
+        self.ui_system.update_debug_text()
+        timer.lap("ui")
+
+        # Write this frame's sprites into the batched vertex buffers; nothing
+        # draws a headless world, so it keeps only their positions
+        if not self.headless:
+            self.sprite_batcher.update()
+        timer.lap("batcher")
+
+        if self.frame_capture and self.frame_capture.count_step():
+            self.capture_frame()
+
+    def get_entity_counts(self):
+        """Get live entity and sprite counts by kind"""
+        projectiles = self.projectile_system
+        boss = self.boss_system
+        return {
+            "enemies": len(self.enemy_system.enemies),
+            "projectiles": projectiles.gpu_bullets.count if projectiles.gpu_bullets else len(projectiles.projectiles),
+            "boss_projectiles": boss.gpu_bullets.count if boss.gpu_bullets else len(boss.boss_projectiles),
+            "explosions": self.effects_system.explosion_renderer.count,
+            "orbs": (self.orb_system.green_orb is not None) + (self.orb_system.blue_orb is not None),
+            "sprites": len(self.sprite_batcher.alive) - len(self.sprite_batcher.free_slots),
+            "sprites_visible": self.sprite_batcher.visible_count,
+        }
+
+    @traced("World.restart")
+    def restart(self, seed=None):
+        """Start a new run, reseeding the world's random numbers if a seed is given"""
+        if seed is not None:
+            self.random.seed(seed)
+        # A simulated clock starts over too, so equal seeds replay equal runs
+        if self.clock is None:
+            self.simulated_time = 0.0
+        self.actual_game_time = 0
+        self.game_start_time = self.now()
+        self.level = 1
+        self.score = 0
+
+        # Runs start in the combat area, so come back from town first
+        if self.in_town:
+            self.town_area.exit()
+        if not self.holding_background:
+            self.texture_manager.acquire("map.png")
+            self.holding_background = True
+            self.background_node.show()
+
+        # Reset game state
+        self.game_over = False
+        self.in_town = False
+        self.ui_system.hide_game_over()
+        self.ui_system.hide_pause()
+        self.paused = False
+
+        # Reset all systems
+        self.player_system.cleanup()
+        self.enemy_system.reset()
+        self.boss_system.reset()
+        self.projectile_system.reset()
+        self.orb_system.reset()
+        self.effects_system.reset()
+        self.timeline_system.cleanup()
+
+        # Reinitialize systems as needed
+        self.player_system = PlayerSystem(self)
+        self.prewarm_sprites()
+
+    @traced("World.transition_to_town")
+    def transition_to_town(self):
+        """Handle transition to town area"""
+        # Clear combat entities
+        self.enemy_system.cleanup()
+        self.boss_system.clear_combat()
+        self.projectile_system.reset()
+        self.orb_system.cleanup()
+
+        # Hide combat background, letting its texture go if memory is needed
+        self.background_node.hide()
+        if self.holding_background:
+            self.texture_manager.release("map.png")
+            self.holding_background = False
+
+        # Initialize and show town area
+        if not self.town_area:
+            self.town_area = TownArea(self)
+        self.town_area.enter()
+        self.in_town = True
+
+        if self.on_area_change:
+            self.on_area_change("town")
+
+    def cleanup(self):
+        """Clean up world resources"""
+        self.player_system.cleanup()
+        self.enemy_system.cleanup()
+        self.boss_system.cleanup()
+        self.projectile_system.cleanup()
+        self.orb_system.cleanup()
+        self.effects_system.cleanup()
+        self.timeline_system.cleanup()
+        self.animation_system.cleanup()
+        self.ui_system.cleanup()
+        self.sprite_pool.cleanup()
+        self.sprite_batcher.cleanup()
+
+        if self.town_area:
+            self.town_area.cleanup()
+        if self.frame_capture:
+            self.frame_capture.cleanup()
+            self.frame_capture = None
+        if self.holding_background:
+            self.texture_manager.release("map.png")
+            self.holding_background = False
+        self.background_node.removeNode()
+        if self.headless:
+            self.render2d.removeNode()
+
+class WorldBatch:
+    """Headless worlds stepped in lockstep by the same dt
+
+    Every world's enemy steering is computed in one vectorized pass over
+    their stacked arrays instead of one small pass per world.
+    """
+
+    def __init__(self, count, aspect_ratio=16 / 9, seed=None):
+        seeds = random.Random(seed)
+        self.worlds = [World(aspect_ratio=aspect_ratio, seed=seeds.getrandbits(32)) for _ in range(count)]
+
+    def step(self, dt, worlds=None):
+        """Advance every world, or only the given ones, by dt seconds"""
+        worlds = self.worlds if worlds is None else worlds
+        for world in worlds:
+            world.begin_step(dt)
+            world.player_system.update(None)
+            world.frame_timer.lap("player")
+
+        # Worlds with obstacles follow their own flow fields, and pipelined
+        # worlds steer on their workers, so those step their enemies alone
+        together = []
+        for world in worlds:
+            enemies = world.enemy_system
+            if world.paused or world.game_over:
+                continue
+            if enemies.worker or enemies.flow_field.has_obstacles():
+                enemies.update(None)
+            else:
+                together.append(enemies)
+        steer_together(together)
+        for world in worlds:
+            world.frame_timer.lap("enemies")
+            world.finish_step()
+
+    def restart(self, seed=None):
+        """Start a new run in every world, unpaused"""
+        seeds = random.Random(seed)
+        for world in self.worlds:
+            world.restart(seeds.getrandbits(32) if seed is not None else None)
+
+    def cleanup(self):
+        """Clean up every world"""
+        for world in self.worlds:
+            world.cleanup()
+        self.worlds = []
@@ -0,0 +1,221 @@
+import os
+import json
+from panda3d.core import PNMImage, Texture, TexturePool, SamplerState, TransparencyAttrib
+from effects import texture_factory
+from utils.resource_loader import get_resource_path
+from utils.debug import out
+from utils.tracer import traced
+
+ATLAS_MANIFEST = "atlas.json"
+
+# Sprite images packed into the atlas: region name -> source image, or
+# (source image, frame count) for a horizontal flipbook strip
+ATLAS_IMAGES = {
+    "player": "player.png",
+    "enemy": "enemy.png",
+    "boss": "boss1.png",
+    "bullet": "orb.png",
+}
+
+# Procedural textures packed alongside them, under their factory names
+ATLAS_PROCEDURAL = [
+    "explosion", "explosion_aoe", "final_explosion", "dash_arc", "dash_glow", "trail_particle",
+]
+
+# Region origins are kept on 4 pixel boundaries so DXT blocks never straddle sprites
+BLOCK_ALIGN = 4
+
+def align(value):
+    """Round value up to the next block boundary"""
+    return (value + BLOCK_ALIGN - 1) // BLOCK_ALIGN * BLOCK_ALIGN
+
+def next_power_of_two(value):
+    """Get the smallest power of two not below value"""
+    size = 1
+    while size < value:
+        size *= 2
+    return size
+
+def frame_name(name, index):
+    """Get the region name of one flipbook frame"""
+    return f"{name}_{index}"
+
+def split_strip(image, frame_count):
+    """Cut a horizontal strip into equal-width frame images"""
+    frame_width = image.getXSize() // frame_count
+    frames = []
+    for index in range(frame_count):
+        frame = PNMImage(frame_width, image.getYSize(), image.getNumChannels())
+        frame.copySubImage(image, 0, 0, index * frame_width, 0, frame_width, image.getYSize())
+        frames.append(frame)
+    return frames
+
+@traced("atlas.collect_atlas_images")
+def collect_atlas_images(source_path):
+    """Load every atlas sprite; source_path maps an image name to its file
+
+    Returns region name -> PNMImage, and flipbook name -> its frame region names.
+    """
+    images = {}
+    frames = {}
+
+    def add_frames(name, frame_images):
+        frames[name] = [frame_name(name, index) for index in range(len(frame_images))]
+        images.update(zip(frames[name], frame_images))
+
+    for region, source in ATLAS_IMAGES.items():
+        image_name, frame_count = (source, 1) if isinstance(source, str) else source
+        path = source_path(image_name)
+        if not os.path.exists(path):
+            out(f"Skipping missing atlas image: {path}", 2)
+            continue
+        if frame_count > 1:
+            add_frames(region, split_strip(PNMImage(path), frame_count))
+        else:
+            images[region] = PNMImage(path)
+    for name in ATLAS_PROCEDURAL:
+        images[name] = texture_factory.PROCEDURAL_TEXTURES[name]()
+    for name, build_frames in texture_factory.PROCEDURAL_FRAMES.items():
+        add_frames(name, build_frames())
+    return images, frames
+
+def fit_image(image, max_size):
+    """Convert an image to RGBA, shrinking it so neither side exceeds max_size"""
+    if image.isGrayscale():
+        image.makeRgb()
+    if not image.hasAlpha():
+        # Opaque images get a solid alpha channel rather than the zeroed default
+        image.addAlpha()
+        image.alphaFill(1)
+    width, height = image.getXSize(), image.getYSize()
+    if max_size and max(width, height) > max_size:
+        factor = max_size / max(width, height)
+        resized = PNMImage(max(1, int(width * factor)), max(1, int(height * factor)), 4)
+        resized.gaussianFilterFrom(1.0, image)
+        image = resized
+    return image
+
+def blit_extruded(page, image, x, y, padding):
+    """Copy image into page at (x, y), repeating its edge pixels out into the padding"""
+    width, height = image.getXSize(), image.getYSize()
+    page.copySubImage(image, x, y, 0, 0, width, height)
+    # Stretch the edge rows and columns so bilinear and mip sampling never
+    # pulls in a neighbouring sprite
+    for offset in range(1, padding + 1):
+        page.copySubImage(image, x, y - offset, 0, 0, width, 1)
+        page.copySubImage(image, x, y + height - 1 + offset, 0, height - 1, width, 1)
+    for offset in range(1, padding + 1):
+        page.copySubImage(page, x - offset, y - padding, x, y - padding, 1, height + 2 * padding)
+        page.copySubImage(page, x + width - 1 + offset, y - padding,
+                          x + width - 1, y - padding, 1, height + 2 * padding)
+
+@traced("atlas.pack_atlas")
+def pack_atlas(images, page_size=2048, padding=8, max_sprite_size=512):
+    """Shelf-pack images into atlas pages; returns the pages and a region -> UV manifest"""
+    fitted = {name: fit_image(image, max_sprite_size) for name, image in images.items()}
+    # Tallest first keeps shelves tight
+    order = sorted(fitted, key=lambda name: (-fitted[name].getYSize(), -fitted[name].getXSize(), name))
+
+    placements = {}        # name -> (page, x, y) of the image inside its padded cell
+    page_heights = [0]
+    shelf_x = shelf_y = shelf_height = 0
+    for name in order:
+        image = fitted[name]
+        cell_width = align(image.getXSize() + 2 * padding)
+        cell_height = align(image.getYSize() + 2 * padding)
+        if cell_width > page_size or cell_height > page_size:
+            raise ValueError(f"Atlas sprite {name} does not fit a {page_size}px page")
+
+        if shelf_x + cell_width > page_size:
+            shelf_x = 0
+            shelf_y += shelf_height
+            shelf_height = 0
+        if shelf_y + cell_height > page_size:
+            page_heights.append(0)
+            shelf_x = shelf_y = shelf_height = 0
+
+        page = len(page_heights) - 1
+        placements[name] = (page, shelf_x + padding, shelf_y + padding)
+        shelf_x += cell_width
+        shelf_height = max(shelf_height, cell_height)
+        page_heights[page] = max(page_heights[page], shelf_y + cell_height)
+
+    pages = []
+    for used_height in page_heights:
+        page = PNMImage(page_size, next_power_of_two(used_height), 4)
+        page.fill(0, 0, 0)
+        page.alphaFill(0)
+        pages.append(page)
+
+    regions = {}
+    for name, (page_index, x, y) in placements.items():
+        image = fitted[name]
+        page = pages[page_index]
+        blit_extruded(page, image, x, y, padding)
+        page_width, page_height = page.getXSize(), page.getYSize()
+        # Texture V runs bottom-up while image rows run top-down
+        regions[name] = {
+            "page": page_index,
+            "uv": [x / page_width, 1 - (y + image.getYSize()) / page_height,
+                   (x + image.getXSize()) / page_width, 1 - y / page_height],
+        }
+    return pages, regions
+
+class SpriteAtlas:
+    """Named sprite regions on shared atlas pages, loaded cooked or packed at startup"""
+
+    def __init__(self):
+        self.pages = []
+        self.regions = {}
+        self.frames = {}       # flipbook name -> frame region names
+        self.transparency = TransparencyAttrib.MAlpha
+
+    @traced("SpriteAtlas.load")
+    def load(self):
+        """Load the cooked atlas, packing one in memory if none was cooked"""
+        manifest_path = get_resource_path(ATLAS_MANIFEST)
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+                self.pages = [TexturePool.loadTexture(get_resource_path(page)) for page in manifest["pages"]]
+                self.regions = manifest["regions"]
+                self.frames = manifest.get("frames", {})
+                if manifest.get("premultiplied"):
+                    self.transparency = TransparencyAttrib.MPremultipliedAlpha
+                out(f"Loaded atlas with {len(self.regions)} regions on {len(self.pages)} pages", 3)
+                self.alias_flipbooks()
+                return
+            except (OSError, ValueError, KeyError) as e:
+                out(f"Error reading atlas manifest: {e}", 2)
+
+        out("No cooked atlas, packing one at startup (run cook_assets.py to skip this)", 2)
+        images, self.frames = collect_atlas_images(get_resource_path)
+        pages, self.regions = pack_atlas(images)
+        self.pages = []
+        for index, image in enumerate(pages):
+            texture = Texture(f"atlas_{index}")
+            texture.load(image)
+            texture.setWrapU(SamplerState.WM_clamp)
+            texture.setWrapV(SamplerState.WM_clamp)
+            self.pages.append(texture)
+        self.transparency = TransparencyAttrib.MAlpha
+        self.alias_flipbooks()
+
+    def alias_flipbooks(self):
+        """Let a flipbook's name stand for its first frame"""
+        for name, frames in self.frames.items():
+            self.regions.setdefault(name, self.regions[frames[0]])
+
+    def has_region(self, name):
+        """Check whether the atlas holds a region"""
+        return name in self.regions
+
+    def get_region(self, name):
+        """Get the page texture and UV rect (u0, v0, u1, v1) of a region"""
+        region = self.regions[name]
+        return self.pages[region["page"]], tuple(region["uv"])
+
+    def get_frames(self, name):
+        """Get the frame region names of a flipbook; a plain region is one frame"""
+        return self.frames.get(name, [name])
\ No newline at end of file
@@ -0,0 +1,186 @@
+import numpy as np
+from panda3d.core import (GeomVertexArrayFormat, GeomVertexFormat, GeomVertexData,
+                          GeomTriangles, Geom, GeomNode, InternalName,
+                          OmniBoundingVolume, Shader)
+from effects.sprite_batcher import QUAD_CORNERS, QUAD_UVS, WORLD_BIN
+from utils.collision import exit_times
+
+# Floats per vertex: corner offset (3), texcoord (2), spawn position and velocity (4), spawn time (1)
+BULLET_STRIDE = 10
+
+# GLSL 1.20 so the shader also runs on software (Mesa llvmpipe) contexts
+BULLET_VERTEX_SHADER = """
+#version 120
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform float bullet_time;
+attribute vec4 p3d_Vertex;
+attribute vec2 p3d_MultiTexCoord0;
+attribute vec4 spawn;
+attribute float spawn_time;
+varying vec2 texcoord;
+
+void main() {
+    vec2 center = spawn.xy + spawn.zw * (bullet_time - spawn_time);
+    gl_Position = p3d_ModelViewProjectionMatrix *
+                  vec4(center.x + p3d_Vertex.x, 0.0, center.y + p3d_Vertex.z, 1.0);
+    texcoord = p3d_MultiTexCoord0;
+}
+"""
+
+BULLET_FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D p3d_Texture0;
+varying vec2 texcoord;
+
+void main() {
+    gl_FragColor = texture2D(p3d_Texture0, texcoord);
+}
+"""
+
+def make_bullet_format():
+    """Create the vertex format holding each bullet's spawn state"""
+    array_format = GeomVertexArrayFormat()
+    array_format.addColumn(InternalName.getVertex(), 3, Geom.NT_float32, Geom.C_point)
+    array_format.addColumn(InternalName.getTexcoord(), 2, Geom.NT_float32, Geom.C_texcoord)
+    array_format.addColumn(InternalName.make("spawn"), 4, Geom.NT_float32, Geom.C_other)
+    array_format.addColumn(InternalName.make("spawn_time"), 1, Geom.NT_float32, Geom.C_other)
+    return GeomVertexFormat.registerFormat(GeomVertexFormat(array_format))
+
+class GpuBulletRenderer:
+    """Straight-line bullets kept as spawn state and moved by a vertex shader
+
+    The CPU writes a bullet's vertices only when it is spawned or when another
+    bullet is moved into its slot on removal; every frame only the shader's
+    time uniform changes. Live bullets are packed into [0, count).
+    """
+
+    def __init__(self, parent, atlas, region, half_size, bounds, capacity=256):
+        self.half_size = half_size
+        self.bounds = bounds  # (min_x, max_x, min_z, max_z) beyond which bullets expire
+        self.texture, self.uv_rect = atlas.get_region(region)
+        self.capacity = 0
+        self.count = 0
+
+        # Bullet state on the CPU, used for collision and expiry
+        self.spawn_pos = np.zeros((0, 2), dtype=np.float64)
+        self.velocity = np.zeros((0, 2), dtype=np.float64)
+        self.spawn_time = np.zeros(0, dtype=np.float64)
+        self.expire_time = np.zeros(0, dtype=np.float64)
+
+        self.geom = Geom(GeomVertexData("gpu_bullets", make_bullet_format(), Geom.UH_dynamic))
+        self.geom.addPrimitive(GeomTriangles(Geom.UH_static))
+        self.grow(capacity)
+
+        node = GeomNode("gpu_bullets")
+        node.addGeom(self.geom)
+        # Positions only exist on the GPU, so bounds can't be computed here
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+
+        self.node_path = parent.attachNewNode(node)
+        self.node_path.setTexture(self.texture)
+        # Drawn just above the batched world sprites
+        self.node_path.setBin('fixed', WORLD_BIN + 1)
+        self.node_path.setDepthTest(False)
+        self.node_path.setDepthWrite(False)
+        self.node_path.setTwoSided(True)
+        self.node_path.setTransparency(atlas.transparency)
+        self.node_path.setShader(Shader.make(Shader.SL_GLSL, BULLET_VERTEX_SHADER, BULLET_FRAGMENT_SHADER))
+        self.node_path.setShaderInput("bullet_time", 0.0)
+        self.drawn_count = 0
+
+    def get_vertices(self):
+        """Get a writable (capacity, 6, stride) view of the vertex buffer"""
+        vertices = np.frombuffer(memoryview(self.geom.modifyVertexData().modifyArray(0)), dtype=np.float32)
+        return vertices.reshape(self.capacity, 6, BULLET_STRIDE)
+
+    def grow(self, capacity):
+        """Enlarge the bullet arrays and vertex buffer to hold capacity bullets"""
+        old = self.capacity
+        extra = capacity - old
+        for name in ("spawn_pos", "velocity", "spawn_time", "expire_time"):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros((extra,) + column.shape[1:], dtype=column.dtype)]))
+
+        self.geom.modifyVertexData().setNumRows(capacity * 6)
+        self.capacity = capacity
+
+        # Quad corners and UVs never change, so they are written once per slot
+        vertices = self.get_vertices()[old:]
+        u0, v0, u1, v1 = self.uv_rect
+        vertices[:, :, 0] = QUAD_CORNERS[:, 0] * self.half_size
+        vertices[:, :, 1] = 0
+        vertices[:, :, 2] = QUAD_CORNERS[:, 1] * self.half_size
+        vertices[:, :, 3] = u0 + QUAD_UVS[:, 0] * (u1 - u0)
+        vertices[:, :, 4] = v0 + QUAD_UVS[:, 1] * (v1 - v0)
+
+    def write_slot(self, vertices, slot):
+        """Upload one bullet's spawn state to its six vertices"""
+        vertices[slot, :, 5:7] = self.spawn_pos[slot]
+        vertices[slot, :, 7:9] = self.velocity[slot]
+        # Game time in float32 stays millisecond-accurate for hours of play
+        vertices[slot, :, 9] = self.spawn_time[slot]
+
+    def spawn(self, x, z, velocity_x, velocity_z, time):
+        """Fire a bullet from (x, z) at the given velocity in units per second"""
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+        slot = self.count
+        self.count += 1
+
+        self.spawn_pos[slot] = (x, z)
+        self.velocity[slot] = (velocity_x, velocity_z)
+        self.spawn_time[slot] = time
+        self.expire_time[slot] = time + exit_times(self.spawn_pos[slot:slot + 1],
+                                                   self.velocity[slot:slot + 1], self.bounds)[0]
+        self.write_slot(self.get_vertices(), slot)
+        self.set_drawn_count(self.count)
+        return slot
+
+    def positions_at(self, time):
+        """Get every live bullet's position at a time, never before its spawn"""
+        n = self.count
+        elapsed = np.maximum(time - self.spawn_time[:n], 0)[:, None]
+        return self.spawn_pos[:n] + self.velocity[:n] * elapsed
+
+    def expired(self, time):
+        """Get the slots of bullets that have left the bounds by the given time"""
+        return np.flatnonzero(self.expire_time[:self.count] <= time)
+
+    def remove(self, slots):
+        """Remove bullets by slot, moving the last bullets into the freed slots"""
+        vertices = None
+        for slot in sorted(set(int(slot) for slot in slots), reverse=True):
+            last = self.count - 1
+            if slot != last:
+                for column in (self.spawn_pos, self.velocity, self.spawn_time, self.expire_time):
+                    column[slot] = column[last]
+                if vertices is None:
+                    vertices = self.get_vertices()
+                self.write_slot(vertices, slot)
+            self.count = last
+        self.set_drawn_count(self.count)
+
+    def set_time(self, time):
+        """Move every bullet on the GPU to the given clock time"""
+        self.node_path.setShaderInput("bullet_time", time)
+
+    def set_drawn_count(self, count):
+        """Draw the first count bullets"""
+        if count == self.drawn_count:
+            return
+        primitive = self.geom.modifyPrimitive(0)
+        primitive.clearVertices()
+        if count:
+            primitive.addConsecutiveVertices(0, count * 6)
+        self.drawn_count = count
+
+    def clear(self):
+        """Remove every bullet"""
+        self.count = 0
+        self.set_drawn_count(0)
+
+    def destroy(self):
+        """Remove the renderer from the scene graph"""
+        self.clear()
+        self.node_path.removeNode()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import math
+import numpy as np
+from panda3d.core import Geom, GeomVertexData, GeomTriangles, GeomNode, OmniBoundingVolume
+from effects.sprite_batcher import make_vertex_format, QUAD_CORNERS, QUAD_UVS, VERTEX_STRIDE
+
+class ExplosionRenderer:
+    """Draws every live explosion from one dynamic vertex buffer in a single call"""
+
+    def __init__(self, parent, atlas, capacity=256):
+        self.capacity = capacity
+        self.count = 0
+
+        # Normal and AoE explosions are separate regions on one atlas page
+        texture, normal_uv = atlas.get_region("explosion")
+        aoe_texture, aoe_uv = atlas.get_region("explosion_aoe")
+        if aoe_texture is not texture:
+            raise ValueError("Explosion atlas regions must share a page")
+        self.uv_rects = np.array([normal_uv, aoe_uv], dtype=np.float32)
+
+        # Per-explosion state; live explosions are packed into [0, count)
+        self.start_time = np.zeros(capacity, dtype=np.float64)
+        self.duration = np.zeros(capacity, dtype=np.float32)
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.initial_rotation = np.zeros(capacity, dtype=np.float32)
+        self.rotation_speed = np.zeros(capacity, dtype=np.float32)
+        self.is_aoe = np.zeros(capacity, dtype=bool)
+        # NaN start/end scale means the default pulse curve is used
+        self.start_scale = np.full(capacity, np.nan, dtype=np.float32)
+        self.end_scale = np.full(capacity, np.nan, dtype=np.float32)
+
+        # Vertex buffer sized for the full capacity, written in place every frame
+        vdata = GeomVertexData("explosions", make_vertex_format(), Geom.UH_dynamic)
+        vdata.uncleanSetNumRows(capacity * 6)
+        self.geom = Geom(vdata)
+        self.geom.addPrimitive(GeomTriangles(Geom.UH_dynamic))
+        node = GeomNode("explosions")
+        node.addGeom(self.geom)
+        # Explosions move every frame, so skip recomputing bounds for culling
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+
+        self.node_path = parent.attachNewNode(node)
+        self.node_path.setTexture(texture)
+        self.node_path.setBin('fixed', 100)
+        self.node_path.setDepthTest(False)
+        self.node_path.setDepthWrite(False)
+        self.node_path.setTwoSided(True)
+        self.node_path.setTransparency(atlas.transparency)
+        self.drawn_count = 0
+
+    def add(self, pos_x, pos_y, start_time, duration, initial_rotation, rotation_speed,
+            is_aoe=False, start_scale=None, end_scale=None):
+        """Add an explosion, replacing the oldest one when the buffer is full"""
+        if self.count < self.capacity:
+            index = self.count
+            self.count += 1
+        else:
+            index = int(np.argmin(self.start_time))
+
+        self.start_time[index] = start_time
+        self.duration[index] = duration
+        self.pos[index] = (pos_x, pos_y)
+        self.initial_rotation[index] = initial_rotation
+        self.rotation_speed[index] = rotation_speed
+        self.is_aoe[index] = is_aoe
+        self.start_scale[index] = np.nan if start_scale is None else start_scale
+        self.end_scale[index] = np.nan if end_scale is None else end_scale
+
+    def update(self, current_time):
+        """Expire finished explosions and rewrite the vertex buffer"""
+        n = self.count
+        if n == 0 and self.drawn_count == 0:
+            return
+
+        # Drop expired explosions by packing the survivors to the front
+        age = current_time - self.start_time[:n]
+        alive = age <= self.duration[:n]
+        if not alive.all():
+            n = int(alive.sum())
+            for column in (self.start_time, self.duration, self.pos, self.initial_rotation,
+                           self.rotation_speed, self.is_aoe, self.start_scale, self.end_scale):
+                column[:n] = column[:self.count][alive]
+            age = age[alive]
+            self.count = n
+
+        if n == 0:
+            self.set_drawn_count(0)
+            return
+
+        progress = (age / self.duration[:n]).astype(np.float32)
+        is_aoe = self.is_aoe[:n]
+
+        # Default pulse: grow and shrink along a half sine
+        pulse = np.sin(progress * math.pi) * 0.5 + 0.5
+        scale = np.where(is_aoe, 0.4 + 0.8 * pulse, 0.3 + 0.6 * pulse)
+
+        # Custom scaling eases in over the first half and out over the second
+        start_scale = self.start_scale[:n]
+        custom = ~np.isnan(start_scale)
+        if custom.any():
+            span = self.end_scale[:n] - start_scale
+            late = progress * 2 - 1
+            eased = np.where(progress < 0.5,
+                             2 * progress * progress,
+                             1 - 0.5 * (1 - late) * (1 - late))
+            scale = np.where(custom, start_scale + span * eased, scale)
+
+        half_size = np.where(is_aoe, 0.3, 0.2) * scale
+        rotation = np.radians(self.initial_rotation[:n] + self.rotation_speed[:n] * age)
+
+        intensity = 1.0 - (progress - 0.3) / 0.7 + np.sin(progress * 20) * 0.1
+        alpha = np.where(progress < 0.3, 1.0, np.clip(intensity, 0, 1))
+
+        # Rotate and scale the quad corners of every explosion at once
+        cos_r = (np.cos(rotation) * half_size)[:, None]
+        sin_r = (np.sin(rotation) * half_size)[:, None]
+        corner_x = QUAD_CORNERS[:, 0]
+        corner_y = QUAD_CORNERS[:, 1]
+
+        vertices = np.frombuffer(memoryview(self.geom.modifyVertexData().modifyArray(0)), dtype=np.float32)
+        vertices = vertices.reshape(self.capacity * 6, VERTEX_STRIDE)[:n * 6].reshape(n, 6, VERTEX_STRIDE)
+        vertices[:, :, 0] = self.pos[:n, 0, None] + corner_x * cos_r - corner_y * sin_r
+        vertices[:, :, 1] = 0
+        vertices[:, :, 2] = self.pos[:n, 1, None] + corner_x * sin_r + corner_y * cos_r
+        vertices[:, :, 3:6] = 1
+        vertices[:, :, 6] = alpha[:, None]
+        uv = self.uv_rects[is_aoe.astype(np.intp)]
+        vertices[:, :, 7] = uv[:, 0, None] + QUAD_UVS[:, 0] * (uv[:, 2] - uv[:, 0])[:, None]
+        vertices[:, :, 8] = uv[:, 1, None] + QUAD_UVS[:, 1] * (uv[:, 3] - uv[:, 1])[:, None]
+
+        self.set_drawn_count(n)
+
+    def set_drawn_count(self, n):
+        """Draw the first n quads of the vertex buffer"""
+        if n == self.drawn_count:
+            return
+        primitive = self.geom.modifyPrimitive(0)
+        primitive.clearVertices()
+        if n:
+            primitive.addConsecutiveVertices(0, n * 6)
+        self.drawn_count = n
+
+    def clear(self):
+        """Remove every explosion"""
+        self.count = 0
+        self.set_drawn_count(0)
+
+    def destroy(self):
+        """Remove the renderer from the scene graph"""
+        self.clear()
+        self.node_path.removeNode()
\ No newline at end of file
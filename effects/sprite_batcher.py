@@ -0,0 +1,331 @@
+import numpy as np
+from panda3d.core import (GeomVertexArrayFormat, GeomVertexFormat, GeomVertexData,
+                          GeomTriangles, Geom, GeomNode, InternalName,
+                          OmniBoundingVolume, TransparencyAttrib)
+
+# Unit quad corners as two triangles, and the matching UVs within a UV rect
+QUAD_CORNERS = np.array([(-1, -1), (1, -1), (1, 1), (-1, -1), (1, 1), (-1, 1)], dtype=np.float32)
+QUAD_UVS = np.array([(0, 0), (1, 0), (1, 1), (0, 0), (1, 1), (0, 1)], dtype=np.float32)
+
+# Floats per vertex: position (3), color (4), texcoord (2)
+VERTEX_STRIDE = 9
+
+# Draw bins shared by atlas sprites; layers order sprites within a bin
+WORLD_BIN = 10      # Enemies, boss, projectiles, player and orbs
+EFFECTS_BIN = 100   # Dash and death effects drawn over the world
+
+def make_vertex_format():
+    """Create the interleaved position/color/texcoord vertex format"""
+    array_format = GeomVertexArrayFormat()
+    array_format.addColumn(InternalName.getVertex(), 3, Geom.NT_float32, Geom.C_point)
+    array_format.addColumn(InternalName.getColor(), 4, Geom.NT_float32, Geom.C_color)
+    array_format.addColumn(InternalName.getTexcoord(), 2, Geom.NT_float32, Geom.C_texcoord)
+    return GeomVertexFormat.registerFormat(GeomVertexFormat(array_format))
+
+class BatchSprite:
+    """Handle to one batched sprite, offering the NodePath calls sprites need"""
+    __slots__ = ("batcher", "index", "tags")
+
+    def __init__(self, batcher, index):
+        self.batcher = batcher
+        self.index = index
+        self.tags = {}
+
+    def __bool__(self):
+        return self.index is not None
+
+    @property
+    def row(self):
+        """Get the sprite's row, refusing a removed sprite like an empty NodePath would"""
+        if self.index is None:
+            raise AssertionError("BatchSprite has been removed")
+        return self.index
+
+    def setPos(self, x, y, z):
+        row = self.row
+        self.batcher.x[row] = x
+        self.batcher.z[row] = z
+
+    def getPos(self):
+        row = self.row
+        return (float(self.batcher.x[row]), 0.0, float(self.batcher.z[row]))
+
+    def setScale(self, sx, sy=None, sz=None):
+        row = self.row
+        self.batcher.scale_x[row] = sx
+        self.batcher.scale_z[row] = sx if sz is None else sz
+
+    def getScale(self):
+        row = self.row
+        return (float(self.batcher.scale_x[row]), 1.0, float(self.batcher.scale_z[row]))
+
+    def setR(self, r):
+        self.batcher.rotation[self.row] = r
+
+    def setPosHprScale(self, x, y, z, h, p, r, sx, sy, sz):
+        self.setPos(x, y, z)
+        self.setR(r)
+        self.setScale(sx, sy, sz)
+
+    def setColorScale(self, r, g, b, a):
+        self.batcher.color[self.row] = (r, g, b, a)
+
+    def setAlphaScale(self, a):
+        self.batcher.color[self.row, 3] = a
+
+    def clearColorScale(self):
+        self.batcher.color[self.row] = 1
+
+    def setUvRect(self, u0, v0, u1, v1):
+        self.batcher.uv[self.row] = (u0, v0, u1, v1)
+
+    def show(self):
+        self.batcher.shown[self.row] = True
+
+    def hide(self):
+        self.batcher.shown[self.row] = False
+
+    def stash(self):
+        self.batcher.stashed[self.row] = True
+
+    def unstash(self):
+        self.batcher.stashed[self.row] = False
+
+    def isStashed(self):
+        return bool(self.batcher.stashed[self.row])
+
+    def setPythonTag(self, key, value):
+        self.tags[key] = value
+
+    def getPythonTag(self, key):
+        return self.tags.get(key)
+
+    def removeNode(self):
+        if self.index is not None:
+            self.batcher.free_sprite(self.index)
+            self.index = None
+
+class SpriteGroup:
+    """All sprites sharing one texture and draw order, drawn from one vertex buffer"""
+
+    def __init__(self, parent, group_id, texture, draw_order, transparency):
+        self.group_id = group_id
+        self.capacity = 0
+        self.drawn_count = 0
+        self.layered = False  # Set once sprites on different layers share the group
+        self.first_layer = None
+
+        self.geom = Geom(GeomVertexData("sprites", make_vertex_format(), Geom.UH_dynamic))
+        self.geom.addPrimitive(GeomTriangles(Geom.UH_dynamic))
+        node = GeomNode(f"sprite_batch_{group_id}")
+        node.addGeom(self.geom)
+        # Sprites move every frame, so skip recomputing bounds for culling
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+
+        self.node_path = parent.attachNewNode(node)
+        self.node_path.setTexture(texture)
+        self.node_path.setBin('fixed', draw_order)
+        self.node_path.setDepthTest(False)
+        self.node_path.setDepthWrite(False)
+        self.node_path.setTwoSided(True)
+        self.node_path.setTransparency(transparency)
+
+    def get_vertices(self, count):
+        """Get a writable (count, 6, stride) view of the vertex buffer"""
+        vdata = self.geom.modifyVertexData()
+        if count > self.capacity:
+            self.capacity = max(count, self.capacity * 2, 64)
+            vdata.uncleanSetNumRows(self.capacity * 6)
+        vertices = np.frombuffer(memoryview(vdata.modifyArray(0)), dtype=np.float32)
+        return vertices[:count * 6 * VERTEX_STRIDE].reshape(count, 6, VERTEX_STRIDE)
+
+    def set_drawn_count(self, count):
+        """Draw the first count quads of the vertex buffer"""
+        if count == self.drawn_count:
+            return
+        primitive = self.geom.modifyPrimitive(0)
+        primitive.clearVertices()
+        if count:
+            primitive.addConsecutiveVertices(0, count * 6)
+        self.drawn_count = count
+
+class SpriteBatcher:
+    """Collects every dynamic 2D sprite and draws them in one batch per texture and bin"""
+
+    def __init__(self, parent, atlas, camera=None, capacity=256):
+        self.parent = parent
+        self.atlas = atlas
+        self.camera = camera    # Sprites outside this camera's view are culled
+        self.capacity = 0
+        self.free_slots = []
+        self.groups = {}        # (texture, draw order) -> SpriteGroup
+        self.group_list = []
+
+        # Per-sprite state in parallel arrays, indexed by sprite slot
+        self.x = np.zeros(0, dtype=np.float32)
+        self.z = np.zeros(0, dtype=np.float32)
+        self.half_width = np.zeros(0, dtype=np.float32)
+        self.half_height = np.zeros(0, dtype=np.float32)
+        self.scale_x = np.zeros(0, dtype=np.float32)
+        self.scale_z = np.zeros(0, dtype=np.float32)
+        self.rotation = np.zeros(0, dtype=np.float32)
+        self.layer = np.zeros(0, dtype=np.int16)
+        self.color = np.zeros((0, 4), dtype=np.float32)
+        self.uv = np.zeros((0, 4), dtype=np.float32)
+        self.group = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.shown = np.zeros(0, dtype=bool)
+        self.stashed = np.zeros(0, dtype=bool)
+        self.grow(capacity)
+
+        self.visible_count = 0
+        self.culled_count = 0
+        # (min_x, max_x, min_z, max_z) in parent space, set each update; until then, or
+        # without a camera, what a default 2x2 film centred on the parent sees
+        self.view_bounds = (-1.0, 1.0, -1.0, 1.0)
+
+    def grow(self, capacity):
+        """Enlarge the per-sprite arrays to hold capacity sprites"""
+        old = self.capacity
+        extra = capacity - old
+        for name in ("x", "z", "half_width", "half_height", "scale_x", "scale_z",
+                     "rotation", "layer", "color", "uv", "group", "alive", "shown", "stashed"):
+            column = getattr(self, name)
+            padding = np.zeros((extra,) + column.shape[1:], dtype=column.dtype)
+            setattr(self, name, np.concatenate([column, padding]))
+        self.free_slots.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+
+    def get_group(self, texture, draw_order, transparency):
+        """Get the group for a texture and draw order, creating it on first use"""
+        key = (texture, draw_order)
+        group = self.groups.get(key)
+        if group is None:
+            group = SpriteGroup(self.parent, len(self.group_list), texture, draw_order, transparency)
+            self.groups[key] = group
+            self.group_list.append(group)
+        return group
+
+    def create_sprite(self, region, half_width, half_height=None, draw_order=WORLD_BIN, layer=0):
+        """Create a sprite showing a named atlas region, returning its handle"""
+        texture, uv_rect = self.atlas.get_region(region)
+        return self.create_texture_sprite(texture, half_width, half_height, draw_order, layer,
+                                          self.atlas.transparency, uv_rect)
+
+    def create_texture_sprite(self, texture, half_width, half_height=None, draw_order=WORLD_BIN,
+                              layer=0, transparency=TransparencyAttrib.MAlpha, uv_rect=(0, 0, 1, 1)):
+        """Create a sprite quad with its own texture, for images outside the atlas"""
+        if not self.free_slots:
+            self.grow(self.capacity * 2)
+        index = self.free_slots.pop()
+        group = self.get_group(texture, draw_order, transparency)
+        if group.first_layer is None:
+            group.first_layer = layer
+        elif layer != group.first_layer:
+            group.layered = True
+
+        self.x[index] = 0
+        self.z[index] = 0
+        self.half_width[index] = half_width
+        self.half_height[index] = half_width if half_height is None else half_height
+        self.scale_x[index] = 1
+        self.scale_z[index] = 1
+        self.rotation[index] = 0
+        self.layer[index] = layer
+        self.color[index] = 1
+        self.uv[index] = uv_rect
+        self.group[index] = group.group_id
+        self.alive[index] = True
+        self.shown[index] = True
+        self.stashed[index] = False
+        return BatchSprite(self, index)
+
+    def free_sprite(self, index):
+        """Release a sprite slot for reuse"""
+        self.alive[index] = False
+        self.free_slots.append(index)
+
+    def update_view_bounds(self):
+        """Get the region of the parent seen through the camera's lens"""
+        if self.camera is None:
+            return None
+        lens = self.camera.node().getLens()
+        film = lens.getFilmSize()
+        offset = lens.getFilmOffset()
+        center = self.camera.getPos(self.parent)
+        center_x = center.x + offset.x
+        center_z = center.z + offset.y
+        self.view_bounds = (center_x - film.x / 2, center_x + film.x / 2,
+                            center_z - film.y / 2, center_z + film.y / 2)
+        return self.view_bounds
+
+    def get_culled(self, candidates):
+        """Find which sprites of a mask lie entirely outside the view"""
+        bounds = self.update_view_bounds()
+        if bounds is None:
+            return np.zeros_like(candidates)
+        # A circle around the quad covers it at any rotation
+        reach = np.hypot(self.half_width * np.abs(self.scale_x), self.half_height * np.abs(self.scale_z))
+        return candidates & ((self.x + reach < bounds[0]) | (self.x - reach > bounds[1]) |
+                             (self.z + reach < bounds[2]) | (self.z - reach > bounds[3]))
+
+    def update(self):
+        """Write every visible sprite into its group's vertex buffer"""
+        drawable = self.alive & self.shown & ~self.stashed
+        # Off-screen sprites keep their state but skip building vertices
+        culled = self.get_culled(drawable)
+        self.culled_count = int(culled.sum())
+        drawable &= ~culled
+        self.visible_count = 0
+
+        for group in self.group_list:
+            indices = np.flatnonzero(drawable & (self.group == group.group_id))
+            count = len(indices)
+            if group.layered and count:
+                # Draw lower layers first so they end up underneath
+                indices = indices[np.argsort(self.layer[indices], kind='stable')]
+            if count:
+                self.write_group(group, indices)
+            group.set_drawn_count(count)
+            self.visible_count += count
+
+    def write_group(self, group, indices):
+        """Build the quads for the given sprites into a group's buffer"""
+        count = len(indices)
+        half_w = (self.half_width[indices] * self.scale_x[indices])[:, None]
+        half_h = (self.half_height[indices] * self.scale_z[indices])[:, None]
+        # Positive roll turns clockwise on screen, as with NodePath.setR
+        angle = np.radians(-self.rotation[indices])
+        cos_r = np.cos(angle)[:, None]
+        sin_r = np.sin(angle)[:, None]
+        local_x = QUAD_CORNERS[:, 0] * half_w
+        local_z = QUAD_CORNERS[:, 1] * half_h
+        uv = self.uv[indices]
+
+        vertices = group.get_vertices(count)
+        vertices[:, :, 0] = self.x[indices, None] + local_x * cos_r - local_z * sin_r
+        vertices[:, :, 1] = 0
+        vertices[:, :, 2] = self.z[indices, None] + local_x * sin_r + local_z * cos_r
+        vertices[:, :, 3:7] = self.color[indices, None, :]
+        vertices[:, :, 7] = uv[:, 0, None] + QUAD_UVS[:, 0] * (uv[:, 2] - uv[:, 0])[:, None]
+        vertices[:, :, 8] = uv[:, 1, None] + QUAD_UVS[:, 1] * (uv[:, 3] - uv[:, 1])[:, None]
+
+    def get_stats(self):
+        """Get sprite and draw call counts"""
+        return {
+            "sprites": int(self.alive.sum()),
+            "visible": self.visible_count,
+            "culled": self.culled_count,
+            "groups": len(self.group_list),
+            "draw_calls": sum(1 for group in self.group_list if group.drawn_count),
+        }
+
+    def cleanup(self):
+        """Remove every batch from the scene graph"""
+        for group in self.group_list:
+            group.node_path.removeNode()
+        self.groups.clear()
+        self.group_list.clear()
+        self.alive[:] = False
+        self.free_slots = list(range(self.capacity - 1, -1, -1))
\ No newline at end of file
@@ -0,0 +1,216 @@
+import math
+import random
+from panda3d.core import PNMImage
+from utils.tracer import traced
+
+@traced("texture_factory.make_explosion_image")
+def make_explosion_image(size=128, is_aoe=False, seed=0):
+    """Create the explosion sprite image (orange, or blue-white for AoE)"""
+    rng = random.Random(seed)
+    image = PNMImage(size, size, 4)
+    center_x = size // 2
+    center_y = size // 2
+    radius = size // 2
+
+    image.fill(0, 0, 0)
+    image.alphaFill(0)
+
+    for x in range(size):
+        for y in range(size):
+            dx = x - center_x
+            dy = y - center_y
+            distance = math.sqrt(dx*dx + dy*dy)
+            if distance <= radius:
+                intensity = 1.0 - (distance / radius)
+                noise = rng.uniform(0.8, 1.0)
+                intensity = intensity * noise
+
+                if is_aoe:
+                    # Blue-white explosion for AoE
+                    if distance < radius * 0.3:
+                        image.setXel(x, y, 0.9, 0.95, 1.0)  # White-blue core
+                    elif distance < radius * 0.6:
+                        image.setXel(x, y, 0.4, 0.6, 1.0)  # Bright blue
+                    else:
+                        image.setXel(x, y, 0.2, 0.4, 0.8)  # Darker blue
+                else:
+                    # Original orange explosion
+                    if distance < radius * 0.3:
+                        image.setXel(x, y, 1.0, 1.0, 0.7)
+                    elif distance < radius * 0.6:
+                        image.setXel(x, y, 1.0, 0.5, 0.0)
+                    else:
+                        image.setXel(x, y, 1.0, 0.2, 0.0)
+
+                if distance > radius * 0.7:
+                    edge_factor = 1.0 - ((distance - radius * 0.7) / (radius * 0.3))
+                    intensity *= edge_factor
+
+                image.setAlpha(x, y, intensity)
+
+    return image
+
+@traced("texture_factory.make_final_explosion_image")
+def make_final_explosion_image(size=256):
+    """Create the boss final explosion image"""
+    image = PNMImage(size, size, 4)
+    center_x = size // 2
+    center_y = size // 2
+    radius = size // 2
+
+    for x in range(size):
+        for y in range(size):
+            dx = x - center_x
+            dy = y - center_y
+            distance = math.sqrt(dx*dx + dy*dy)
+            if distance <= radius:
+                intensity = 1.0 - (distance / radius)
+                intensity = intensity ** 0.5
+
+                if distance < radius * 0.3:
+                    # Bright white-red core
+                    image.setXel(x, y, 1.0, 0.9, 0.9)
+                elif distance < radius * 0.6:
+                    # Bright red-white middle with blue tint
+                    image.setXel(x, y, 1.0, 0.7, 0.9)
+                else:
+                    # Red-blue outer
+                    image.setXel(x, y, 0.8, 0.4, 1.0)
+
+                image.setAlpha(x, y, intensity)
+            else:
+                image.setAlpha(x, y, 0)
+
+    return image
+
+@traced("texture_factory.make_orb_image")
+def make_orb_image(color, size=128, glow=1.0):
+    """Create a glowing orb image tinted with the given color and glow strength"""
+    image = PNMImage(size, size, 4)
+    center_x = size // 2
+    center_y = size // 2
+    radius = size // 2
+
+    for x in range(size):
+        for y in range(size):
+            dx = x - center_x
+            dy = y - center_y
+            distance = math.sqrt(dx*dx + dy*dy)
+            if distance <= radius:
+                intensity = 1.0 - (distance / radius)
+                intensity = intensity ** 0.5
+
+                if distance < radius * 0.3:
+                    # White-tinted center
+                    image.setXel(x, y,
+                        0.8 + 0.2 * color[0],
+                        0.8 + 0.2 * color[1],
+                        0.8 + 0.2 * color[2])
+                    image.setAlpha(x, y, 1.0)
+                else:
+                    # Colored glow
+                    image.setXel(x, y,
+                        0.2 * glow * color[0],
+                        0.2 * glow * color[1],
+                        0.2 * glow * color[2])
+                    image.setAlpha(x, y, min(1.0, intensity * 1.5 * glow))
+            else:
+                image.setAlpha(x, y, 0)
+
+    return image
+
+@traced("texture_factory.make_dash_arc_image")
+def make_dash_arc_image(size=128):
+    """Create the quarter-circle arc image shown while dashing"""
+    image = PNMImage(size, size, 4)
+    center_x = size // 2
+    center_y = size // 2
+    radius = size // 2
+
+    for x in range(size):
+        for y in range(size):
+            dx = x - center_x
+            dy = y - center_y
+            distance = math.sqrt(dx*dx + dy*dy)
+            angle = math.atan2(dy, dx)
+
+            if distance <= radius and 0 <= angle <= math.pi/2:
+                intensity = 1.0 - (distance / radius)
+                intensity = intensity ** 0.3
+                image.setXel(x, y, 0.9, 0.95, 1.0)
+                image.setAlpha(x, y, intensity)
+            else:
+                image.setAlpha(x, y, 0)
+
+    return image
+
+@traced("texture_factory.make_dash_glow_image")
+def make_dash_glow_image(size=128):
+    """Create the soft glow image shown around the player while dashing"""
+    image = PNMImage(size, size, 4)
+    center_x = size // 2
+    center_y = size // 2
+    radius = size // 2
+
+    for x in range(size):
+        for y in range(size):
+            dx = x - center_x
+            dy = y - center_y
+            distance = math.sqrt(dx*dx + dy*dy)
+
+            if distance <= radius:
+                intensity = 1.0 - (distance / radius)
+                intensity = intensity ** 1.5
+                image.setXel(x, y, 0.8, 0.9, 1.0)
+                image.setAlpha(x, y, intensity * 0.9)
+            else:
+                image.setAlpha(x, y, 0)
+
+    return image
+
+@traced("texture_factory.make_trail_particle_image")
+def make_trail_particle_image(size=64):
+    """Create the dash trail particle image"""
+    image = PNMImage(size, size, 4)
+    center_x = size // 2
+    center_y = size // 2
+    radius = size // 2
+
+    for x in range(size):
+        for y in range(size):
+            dx = x - center_x
+            dy = y - center_y
+            distance = math.sqrt(dx*dx + dy*dy)
+
+            if distance <= radius:
+                intensity = 1.0 - (distance / radius)
+                intensity = intensity ** 0.5
+                image.setXel(x, y, 0.7, 0.85, 1.0)
+                image.setAlpha(x, y, intensity * 0.8)
+            else:
+                image.setAlpha(x, y, 0)
+
+    return image
+
+# Every procedural texture the game uses, by name. The asset cooker packs
+# these into the sprite atlas, and the runtime packs them itself when no
+# cooked atlas exists.
+PROCEDURAL_TEXTURES = {
+    "explosion": lambda: make_explosion_image(128, is_aoe=False),
+    "explosion_aoe": lambda: make_explosion_image(128, is_aoe=True),
+    "final_explosion": lambda: make_final_explosion_image(256),
+    "dash_arc": lambda: make_dash_arc_image(128),
+    "dash_glow": lambda: make_dash_glow_image(128),
+    "trail_particle": lambda: make_trail_particle_image(64),
+}
+
+def orb_glow_cycle(frames=8):
+    """Glow strengths for one shimmer cycle of the orb flipbook"""
+    return [0.75 + 0.25 * math.cos(2 * math.pi * i / frames) for i in range(frames)]
+
+# Procedural flipbooks, by name: each builds the list of its frame images.
+# The atlas stores frame i as region "<name>_<i>" and the name itself as frame 0.
+PROCEDURAL_FRAMES = {
+    "green_orb": lambda: [make_orb_image((0, 1, 0), 64, glow) for glow in orb_glow_cycle()],
+    "blue_orb": lambda: [make_orb_image((0, 0, 1), 64, glow) for glow in orb_glow_cycle()],
+}
\ No newline at end of file
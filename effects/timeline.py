@@ -0,0 +1,125 @@
+import math
+from bisect import bisect_right
+
+# Easing curves map segment progress in [0, 1] to interpolation weight in [0, 1]
+EASINGS = {
+    "linear": lambda t: t,
+    "step": lambda t: 0.0,
+    "quad_in": lambda t: t * t,
+    "quad_out": lambda t: 1.0 - (1.0 - t) * (1.0 - t),
+    "quad_in_out": lambda t: 2 * t * t if t < 0.5 else 1.0 - 2 * (1.0 - t) * (1.0 - t),
+    "sine_in": lambda t: 1.0 - math.cos(t * math.pi / 2),
+    "sine_out": lambda t: math.sin(t * math.pi / 2),
+    "sine_in_out": lambda t: 0.5 - 0.5 * math.cos(t * math.pi),
+}
+
+class Track:
+    """A keyframed property that is pushed to a setter as the timeline advances"""
+
+    def __init__(self, setter, keyframes, easing="linear", loop=False):
+        # Keyframes are (time, value) or (time, value, easing); the easing of a
+        # keyframe shapes the segment that leads into it
+        self.setter = setter
+        self.times = [keyframe[0] for keyframe in keyframes]
+        self.values = [keyframe[1] for keyframe in keyframes]
+        self.easings = [EASINGS[keyframe[2] if len(keyframe) > 2 else easing] for keyframe in keyframes]
+        self.duration = self.times[-1]
+        self.loop = loop
+
+    def evaluate(self, t):
+        """Get the track value at time t"""
+        if self.loop and self.duration > 0:
+            t %= self.duration
+
+        index = bisect_right(self.times, t)
+        if index == 0:
+            return self.values[0]
+        if index >= len(self.times):
+            return self.values[-1]
+
+        start_time = self.times[index - 1]
+        weight = self.easings[index]((t - start_time) / (self.times[index] - start_time))
+        start = self.values[index - 1]
+        end = self.values[index]
+
+        if isinstance(start, tuple):
+            return tuple(a + (b - a) * weight for a, b in zip(start, end))
+        return start + (end - start) * weight
+
+    def apply(self, t):
+        """Push the track value at time t to its setter"""
+        self.setter(self.evaluate(t))
+
+class Timeline:
+    """A set of tracks and marker callbacks evaluated on a shared clock"""
+
+    def __init__(self, name, duration=None, loop=False, pausable=True, on_finish=None):
+        self.name = name
+        self.duration = duration
+        self.loop = loop
+        self.pausable = pausable  # Freeze while the game is paused
+        self.on_finish = on_finish
+        self.tracks = []
+        self.markers = []
+        self.next_marker = 0
+        self.time = 0.0
+        self.finished = False
+
+    def add_track(self, setter, keyframes, easing="linear", loop=False):
+        """Add a keyframed property track"""
+        track = Track(setter, keyframes, easing, loop)
+        self.tracks.append(track)
+        return track
+
+    def add_marker(self, time, callback):
+        """Call callback once when the timeline passes the given time"""
+        self.markers.append((time, callback))
+        self.markers.sort(key=lambda marker: marker[0])
+
+    def get_duration(self):
+        """Get the timeline length, defaulting to its longest non-looping track"""
+        if self.duration is not None:
+            return self.duration
+        ends = [track.duration for track in self.tracks if not track.loop]
+        ends.extend(marker[0] for marker in self.markers)
+        return max(ends) if ends else 0.0
+
+    def reset(self):
+        """Rewind the timeline to its start"""
+        self.time = 0.0
+        self.next_marker = 0
+        self.finished = False
+
+    def advance(self, dt):
+        """Advance by dt seconds; returns False once the timeline has finished"""
+        if self.finished:
+            return False
+
+        duration = self.get_duration()
+        self.time += dt
+        if not self.loop and duration > 0:
+            self.time = min(self.time, duration)
+
+        for track in self.tracks:
+            track.apply(self.time)
+
+        # Fire every marker passed this step, in order
+        while (self.next_marker < len(self.markers) and
+               self.markers[self.next_marker][0] <= self.time):
+            callback = self.markers[self.next_marker][1]
+            self.next_marker += 1
+            callback()
+            if self.finished:
+                return False
+
+        if duration > 0 and self.time >= duration:
+            if self.loop:
+                self.time -= duration
+                self.next_marker = 0
+            else:
+                self.finished = True
+                if self.on_finish:
+                    self.on_finish()
+                return False
+
+        return True
\ No newline at end of file
@@ -1,6 +1,3 @@
-from panda3d.core import CardMaker, TransparencyAttrib
-from utils.resource_loader import get_resource_path
-
 class Boss:
     def __init__(self, game, position):
         self.game = game
@@ -9,13 +6,9 @@ class Boss:
         self.speed_multiplier = 0.5
         
         # Create boss sprite
-        cm = CardMaker("boss")
         self.size = 0.3  # Boss is larger than regular enemies
-        cm.setFrame(-self.size, self.size, -self.size, self.size)
-        self.sprite = game.render2d.attachNewNode(cm.generate())
-        boss_tex = game.loader.loadTexture(get_resource_path("boss1.png"))
-        self.sprite.setTexture(boss_tex)
-        self.sprite.setTransparency(TransparencyAttrib.MAlpha)
+        self.sprite = game.sprite_batcher.create_sprite("boss", self.size, layer=1)
+        game.animation_system.play(self.sprite, "boss_idle")
         self.update_position()
 
     def update_position(self):
@@ -65,4 +58,5 @@ class Boss:
     def cleanup(self):
         """Clean up boss resources"""
         if self.sprite:
+            self.game.animation_system.stop(self.sprite)
             self.sprite.removeNode()
\ No newline at end of file
@@ -1,12 +1,8 @@
-from direct.showbase.ShowBase import ShowBase
-from panda3d.core import CardMaker, TransparencyAttrib, TextureStage
-from utils.resource_loader import get_resource_path
-
 class Player:
     def __init__(self, game):
         self.game = game
         self.pos = [0, 0]
-        self.movement_speed = 0.02
+        self.movement_speed = 1.2  # Units per second
         self.is_invincible = False
         self.invincibility_duration = 1.5
         self.invincibility_start_time = 0
@@ -14,7 +10,7 @@ class Player:
 
         # Dash properties
         self.dash_cooldown = 3
-        self.last_dash_time = 0
+        self.last_dash_time = -self.dash_cooldown  # Ready from the start
         self.dash_distance = 0.6
         self.is_dashing = False
         self.dash_duration = 0.15
@@ -23,13 +19,9 @@ class Player:
         self.dash_target_pos = None
         
         # Create player sprite
-        cm = CardMaker("player")
         player_size = 0.035
-        cm.setFrame(-player_size, player_size, -player_size, player_size)
-        self.sprite = game.render2d.attachNewNode(cm.generate())
-        player_tex = game.loader.loadTexture(get_resource_path("player.png"))
-        self.sprite.setTexture(player_tex)
-        self.sprite.setTransparency(TransparencyAttrib.MAlpha)
+        self.sprite = game.sprite_batcher.create_sprite("player", player_size, layer=3)
+        game.animation_system.play(self.sprite, "player_idle")
         self.sprite.setScale(game.aspect_ratio, 1, 2.5)
 
     def update_position(self, dx, dy):
@@ -51,4 +43,5 @@ class Player:
     def cleanup(self):
         """Clean up player resources"""
         if self.sprite:
+            self.game.animation_system.stop(self.sprite)
             self.sprite.removeNode()
\ No newline at end of file
@@ -0,0 +1,86 @@
+from utils.debug import out
+
+class SpritePool:
+    """Reusable batched sprites, kept stashed while free"""
+
+    def __init__(self, game):
+        self.game = game
+        self.kinds = {}        # kind -> (size, atlas region, layer)
+        self.free = {}         # kind -> stashed NodePaths ready for reuse
+        self.in_use = {}       # kind -> number of sprites handed out
+        self.high_water = {}   # kind -> most sprites in use at once
+        self.created = {}      # kind -> total sprites ever created
+
+    def register(self, kind, size, region, layer=0):
+        """Register a sprite kind as a square atlas sprite of the given half-size"""
+        self.kinds[kind] = (size, region, layer)
+        self.free.setdefault(kind, [])
+        self.in_use.setdefault(kind, 0)
+        self.high_water.setdefault(kind, 0)
+        self.created.setdefault(kind, 0)
+
+    def create_sprite(self, kind):
+        """Create a new stashed sprite of the given kind"""
+        size, region, layer = self.kinds[kind]
+        sprite = self.game.sprite_batcher.create_sprite(region, size, layer=layer)
+        sprite.setPythonTag("pool_kind", kind)
+        sprite.stash()
+        self.created[kind] += 1
+        return sprite
+
+    def prewarm(self, kind, count):
+        """Make sure at least count sprites of a kind are free or in use"""
+        free = self.free[kind]
+        while len(free) + self.in_use[kind] < count:
+            free.append(self.create_sprite(kind))
+
+    def acquire(self, kind):
+        """Take a sprite from the pool, growing it if none are free"""
+        free = self.free[kind]
+        sprite = free.pop() if free else self.create_sprite(kind)
+
+        # Reset any state left over from the previous user
+        sprite.setPosHprScale(0, 0, 0, 0, 0, 0, 1, 1, 1)
+        sprite.clearColorScale()
+        sprite.unstash()
+
+        in_use = self.in_use[kind] + 1
+        self.in_use[kind] = in_use
+        if in_use > self.high_water[kind]:
+            self.high_water[kind] = in_use
+        return sprite
+
+    def release(self, sprite):
+        """Return a sprite to the pool"""
+        kind = sprite.getPythonTag("pool_kind")
+        if kind is None or sprite.isStashed():
+            return
+        sprite.stash()
+        self.free[kind].append(sprite)
+        self.in_use[kind] -= 1
+
+    def get_stats(self):
+        """Get per-kind pool statistics"""
+        return {
+            kind: {
+                "in_use": self.in_use[kind],
+                "free": len(self.free[kind]),
+                "created": self.created[kind],
+                "high_water": self.high_water[kind],
+            }
+            for kind in self.kinds
+        }
+
+    def report(self):
+        """Log pool high-water marks"""
+        for kind, stats in self.get_stats().items():
+            out(f"Sprite pool {kind}: high water {stats['high_water']}, "
+                f"created {stats['created']}, in use {stats['in_use']}", 2)
+
+    def cleanup(self):
+        """Free every pooled sprite"""
+        for kind in self.kinds:
+            for sprite in self.free[kind]:
+                sprite.removeNode()
+            self.free[kind].clear()
+            self.in_use[kind] = 0
\ No newline at end of file
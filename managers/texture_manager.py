@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from utils.resource_loader import load_texture
+from utils.debug import out
+from utils.tracer import tracer
+
+MEGABYTE = 1024 * 1024
+
+class TextureEntry:
+    """A managed texture with its reference count and residency"""
+    __slots__ = ("texture", "refs", "resident")
+
+    def __init__(self, texture):
+        self.texture = texture
+        self.refs = 0
+        self.resident = True
+
+class TextureManager:
+    """Hands out textures by name within a memory budget, evicting the least recently used
+
+    Only textures nobody holds that can be read back from disk are evicted.
+    Eviction releases the GPU copy and the RAM image; the next acquire
+    reloads it into the same Texture object, so nodes showing it never need
+    to know.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # name -> TextureEntry, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def acquire(self, name, loader=load_texture):
+        """Get a texture by name, loading or reloading it as needed, and hold a reference to it"""
+        entry = self.entries.get(name)
+        if entry is None:
+            with tracer.span(f"TextureManager.load {name}"):
+                texture = loader(name)
+            if texture is None:
+                return None
+            entry = TextureEntry(texture)
+            self.entries[name] = entry
+            self.misses += 1
+        elif not entry.resident:
+            if not entry.texture.hasRamImage():
+                with tracer.span(f"TextureManager.reload {name}"):
+                    entry.texture.reload()
+            entry.resident = True
+            self.reloads += 1
+        else:
+            self.hits += 1
+
+        entry.refs += 1
+        self.entries.move_to_end(name)
+        self.enforce_budget()
+        return entry.texture
+
+    def adopt(self, name, texture):
+        """Account for a texture loaded elsewhere, holding one reference for its owner"""
+        entry = TextureEntry(texture)
+        entry.refs = 1
+        self.entries[name] = entry
+        self.enforce_budget()
+
+    def release(self, name):
+        """Drop a reference; the texture stays resident until the budget needs the space"""
+        entry = self.entries.get(name)
+        if entry is None or entry.refs == 0:
+            return
+        entry.refs -= 1
+        self.enforce_budget()
+
+    def get_footprint(self, texture):
+        """Estimate a texture's (GPU, RAM) memory in bytes"""
+        ram = texture.getRamImageSize() if texture.hasRamImage() else 0
+        return texture.estimateTextureMemory(), ram
+
+    def get_resident_bytes(self):
+        """Get the estimated GPU plus RAM memory of every resident texture"""
+        return sum(sum(self.get_footprint(entry.texture)) for entry in self.entries.values() if entry.resident)
+
+    def enforce_budget(self):
+        """Evict unreferenced textures, oldest use first, until the budget is met"""
+        resident = self.get_resident_bytes()
+        for name, entry in self.entries.items():
+            if resident <= self.budget_bytes:
+                break
+            # Textures built in memory have no file to reload from, so they stay
+            if entry.refs or not entry.resident or not entry.texture.hasFullpath():
+                continue
+            resident -= self.evict(name, entry)
+
+    def evict(self, name, entry):
+        """Free a texture's GPU copy and RAM image, returning the bytes freed"""
+        gpu, ram = self.get_footprint(entry.texture)
+        entry.texture.releaseAll()
+        entry.texture.clearRamImage()
+        freed = gpu + ram
+        entry.resident = False
+        self.evictions += 1
+        out(f"Evicted texture {name}, freeing {freed / MEGABYTE:.1f} MB", 2)
+        return freed
+
+    def get_stats(self):
+        """Get cache counters and memory use"""
+        gpu = ram = 0
+        for entry in self.entries.values():
+            if entry.resident:
+                entry_gpu, entry_ram = self.get_footprint(entry.texture)
+                gpu += entry_gpu
+                ram += entry_ram
+        return {
+            "textures": len(self.entries),
+            "resident": sum(1 for entry in self.entries.values() if entry.resident),
+            "gpu_bytes": gpu,
+            "ram_bytes": ram,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "evictions": self.evictions,
+        }
+
+    def report(self):
+        """Log texture cache statistics"""
+        stats = self.get_stats()
+        out(f"Textures: {stats['resident']}/{stats['textures']} resident, "
+            f"{stats['gpu_bytes'] / MEGABYTE:.1f} MB GPU + {stats['ram_bytes'] / MEGABYTE:.1f} MB RAM "
+            f"of {stats['budget_bytes'] / MEGABYTE:.0f} MB budget, hits {stats['hits']}, "
+            f"misses {stats['misses']}, reloads {stats['reloads']}, evictions {stats['evictions']}", 2)
\ No newline at end of file
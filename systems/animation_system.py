@@ -0,0 +1,118 @@
+import numpy as np
+from direct.task import Task
+from utils.debug import out
+
+# Flipbook clips: name -> (atlas flipbook or region, frames per second, loop).
+# A clip over a plain region has a single frame and costs nothing per frame.
+CLIPS = {
+    "player_idle": ("player", 8, True),
+    "enemy_walk": ("enemy", 8, True),
+    "boss_idle": ("boss", 6, True),
+    "green_orb_glow": ("green_orb", 12, True),
+    "blue_orb_glow": ("blue_orb", 12, True),
+}
+
+class AnimationSystem:
+    def __init__(self, game, capacity=256):
+        self.game = game
+        self.clock = 0.0
+
+        # Clip table; the frames of clip c are frame_uvs[clip_first[c]:clip_first[c] + clip_length[c]]
+        self.clip_ids = {}
+        self.frame_uvs = np.zeros((0, 4), dtype=np.float32)
+        self.clip_first = np.zeros(0, dtype=np.int32)
+        self.clip_length = np.zeros(0, dtype=np.int32)
+        self.clip_fps = np.zeros(0, dtype=np.float32)
+        self.clip_loop = np.zeros(0, dtype=bool)
+
+        # Playing animations, packed into [0, count)
+        self.capacity = capacity
+        self.count = 0
+        self.sprite_index = np.zeros(capacity, dtype=np.int32)
+        self.clip = np.zeros(capacity, dtype=np.int32)
+        self.start_time = np.zeros(capacity, dtype=np.float64)
+        self.speed = np.zeros(capacity, dtype=np.float32)
+        self.slots = {}  # batcher sprite index -> animation slot
+
+        for name, (flipbook, fps, loop) in CLIPS.items():
+            self.define_clip(name, flipbook, fps, loop)
+
+    def define_clip(self, name, flipbook, fps, loop=True):
+        """Register a clip playing an atlas flipbook at the given frame rate"""
+        atlas = self.game.sprite_atlas
+        frames = [atlas.get_region(frame)[1] for frame in atlas.get_frames(flipbook)]
+
+        self.clip_ids[name] = len(self.clip_first)
+        self.clip_first = np.append(self.clip_first, len(self.frame_uvs)).astype(np.int32)
+        self.clip_length = np.append(self.clip_length, len(frames)).astype(np.int32)
+        self.clip_fps = np.append(self.clip_fps, fps).astype(np.float32)
+        self.clip_loop = np.append(self.clip_loop, loop)
+        self.frame_uvs = np.concatenate([self.frame_uvs, np.array(frames, dtype=np.float32)])
+
+    def play(self, sprite, clip_name, phase=0.0, speed=1.0):
+        """Play a clip on a batched sprite, starting phase seconds into it"""
+        clip = self.clip_ids[clip_name]
+        sprite.setUvRect(*self.frame_uvs[self.clip_first[clip]])
+        if self.clip_length[clip] == 1:
+            # Nothing to advance; make sure no earlier clip keeps running
+            self.stop(sprite)
+            return
+
+        slot = self.slots.get(sprite.index)
+        if slot is None:
+            if self.count == self.capacity:
+                self.grow(self.capacity * 2)
+            slot = self.count
+            self.count += 1
+            self.slots[sprite.index] = slot
+
+        self.sprite_index[slot] = sprite.index
+        self.clip[slot] = clip
+        self.start_time[slot] = self.clock - phase
+        self.speed[slot] = speed
+
+    def stop(self, sprite):
+        """Stop animating a sprite, leaving it on its current frame"""
+        slot = self.slots.pop(sprite.index, None)
+        if slot is None:
+            return
+
+        # Move the last animation into the freed slot to keep them packed
+        last = self.count - 1
+        if slot != last:
+            for column in (self.sprite_index, self.clip, self.start_time, self.speed):
+                column[slot] = column[last]
+            self.slots[int(self.sprite_index[slot])] = slot
+        self.count = last
+
+    def grow(self, capacity):
+        """Enlarge the animation arrays to hold capacity animations"""
+        extra = capacity - self.capacity
+        for name in ("sprite_index", "clip", "start_time", "speed"):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros(extra, dtype=column.dtype)]))
+        self.capacity = capacity
+        out(f"Animation capacity grown to {capacity}", 3)
+
+    def update(self, task):
+        """Advance every playing animation and write its frame UVs into the batcher"""
+        if self.game.paused or self.game.game_over:
+            return Task.cont
+
+        self.clock += self.game.frame_dt
+        n = self.count
+        if n == 0:
+            return Task.cont
+
+        clip = self.clip[:n]
+        length = self.clip_length[clip]
+        frame = ((self.clock - self.start_time[:n]) * self.clip_fps[clip] * self.speed[:n]).astype(np.int32)
+        frame = np.where(self.clip_loop[clip], frame % length, np.clip(frame, 0, length - 1))
+
+        self.game.sprite_batcher.uv[self.sprite_index[:n]] = self.frame_uvs[self.clip_first[clip] + frame]
+        return Task.cont
+
+    def cleanup(self):
+        """Stop all animations"""
+        self.count = 0
+        self.slots.clear()
\ No newline at end of file
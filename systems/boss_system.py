@@ -1,16 +1,21 @@
-import random
-import time
 import math
+import numpy as np
 from direct.task import Task
-from panda3d.core import CardMaker, TransparencyAttrib, Texture, PNMImage
+from panda3d.core import CardMaker, TransparencyAttrib
+from core.config import bullet_mode
 from entities.boss.boss import Boss
-from utils.resource_loader import get_resource_path
+from effects.timeline import Timeline
+from effects.sprite_batcher import EFFECTS_BIN
+from effects.bullet_renderer import GpuBulletRenderer
+from utils.collision import sweep_points_vs_boxes
+from utils.projectile_rows import ProjectileRows
+from utils.tracer import traced
 
 class BossSystem:
     def __init__(self, game):
         self.game = game
         self.boss = None
-        self.boss_projectiles = []
+        self.boss_projectiles = ProjectileRows()
         
         # Boss spawn configuration
         self.boss_spawn_time_base = 15  # Base time before boss spawns
@@ -18,16 +23,32 @@ class BossSystem:
         self.boss_hits_required = 10
         
         # Projectile configuration
-        self.projectile_speed = 0.005  # 1/6 of player projectile speed
+        self.projectile_speed = 0.3  # Units per second, 1/6 of player projectile speed
         self.fire_rate = 0.8  # Fire 4x per second
         self.last_fire_time = 0
+        self.player_hit_size = 0.1
+        self.player_half_extents = np.full((1, 2), self.player_hit_size)
+        # Player position at the previous and current projectile update
+        self.player_start = np.zeros((1, 2), dtype=np.float64)
+        self.player_end = np.zeros((1, 2), dtype=np.float64)
+        self.player_tracked = False  # Whether player_end holds a previous update's position
         
-        # Death sequence configuration
+        # GPU bullet mode keeps projectiles as spawn state moved by a shader
+        self.gpu_bullets = None
+        if bullet_mode.getValue() == "gpu":
+            self.gpu_bullets = GpuBulletRenderer(
+                game.render2d, game.sprite_atlas, "bullet", 0.06,
+                bounds=(-game.aspect_ratio - 0.1, game.aspect_ratio + 0.1, -1.1, 1.1)
+            )
+            self.last_bullet_time = game.actual_game_time
+        
+        # Death sequence configuration (seconds of game time)
         self.boss_death_sequence = False
-        self.boss_death_duration = 180      # Time for explosions
-        self.white_fade_duration = 120      # Time to fade to white
-        self.white_screen_duration = 210    # Time to hold white
-        self.fade_duration = 60             # Time to fade to town
+        self.boss_death_duration = 3.0      # Time for explosions
+        self.boss_removal_lead = 0.33       # Remove boss this long before explosions end
+        self.white_fade_duration = 2.0      # Time to fade to white
+        self.white_screen_duration = 3.5    # Time to hold white
+        self.fade_duration = 1.0            # Time to fade to town
         self.screen_shake_intensity = 0.05
         self.boss_death_shake_intensity = 0.02
         self.boss_death_scale_start = 1.0
@@ -35,33 +56,33 @@ class BossSystem:
         
         self.white_overlay = None
         self.boss_final_pos = None
-        self.update_sequence_count = 0
-        self.last_boss_break = 0
         self.final_explosion = None
+        self.death_timeline = None
 
+    @traced("BossSystem.spawn_boss")
     def spawn_boss(self):
         """Spawn a boss at a random edge position"""
         if self.boss:
             return
 
         # Choose random side to spawn from
-        side = random.choice(['top', 'bottom', 'left', 'right'])
+        side = self.game.random.choice(['top', 'bottom', 'left', 'right'])
         boss_size = 0.3
         buffer = 0.1
 
         # Calculate spawn position
         if side == 'top':
-            x = random.uniform(-self.game.aspect_ratio + boss_size, self.game.aspect_ratio - boss_size)
+            x = self.game.random.uniform(-self.game.aspect_ratio + boss_size, self.game.aspect_ratio - boss_size)
             y = 1 + buffer
         elif side == 'bottom':
-            x = random.uniform(-self.game.aspect_ratio + boss_size, self.game.aspect_ratio - boss_size)
+            x = self.game.random.uniform(-self.game.aspect_ratio + boss_size, self.game.aspect_ratio - boss_size)
             y = -1 - buffer
         elif side == 'left':
             x = -self.game.aspect_ratio - buffer
-            y = random.uniform(-1 + boss_size, 1 - boss_size)
+            y = self.game.random.uniform(-1 + boss_size, 1 - boss_size)
         else:  # right
             x = self.game.aspect_ratio + buffer
-            y = random.uniform(-1 + boss_size, 1 - boss_size)
+            y = self.game.random.uniform(-1 + boss_size, 1 - boss_size)
 
         self.boss = Boss(self.game, (x, y))
         self.boss.health = self.boss_hits_required
@@ -71,22 +92,23 @@ class BossSystem:
         if not self.boss and not self.boss_death_sequence:
             return Task.cont
 
+        # The death sequence is driven by its timeline
         if self.boss_death_sequence:
-            return self.update_boss_death_sequence(task)
+            return Task.cont
 
         if self.game.paused or self.game.game_over:
             return Task.cont
 
         # Update boss movement
-        current_time = time.time()
-        player_pos = self.game.player_system.player.get_position()
+        current_time = self.game.now()
+        player_pos = self.game.player_system.player.pos
         
         # Calculate current speed based on game time
         seconds_elapsed = current_time - self.game.enemy_system.game_start_time
         current_max = (self.game.enemy_system.base_speed_max + 
                       (self.game.enemy_system.speed_max_increase_rate * seconds_elapsed))
         
-        self.boss.move_towards(player_pos, current_max)
+        self.boss.move_towards(player_pos, current_max * self.game.frame_dt)
         
         # Fire projectiles
         if current_time - self.last_fire_time >= self.fire_rate:
@@ -123,54 +145,103 @@ class BossSystem:
             dx /= distance
             dy /= distance
 
-        # Create projectile
-        cm = CardMaker("boss_projectile")
-        projectile_size = 0.06  # 3x normal projectile size
-        cm.setFrame(-projectile_size, projectile_size, -projectile_size, projectile_size)
-        projectile = self.game.render2d.attachNewNode(cm.generate())
-        
-        projectile_tex = self.game.loader.loadTexture(get_resource_path("orb.png"))
-        projectile.setTexture(projectile_tex)
-        projectile.setTransparency(TransparencyAttrib.MAlpha)
-        
+        if self.gpu_bullets:
+            self.gpu_bullets.spawn(boss_pos[0], boss_pos[1],
+                                   dx * self.projectile_speed, dy * self.projectile_speed,
+                                   self.game.actual_game_time)
+            return
+
+        # Create projectile (3x normal projectile size)
+        projectile = self.game.sprite_pool.acquire("boss_projectile")
         projectile.setPos(boss_pos[0], 0, boss_pos[1])
-        projectile.setPythonTag("direction", (dx, dy))
-        self.boss_projectiles.append(projectile)
+        self.boss_projectiles.add(projectile, dx, dy)
 
     def update_projectiles(self):
         """Update boss projectile positions and check collisions"""
-        for projectile in self.boss_projectiles[:]:
-            current_pos = projectile.getPos()
-            direction = projectile.getPythonTag("direction")
-            new_x = current_pos[0] + direction[0] * self.projectile_speed
-            new_z = current_pos[2] + direction[1] * self.projectile_speed
-            projectile.setPos(new_x, 0, new_z)
-            
-            # Remove if off screen
-            if (new_x > self.game.aspect_ratio + 0.1 or 
-                new_x < -self.game.aspect_ratio - 0.1 or 
-                new_z > 1.1 or new_z < -1.1):
-                projectile.removeNode()
-                self.boss_projectiles.remove(projectile)
-                continue
-            
-            # Check collision with player
-            if (not self.game.player_system.player.is_invincible and
-                abs(self.game.player_system.player.pos[0] - new_x) < 0.1 and 
-                abs(self.game.player_system.player.pos[1] - new_z) < 0.1):
-                self.game.game_over = True
-                self.game.ui_system.show_game_over()
-                self.game.paused = True
-                if hasattr(self.game, 'music') and self.game.music:
-                    self.game.music.stop()
+        # The player's movement over the step is swept too, so dashing can't skip a projectile
+        player_pos = self.game.player_system.player.pos
+        if self.player_tracked:
+            self.player_start[:] = self.player_end
+        else:
+            self.player_start[0] = player_pos
+        self.player_end[0] = player_pos
+        self.player_tracked = True
+
+        if self.gpu_bullets:
+            self.update_gpu_bullets(self.player_start, self.player_end)
+        elif self.boss_projectiles:
+            self.move_projectiles(self.game.frame_dt, self.player_start, self.player_end)
+
+    def move_projectiles(self, dt, player_start, player_end):
+        """Move every boss projectile by dt seconds and sweep its path against the player"""
+        batcher = self.game.sprite_batcher
+        rows = self.boss_projectiles
+        count = len(rows)
+        slots = rows.slots[:count]
+        starts = np.column_stack((batcher.x[slots], batcher.z[slots])).astype(np.float64)
+        ends = starts + rows.directions[:count] * (self.projectile_speed * dt)
+        batcher.x[slots] = ends[:, 0]
+        batcher.z[slots] = ends[:, 1]
+
+        self.check_player_hit(starts, ends, player_start, player_end)
+
+        # Remove if off screen
+        off_screen = ((np.abs(ends[:, 0]) > self.game.aspect_ratio + 0.1) |
+                      (np.abs(ends[:, 1]) > 1.1))
+        for row in np.flatnonzero(off_screen)[::-1]:
+            self.game.sprite_pool.release(rows.remove(row))
+
+    def update_gpu_bullets(self, player_start, player_end):
+        """Expire GPU bullets and test them against the player since the last update"""
+        bullets = self.gpu_bullets
+        now = self.game.actual_game_time
+        previous = self.last_bullet_time
+        self.last_bullet_time = now
+        bullets.set_time(now)
+        if bullets.count == 0:
+            return
+
+        self.check_player_hit(bullets.positions_at(previous), bullets.positions_at(now),
+                              player_start, player_end)
+
+        expired = bullets.expired(now)
+        if len(expired):
+            bullets.remove(expired)
+
+    def check_player_hit(self, starts, ends, player_start, player_end):
+        """End the game if any projectile path crossed the player during the step"""
+        if self.game.player_system.player.is_invincible:
+            return
+        toi, _ = sweep_points_vs_boxes(starts, ends, player_start, self.player_half_extents, player_end)
+        if np.isfinite(toi).any():
+            self.kill_player()
+
+    def get_projectile_states(self):
+        """Get every boss projectile's position and velocity as (n, 2) arrays"""
+        if self.gpu_bullets:
+            bullets = self.gpu_bullets
+            return bullets.positions_at(self.game.actual_game_time), bullets.velocity[:bullets.count]
+        batcher = self.game.sprite_batcher
+        rows = self.boss_projectiles
+        slots = rows.slots[:len(rows)]
+        positions = np.column_stack((batcher.x[slots], batcher.z[slots])).astype(np.float64)
+        return positions, rows.directions[:len(rows)] * self.projectile_speed
+
+    def kill_player(self):
+        """End the game after a boss projectile hits the player"""
+        self.game.game_over = True
+        self.game.ui_system.show_game_over()
+        self.game.paused = True
+        if hasattr(self.game, 'music') and self.game.music:
+            self.game.music.stop()
 
     def check_collision_with_player(self):
         """Check if boss collides with player"""
         if not self.boss:
             return False
             
-        boss_pos = self.boss.get_position()
-        player_pos = self.game.player_system.player.get_position()
+        boss_pos = self.boss.pos
+        player_pos = self.game.player_system.player.pos
         return (abs(player_pos[0] - boss_pos[0]) < 0.3 and 
                 abs(player_pos[1] - boss_pos[1]) < 0.3)
 
@@ -180,8 +251,6 @@ class BossSystem:
             return
             
         self.boss_death_sequence = True
-        self.update_sequence_count = 0
-        self.last_boss_break = 0
         self.boss_final_pos = self.boss.get_position()
         
         # Create white overlay
@@ -196,6 +265,35 @@ class BossSystem:
         
         # Create final explosion
         self.create_final_explosion()
+        
+        # Explosion phase, fade to white, hold white, then fade out into town
+        explode_end = self.boss_death_duration
+        white_start = explode_end + self.white_fade_duration
+        white_end = white_start + self.white_screen_duration
+        fade_end = white_end + self.fade_duration
+        
+        timeline = Timeline("boss_death", pausable=False)
+        timeline.add_track(self.set_death_scale, [
+            (0, self.boss_death_scale_start),
+            (explode_end, self.boss_death_scale_end)
+        ])
+        timeline.add_track(self.set_death_shake, [
+            (0, self.boss_death_shake_intensity),
+            (explode_end, 0.0)
+        ])
+        timeline.add_track(self.set_final_explosion_scale, [(0, 0.1), (explode_end, 3.1)])
+        timeline.add_track(self.set_final_explosion_alpha, [(0, 1.0), (explode_end, 0.0)])
+        timeline.add_track(self.set_overlay_alpha, [
+            (0, 0.0),
+            (explode_end, 0.0),
+            (white_start, 1.0),
+            (white_end, 1.0),
+            (fade_end, 0.0)
+        ])
+        timeline.add_marker(explode_end - self.boss_removal_lead, self.remove_dying_boss)
+        timeline.add_marker(white_start, self.game.transition_to_town)
+        timeline.on_finish = self.end_death_sequence
+        self.death_timeline = self.game.timeline_system.play(timeline)
 
     def create_final_explosion(self):
         """Create the final large explosion effect"""
@@ -206,163 +304,96 @@ class BossSystem:
         final_scale = self.boss.sprite.getScale()[0]
         explosion_size = 0.3 * final_scale * 3
         
-        cm = CardMaker("final_explosion")
-        cm.setFrame(-explosion_size, explosion_size, -explosion_size, explosion_size)
-        self.final_explosion = self.game.render2d.attachNewNode(cm.generate())
-        
-        texture_size = 256
-        image = self.create_explosion_texture(texture_size)
-        self.final_explosion.setTexture(image)
-        self.final_explosion.setTransparency(TransparencyAttrib.MAlpha)
-        self.final_explosion.setBin('fixed', 100)
+        self.final_explosion = self.game.sprite_batcher.create_sprite(
+            "final_explosion", explosion_size,
+            draw_order=EFFECTS_BIN,
+            layer=3
+        )
         self.final_explosion.setPos(final_pos[0], 0, final_pos[1])
         
         # Start with small scale
         self.final_explosion.setScale(0.1)
 
-    def create_explosion_texture(self, size):
-        """Create the explosion texture"""
-        image = PNMImage(size, size, 4)
-        center_x = size // 2
-        center_y = size // 2
-        radius = size // 2
-        
-        for x in range(size):
-            for y in range(size):
-                dx = x - center_x
-                dy = y - center_y
-                distance = math.sqrt(dx*dx + dy*dy)
-                if distance <= radius:
-                    intensity = 1.0 - (distance / radius)
-                    intensity = intensity ** 0.5
-                    
-                    if distance < radius * 0.3:
-                        # Bright white-red core
-                        image.setXel(x, y, 1.0, 0.9, 0.9)
-                    elif distance < radius * 0.6:
-                        # Bright red-white middle with blue tint
-                        image.setXel(x, y, 1.0, 0.7, 0.9)
-                    else:
-                        # Red-blue outer
-                        image.setXel(x, y, 0.8, 0.4, 1.0)
-                    
-                    image.setAlpha(x, y, intensity)
-                else:
-                    image.setAlpha(x, y, 0)
-        
-        texture = Texture()
-        texture.load(image)
-        return texture
+    def set_death_scale(self, scale):
+        """Grow the dying boss"""
+        if self.boss:
+            self.boss.set_scale(scale)
 
-    def update_boss_death_sequence(self, task):
-        """Update boss death sequence animation"""
-        if not self.boss_death_sequence:
-            return Task.cont
+    def set_death_shake(self, intensity):
+        """Shake the dying boss horizontally around its final position"""
+        if self.boss:
+            shake_x = self.game.random.uniform(-intensity, intensity)
+            self.boss.sprite.setPos(self.boss_final_pos[0] + shake_x, 0, self.boss_final_pos[1])
 
-        if not self.white_overlay:
-            self.start_death_sequence()
-            return Task.cont
+    def set_final_explosion_scale(self, scale):
+        """Scale the final explosion"""
+        if self.final_explosion:
+            self.final_explosion.setScale(scale)
 
-        self.update_sequence_count += 1
-        total_frames = (self.boss_death_duration + self.white_fade_duration + 
-                       self.white_screen_duration + self.fade_duration)
+    def set_final_explosion_alpha(self, alpha):
+        """Fade the final explosion"""
+        if self.final_explosion:
+            self.final_explosion.setColorScale(1, 1, 1, max(0, alpha))
 
-        # Handle boss death animation during explosion phase
-        if self.update_sequence_count <= self.boss_death_duration:
-            progress = self.update_sequence_count / self.boss_death_duration
-            
-            if self.boss:
-                # Shake effect
-                shake_intensity = self.boss_death_shake_intensity * (1 - progress)
-                shake_x = random.uniform(-shake_intensity, shake_intensity)
-                self.boss.sprite.setPos(
-                    self.boss_final_pos[0] + shake_x,
-                    0,
-                    self.boss_final_pos[1]
-                )
-                
-                # Scale effect
-                scale_factor = self.boss_death_scale_start + (
-                    (self.boss_death_scale_end - self.boss_death_scale_start) * progress
-                )
-                self.boss.set_scale(scale_factor)
-            
-            # Update final explosion scale
-            if self.final_explosion:
-                explosion_scale = 0.1 + (3.0 * progress)  # Scale from 0.1 to 3.1
-                self.final_explosion.setScale(explosion_scale)
-                self.final_explosion.setColorScale(1, 1, 1, max(0, 1 - progress))
-
-            # Remove boss and explosion at the end of the explosion phase
-            if self.update_sequence_count >= self.boss_death_duration - 20:
-                if self.boss:
-                    self.boss.cleanup()
-                    self.boss = None
-                if self.final_explosion:
-                    self.final_explosion.removeNode()
-                    self.final_explosion = None
-
-        # Handle white overlay phases
-        if self.update_sequence_count <= self.boss_death_duration:
-            if self.white_overlay:
-                self.white_overlay.setColor(1, 1, 1, 0)
-        elif self.update_sequence_count <= self.boss_death_duration + self.white_fade_duration:
-            fade_frames = self.update_sequence_count - self.boss_death_duration
-            opacity = fade_frames / self.white_fade_duration
-            if self.white_overlay:
-                self.white_overlay.setColor(1, 1, 1, min(1.0, opacity))
-                
-            # Ensure explosion is cleaned up during fade to white
-            if self.final_explosion:
-                self.final_explosion.removeNode()
-                self.final_explosion = None
-                
-        elif self.update_sequence_count <= self.boss_death_duration + self.white_fade_duration + self.white_screen_duration:
-            if self.white_overlay:
-                self.white_overlay.setColor(1, 1, 1, 1)
-            
-            # Start loading town when we first enter the white screen phase
-            if self.update_sequence_count == self.boss_death_duration + self.white_fade_duration + 1:
-                # Ensure all effects are cleaned up before transition
-                if self.final_explosion:
-                    self.final_explosion.removeNode()
-                    self.final_explosion = None
-                self.game.transition_to_town()
-        else:
-            fade_out_frames = self.update_sequence_count - (
-                self.boss_death_duration + self.white_fade_duration + self.white_screen_duration
-            )
-            opacity = 1.0 - (fade_out_frames / self.fade_duration)
-            if self.white_overlay:
-                self.white_overlay.setColor(1, 1, 1, max(0.0, opacity))
-
-        # End sequence when complete
-        if self.update_sequence_count > total_frames:
-            self.boss_death_sequence = False
-            if self.white_overlay:
-                self.white_overlay.removeNode()
-                self.white_overlay = None
-            if self.final_explosion:
-                self.final_explosion.removeNode()
-                self.final_explosion = None
-            return Task.done
+    def set_overlay_alpha(self, alpha):
+        """Set the white overlay opacity"""
+        if self.white_overlay:
+            self.white_overlay.setColor(1, 1, 1, min(1.0, max(0.0, alpha)))
 
-        return Task.cont
+    def remove_dying_boss(self):
+        """Remove the boss and final explosion at the end of the explosion phase"""
+        if self.boss:
+            self.boss.cleanup()
+            self.boss = None
+        self.remove_final_explosion()
 
-    def cleanup(self):
-        """Clean up system resources"""
+    def remove_final_explosion(self):
+        """Remove the final explosion if it still exists"""
+        if self.final_explosion:
+            self.final_explosion.removeNode()
+            self.final_explosion = None
+
+    def end_death_sequence(self):
+        """Finish the death sequence once the fade out completes"""
+        self.boss_death_sequence = False
+        self.death_timeline = None
+        if self.white_overlay:
+            self.white_overlay.removeNode()
+            self.white_overlay = None
+        self.remove_final_explosion()
+
+    def clear_combat(self):
+        """Remove the boss and its projectiles, leaving any death sequence running"""
         if self.boss:
             self.boss.cleanup()
             self.boss = None
             
-        for projectile in self.boss_projectiles:
-            projectile.removeNode()
-        self.boss_projectiles.clear()
+        for projectile in self.boss_projectiles.clear():
+            self.game.sprite_pool.release(projectile)
+        self.player_tracked = False
+        if self.gpu_bullets:
+            self.gpu_bullets.clear()
+            self.last_bullet_time = self.game.actual_game_time
+        
+        self.remove_final_explosion()
+
+    def reset(self):
+        """Remove the boss, its projectiles and any death sequence for a new run"""
+        self.clear_combat()
         
+        if self.death_timeline:
+            self.game.timeline_system.stop(self.death_timeline)
+            self.death_timeline = None
+        self.boss_death_sequence = False
+        self.last_fire_time = 0
+            
         if self.white_overlay:
             self.white_overlay.removeNode()
             self.white_overlay = None
-            
-        if self.final_explosion:
-            self.final_explosion.removeNode()
-            self.final_explosion = None
\ No newline at end of file
+
+    def cleanup(self):
+        """Clean up system resources"""
+        self.reset()
+        if self.gpu_bullets:
+            self.gpu_bullets.destroy()
+            self.gpu_bullets = None
\ No newline at end of file
@@ -1,63 +1,134 @@
-import random
-import time
+import numpy as np
 from direct.task import Task
 from entities.enemy.enemy import Enemy
+from utils.spatial_grid import SpatialGrid
+from utils.flow_field import FlowField, obstacle_map_name
+from utils.sim_worker import SimulationWorker
+from utils.tracer import traced
+from core.config import enemy_ai_budget, frame_pipeline
 
 class EnemySystem:
     def __init__(self, game):
         self.game = game
         self.enemies = []
         
-        # Enemy spawn configuration
-        self.base_speed_min = 0.001
-        self.base_speed_max = 0.003
+        # Per-enemy state in parallel arrays; enemies[i] owns row i
+        self.capacity = 0
+        self.positions = np.zeros((0, 2), dtype=np.float64)
+        self.speeds = np.zeros(0, dtype=np.float64)
+        self.separation_radius = np.zeros(0, dtype=np.float64)
+        self.separation_strength = np.zeros(0, dtype=np.float64)
+        self.sprite_index = np.zeros(0, dtype=np.intp)
+        self.pending_dt = np.zeros(0, dtype=np.float64)  # Time since each enemy's AI last ran
+        self.grow(64)
+        
+        # Neighbour grid for crowd separation, rebuilt every tick
+        self.grid = SpatialGrid(
+            (-game.aspect_ratio - 0.2, game.aspect_ratio + 0.2, -1.2, 1.2),
+            Enemy.separation_radius
+        )
+        self.hit_size = 0.07
+        
+        # Shared path field toward the player, routing enemies around the area's obstacles
+        self.flow_field = FlowField(self.grid.bounds, 0.1)
+        self.obstacle_background = None  # Background whose obstacle map is loaded
+        self.load_obstacles("map.png")
+        
+        # AI scheduling: near, on-screen enemies update every frame, farther
+        # ones at the rates below within the per-frame budget
+        self.near_distance = 0.8
+        self.tier_intervals = np.array([0.0, 1 / 30, 1 / 10])  # Seconds: near, on-screen, off-screen
+        self.ai_budget = enemy_ai_budget.getValue()
+        self.max_catch_up = 0.25  # Longest step a starved enemy takes at once
+        self.ai_updates = 0  # Enemies whose AI ran last frame
+        
+        # Pipelined mode steers on a worker thread one tick ahead of the scene,
+        # rebuilding a neighbour grid of its own
+        self.worker = SimulationWorker("enemy-steering") if frame_pipeline.getValue() else None
+        self.worker_grid = SpatialGrid(self.grid.bounds, Enemy.separation_radius) if self.worker else None
+        self.steering_enemies = []  # Enemies the job in flight is steering
+        
+        # Enemy spawn configuration (speeds in units per second)
+        self.base_speed_min = 0.06
+        self.base_speed_max = 0.18
         self.base_num_enemies = 5
-        self.speed_min_increase_rate = 0.0001  # per second
-        self.speed_max_increase_rate = 0.0002  # per second
+        self.speed_min_increase_rate = 0.006  # per second
+        self.speed_max_increase_rate = 0.012  # per second
         
         # Current state
         self.enemy_limit = self.base_num_enemies
         self.enemies_per_score = 8  # Increase enemies every 8 points
         self.previous_enemy_increase = 0
-        self.game_start_time = time.time()
+        self.game_start_time = self.game.now()
         
         # Initialize with base enemies
         self.spawn_initial_enemies()
 
+    def grow(self, capacity):
+        """Enlarge the per-enemy arrays to hold capacity enemies"""
+        extra = capacity - self.capacity
+        for name in ("positions", "speeds", "separation_radius", "separation_strength", "sprite_index", "pending_dt"):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros((extra,) + column.shape[1:], dtype=column.dtype)]))
+        self.capacity = capacity
+
     def spawn_initial_enemies(self):
         """Spawn initial set of enemies"""
         while len(self.enemies) < self.enemy_limit:
             self.spawn_single_enemy()
 
+    @traced("EnemySystem.spawn_single_enemy")
     def spawn_single_enemy(self):
         """Spawn a single enemy at a random edge position"""
-        side = random.choice(['top', 'bottom', 'left', 'right'])
+        side = self.game.random.choice(['top', 'bottom', 'left', 'right'])
         enemy_size = 0.1
         buffer = 0.1  # Small buffer distance outside the screen
 
         # Calculate spawn position based on side
         if side == 'top':
-            x = random.uniform(-self.game.aspect_ratio + enemy_size, self.game.aspect_ratio - enemy_size)
+            x = self.game.random.uniform(-self.game.aspect_ratio + enemy_size, self.game.aspect_ratio - enemy_size)
             y = 1 + buffer
         elif side == 'bottom':
-            x = random.uniform(-self.game.aspect_ratio + enemy_size, self.game.aspect_ratio - enemy_size)
+            x = self.game.random.uniform(-self.game.aspect_ratio + enemy_size, self.game.aspect_ratio - enemy_size)
             y = -1 - buffer
         elif side == 'left':
             x = -self.game.aspect_ratio - buffer
-            y = random.uniform(-1 + enemy_size, 1 - enemy_size)
+            y = self.game.random.uniform(-1 + enemy_size, 1 - enemy_size)
         else:  # right
             x = self.game.aspect_ratio + buffer
-            y = random.uniform(-1 + enemy_size, 1 - enemy_size)
+            y = self.game.random.uniform(-1 + enemy_size, 1 - enemy_size)
 
         # Calculate time-based speed limits
-        seconds_elapsed = time.time() - self.game_start_time
+        seconds_elapsed = self.game.now() - self.game_start_time
         current_min = self.base_speed_min + (self.speed_min_increase_rate * seconds_elapsed)
         current_max = self.base_speed_max + (self.speed_max_increase_rate * seconds_elapsed)
         
         # Create enemy with random speed
-        speed = random.uniform(current_min, current_max)
-        enemy = Enemy(self.game, (x, y), speed)
+        self.add_enemy(Enemy, (x, y), self.game.random.uniform(current_min, current_max))
+
+    def add_enemy(self, enemy_class, position, speed):
+        """Create an enemy of the given type in the next free row"""
+        slot = len(self.enemies)
+        if slot == self.capacity:
+            self.grow(self.capacity * 2)
+        self.positions[slot] = position
+        self.speeds[slot] = speed
+        self.separation_radius[slot] = enemy_class.separation_radius
+        self.separation_strength[slot] = enemy_class.separation_strength
+        self.pending_dt[slot] = 0
+        
+        enemy = enemy_class(self.game, self, slot)
+        self.sprite_index[slot] = enemy.sprite.index
+        enemy.update_position()
         self.enemies.append(enemy)
+        return enemy
+
+    def load_obstacles(self, background_name):
+        """Load the obstacle map for the area drawn with the given background, unless it's loaded already"""
+        if background_name == self.obstacle_background:
+            return
+        self.obstacle_background = background_name
+        self.flow_field.load_obstacles(obstacle_map_name(background_name), self.game.background_frame)
 
     def update(self, task):
         """Update all enemies"""
@@ -65,48 +136,222 @@ class EnemySystem:
             return Task.cont
 
         # Ensure we maintain the enemy limit
+        self.spawn_to_limit()
+
+        player_pos = self.game.player_system.player.pos
+        if self.worker:
+            # Show the tick computed while the last frame drew, then start the
+            # next, on a copy of the player's position since it keeps moving
+            self.finish_steering()
+            active, step = self.schedule(player_pos, self.game.frame_dt)
+            self.start_steering(tuple(player_pos), step, active)
+        else:
+            active, step = self.schedule(player_pos, self.game.frame_dt)
+            self.steer(player_pos, step, active)
+        
+        self.check_player_contact(player_pos)
+        return Task.cont
+
+    def spawn_to_limit(self):
+        """Spawn enemies until the enemy limit is reached"""
         while len(self.enemies) < self.enemy_limit:
             self.spawn_single_enemy()
 
-        player_pos = self.game.player_system.player.get_position()
-        
-        # Update each enemy
-        for enemy in self.enemies[:]:
-            enemy.move_towards(player_pos)
-            
-            # Check collision with player
-            enemy_pos = enemy.get_position()
-            if self.check_collision_with_player(enemy_pos):
-                if self.game.player_system.player.is_invincible:
-                    # Destroy enemy if player is invincible
-                    self.destroy_enemy(enemy)
-                    self.game.score += 1
-                    self.game.ui_system.update_score(self.game.score)
-                    self.check_difficulty_increase()
-                else:
-                    # Game over if player is not invincible
-                    self.game.game_over = True
-                    self.game.ui_system.show_game_over()
-                    self.game.paused = True
-                    if hasattr(self.game, 'music') and self.game.music:
-                        self.game.music.stop()
+    def check_player_contact(self, player_pos):
+        """Handle enemies touching the player: they die to an invincible player, otherwise the game ends"""
+        n = len(self.enemies)
+        offset = np.abs(self.positions[:n] - player_pos)
+        touching = np.flatnonzero((offset[:, 0] < self.hit_size) & (offset[:, 1] < self.hit_size))
+        # Highest rows first, since destroying an enemy moves the last one into its row
+        for index in touching[::-1]:
+            if self.game.player_system.player.is_invincible:
+                # Destroy enemy if player is invincible
+                self.destroy_enemy(self.enemies[index])
+                self.game.score += 1
+                self.game.ui_system.update_score(self.game.score)
+                self.check_difficulty_increase()
+            else:
+                # Game over if player is not invincible
+                self.game.game_over = True
+                self.game.ui_system.show_game_over()
+                self.game.paused = True
+                if hasattr(self.game, 'music') and self.game.music:
+                    self.game.music.stop()
 
-        return Task.cont
+    def schedule(self, target, dt):
+        """Pick the enemies whose AI runs this frame, with the time each has to catch up on"""
+        n = len(self.enemies)
+        pending = self.pending_dt[:n]
+        pending += dt
+        positions = self.positions[:n]
+        
+        # Importance tiers: 0 near and on screen, 1 on screen, 2 off screen,
+        # using the view the sprite batcher culled against last frame
+        view = self.game.sprite_batcher.view_bounds
+        on_screen = ((positions[:, 0] >= view[0]) & (positions[:, 0] <= view[1]) &
+                     (positions[:, 1] >= view[2]) & (positions[:, 1] <= view[3]))
+        near = np.linalg.norm(positions - target, axis=1) < self.near_distance
+        tier = np.where(on_screen, np.where(near, 0, 1), 2)
+        
+        # Lower tiers run once their interval has passed, most overdue first,
+        # until the budget is spent; the rest wait and fall further behind
+        full = np.flatnonzero(tier == 0)
+        interval = self.tier_intervals[tier]
+        due = np.flatnonzero((tier > 0) & (pending >= interval))
+        if len(due) > self.ai_budget:
+            overdue = pending[due] / interval[due]
+            due = due[np.argpartition(-overdue, self.ai_budget)[:self.ai_budget]]
+        
+        active = np.concatenate((full, due))
+        step = np.minimum(pending[active], self.max_catch_up)
+        pending[active] = 0
+        self.ai_updates = len(active)
+        return active, step
+
+    def steer(self, target, dt, active=None):
+        """Move enemies toward the target while keeping apart from their neighbours
+
+        dt is a scalar or one time step per enemy in active (all enemies by default).
+        """
+        n = len(self.enemies)
+        if n == 0:
+            return
+        if active is None:
+            active = np.arange(n)
+        if len(active) == 0:
+            return
+        if self.flow_field.has_obstacles():
+            self.flow_field.update(target)
+        self.write_positions(active, self.compute_steering(self.snapshot(), target, dt, active))
+
+    def start_steering(self, target, dt, active):
+        """Steer the active enemies on the worker thread, from a copy of their state"""
+        if len(active) == 0:
+            return
+        if self.flow_field.has_obstacles():
+            self.flow_field.update(target)
+        self.steering_enemies = [self.enemies[index] for index in active]
+        self.worker.submit(self.compute_steering, self.snapshot(copy=True), target, dt, active, None,
+                           self.worker_grid)
+
+    def finish_steering(self):
+        """Apply the worker's positions to the enemies that still exist"""
+        positions = self.worker.collect()
+        enemies, self.steering_enemies = self.steering_enemies, []
+        if positions is None:
+            return
+        # Enemies may have died or moved rows since the job started
+        slots = np.array([enemy.slot if enemy.sprite else -1 for enemy in enemies], dtype=np.intp)
+        alive = slots >= 0
+        self.write_positions(slots[alive], positions[alive])
 
-    def check_collision_with_player(self, enemy_pos):
-        """Check if enemy collides with player"""
-        player_pos = self.game.player_system.player.get_position()
-        return (abs(player_pos[0] - enemy_pos[0]) < 0.07 and 
-                abs(player_pos[1] - enemy_pos[1]) < 0.07)
+    def snapshot(self, copy=False):
+        """Get the per-enemy arrays steering reads, copied if it runs off the main thread"""
+        n = len(self.enemies)
+        columns = (self.positions[:n], self.speeds[:n], self.separation_radius[:n], self.separation_strength[:n])
+        return tuple(column.copy() for column in columns) if copy else columns
+
+    def write_positions(self, slots, positions):
+        """Store new positions for the enemies in the given rows and move their sprites"""
+        self.positions[slots] = positions
+        batcher = self.game.sprite_batcher
+        batcher.x[self.sprite_index[slots]] = positions[:, 0]
+        batcher.z[self.sprite_index[slots]] = positions[:, 1]
+
+    @traced("EnemySystem.compute_steering")
+    def compute_steering(self, state, target, dt, active, layers=None, grid=None):
+        """Get the next positions of the active enemies, changing nothing but the neighbour grid
+
+        target is one point, or one per active enemy. Enemies in different
+        layers (one per world when steering several together) never push each other.
+        The grid rebuilt for separation is self.grid unless another is given,
+        as jobs on the worker thread do.
+        """
+        all_positions, speeds, _, _ = state
+        positions = all_positions[active]
+        
+        # Seek: unit vectors toward the target
+        seek = np.asarray(target, dtype=np.float64) - positions
+        distance = np.linalg.norm(seek, axis=1, keepdims=True)
+        seek = np.divide(seek, distance, out=np.zeros_like(seek), where=distance > 0)
+        
+        # Around obstacles follow the flow field, heading straight in once
+        # in the target's cell or where the field has no route
+        flow = self.flow_field
+        if flow.has_obstacles():
+            routed = flow.sample(positions)
+            seek = np.where(routed.any(axis=1, keepdims=True), routed, seek)
+            previous = positions.copy()
+        
+        steering = seek + self.get_separation(state, active, layers, grid or self.grid)
+        
+        # Separation may slow an enemy down in a crowd but never speed it up
+        length = np.linalg.norm(steering, axis=1, keepdims=True)
+        steering /= np.maximum(length, 1.0)
+        positions += steering * (speeds[active] * dt)[:, None]
+        
+        # Clamp to screen bounds
+        np.clip(positions[:, 0], -self.game.aspect_ratio + 0.05, self.game.aspect_ratio - 0.05, out=positions[:, 0])
+        np.clip(positions[:, 1], -0.95, 0.95, out=positions[:, 1])
+        if flow.has_obstacles():
+            flow.slide(previous, positions)
+        return positions
+
+    def get_separation(self, state, active, layers, grid):
+        """Get the push each active enemy gets away from neighbours inside its separation radius"""
+        positions, _, separation_radius, separation_strength = state
+        radius = separation_radius[active]
+        max_radius = separation_radius.max()
+        if max_radius != grid.cell_size:
+            grid.set_cell_size(max_radius)
+        grid.rebuild(positions, layers)
+        first, second = grid.neighbor_pairs(active)
+        
+        away = positions[active[first]] - positions[second]
+        distance = np.linalg.norm(away, axis=1)
+        close = distance < radius[first]
+        first, second, away, distance = first[close], second[close], away[close], distance[close]
+        
+        # Enemies on the exact same spot split along a direction picked by index
+        stacked = distance == 0
+        if stacked.any():
+            angle = (active[first[stacked]] - second[stacked]) * 2.39996
+            away[stacked] = np.column_stack((np.cos(angle), np.sin(angle)))
+            distance[stacked] = 1.0
+        
+        # Push harder the deeper a neighbour is inside the radius
+        weight = (1 - distance / radius[first]) * separation_strength[active[first]] / distance
+        push_x = np.bincount(first, weights=away[:, 0] * weight, minlength=len(active))
+        push_y = np.bincount(first, weights=away[:, 1] * weight, minlength=len(active))
+        return np.column_stack((push_x, push_y))
 
     def destroy_enemy(self, enemy):
         """Remove an enemy from the game"""
         if enemy in self.enemies:
-            self.enemies.remove(enemy)
+            self.remove_enemy(enemy)
             enemy.cleanup()
             if hasattr(self.game, 'enemy_death_sound') and self.game.enemy_death_sound:
                 self.game.enemy_death_sound.play()
 
+    def remove_enemy(self, enemy):
+        """Free an enemy's row, moving the last enemy into it"""
+        slot = enemy.slot
+        last = len(self.enemies) - 1
+        if slot != last:
+            moved = self.enemies[last]
+            for column in (self.positions, self.speeds, self.separation_radius,
+                           self.separation_strength, self.sprite_index, self.pending_dt):
+                column[slot] = column[last]
+            moved.slot = slot
+            self.enemies[slot] = moved
+        self.enemies.pop()
+
+    def discard_steering(self):
+        """Drop any steering still being computed for the current enemies"""
+        if self.worker:
+            self.worker.discard()
+            self.steering_enemies = []
+
     def check_difficulty_increase(self):
         """Check and apply difficulty increase based on score"""
         difficulty_level = self.game.score // self.enemies_per_score
@@ -116,6 +361,8 @@ class EnemySystem:
 
     def reset(self):
         """Reset enemy system to initial state"""
+        self.discard_steering()
+        
         # Clean up existing enemies
         for enemy in self.enemies:
             enemy.cleanup()
@@ -124,13 +371,49 @@ class EnemySystem:
         # Reset configuration
         self.enemy_limit = self.base_num_enemies
         self.previous_enemy_increase = 0
-        self.game_start_time = time.time()
+        self.game_start_time = self.game.now()
+        self.load_obstacles("map.png")
         
         # Spawn new enemies
         self.spawn_initial_enemies()
 
     def cleanup(self):
         """Clean up system resources"""
+        self.discard_steering()
         for enemy in self.enemies:
             enemy.cleanup()
-        self.enemies.clear()
\ No newline at end of file
+        self.enemies.clear()
+
+def steer_together(systems):
+    """Schedule and steer the enemies of several worlds in one vectorized pass
+
+    The worlds must share an aspect ratio and have no obstacles. Their
+    per-enemy arrays are stacked, with each world's enemies in their own
+    separation grid layer and heading for their own player.
+    """
+    states, targets, steps, actives, layers = [], [], [], [], []
+    offset = 0
+    for layer, system in enumerate(systems):
+        system.spawn_to_limit()
+        player_pos = system.game.player_system.player.pos
+        active, step = system.schedule(player_pos, system.game.frame_dt)
+        states.append(system.snapshot())
+        targets.append(np.repeat([player_pos], len(active), axis=0))
+        steps.append(step)
+        actives.append(active + offset)
+        layers.append(np.full(len(system.enemies), layer, dtype=np.intp))
+        offset += len(system.enemies)
+
+    if offset:
+        state = tuple(np.concatenate(columns) for columns in zip(*states))
+        active = np.concatenate(actives)
+        positions = systems[0].compute_steering(state, np.concatenate(targets), np.concatenate(steps),
+                                                active, np.concatenate(layers))
+        # Hand each world back its own rows
+        starts = np.cumsum([0] + [len(system.enemies) for system in systems])
+        for system, start, end in zip(systems, starts, starts[1:]):
+            mine = (active >= start) & (active < end)
+            system.write_positions(active[mine] - start, positions[mine])
+
+    for system in systems:
+        system.check_player_contact(system.game.player_system.player.pos)
\ No newline at end of file
@@ -1,7 +1,8 @@
-import time
 import math
 from direct.task import Task
 from entities.orbs.orb import GreenOrb, BlueOrb
+from effects.timeline import Timeline
+from utils.tracer import traced
 
 class OrbSystem:
     def __init__(self, game):
@@ -15,7 +16,13 @@ class OrbSystem:
         # Blue orb configuration
         self.blue_orb = None
         self.blue_orb_interval = 11.0  # Spawn blue orb every 11 seconds
-        self.last_blue_orb_spawn_time = time.time()
+        self.last_blue_orb_spawn_time = self.game.now()
+        
+        # Pulse animation configuration
+        self.pulse_speed = 3.0
+        self.pulse_magnitude = 0.2
+        self.green_pulse = None
+        self.blue_pulse = None
 
     def update(self, task):
         """Update orb states and check for collection"""
@@ -32,7 +39,7 @@ class OrbSystem:
 
     def update_green_orb(self):
         """Update green orb state and spawning"""
-        current_time = time.time()
+        current_time = self.game.now()
         
         # Check if we should spawn a new orb
         if (self.game.score > 0 and 
@@ -44,12 +51,11 @@ class OrbSystem:
         # Remove orb if it's been there too long
         if self.green_orb and self.green_orb.spawn_time:
             if current_time - self.green_orb.spawn_time > self.green_orb.duration:
-                self.green_orb.cleanup()
-                self.green_orb = None
+                self.remove_green_orb()
 
     def update_blue_orb(self):
         """Update blue orb state and spawning"""
-        current_time = time.time()
+        current_time = self.game.now()
         
         # Check if we should spawn a new blue orb
         if current_time - self.last_blue_orb_spawn_time >= self.blue_orb_interval:
@@ -59,9 +65,23 @@ class OrbSystem:
         # Remove orb if it's been there too long
         if self.blue_orb and self.blue_orb.spawn_time:
             if current_time - self.blue_orb.spawn_time > self.blue_orb.duration:
-                self.blue_orb.cleanup()
-                self.blue_orb = None
+                self.remove_blue_orb()
+
+    def remove_green_orb(self):
+        """Remove the green orb and stop its pulse"""
+        self.game.timeline_system.stop(self.green_pulse)
+        self.green_pulse = None
+        self.green_orb.cleanup()
+        self.green_orb = None
 
+    def remove_blue_orb(self):
+        """Remove the blue orb and stop its pulse"""
+        self.game.timeline_system.stop(self.blue_pulse)
+        self.blue_pulse = None
+        self.blue_orb.cleanup()
+        self.blue_orb = None
+
+    @traced("OrbSystem.spawn_green_orb")
     def spawn_green_orb(self):
         """Spawn a new green orb"""
         if self.green_orb:
@@ -71,10 +91,10 @@ class OrbSystem:
         self.green_orb.spawn()
         
         # Start pulsing effect
-        taskMgr = self.game.taskMgr
-        taskMgr.remove("pulseGreenOrb")  # Remove any existing task
-        taskMgr.add(self.pulse_green_orb, "pulseGreenOrb")
+        self.game.timeline_system.stop(self.green_pulse)
+        self.green_pulse = self.game.timeline_system.play(self.create_pulse(self.green_orb))
 
+    @traced("OrbSystem.spawn_blue_orb")
     def spawn_blue_orb(self):
         """Spawn a new blue orb"""
         if self.blue_orb:
@@ -84,9 +104,8 @@ class OrbSystem:
         self.blue_orb.spawn()
         
         # Start pulsing effect
-        taskMgr = self.game.taskMgr
-        taskMgr.remove("pulseBlueOrb")  # Remove any existing task
-        taskMgr.add(self.pulse_blue_orb, "pulseBlueOrb")
+        self.game.timeline_system.stop(self.blue_pulse)
+        self.blue_pulse = self.game.timeline_system.play(self.create_pulse(self.blue_orb))
 
     def check_green_orb_collection(self):
         """Check if player has collected the green orb"""
@@ -94,15 +113,14 @@ class OrbSystem:
             return
             
         orb_pos = self.green_orb.get_position()
-        player_pos = self.game.player_system.player.get_position()
+        player_pos = self.game.player_system.player.pos
         
         if (abs(player_pos[0] - orb_pos[0]) < 0.1 and 
             abs(player_pos[1] - orb_pos[1]) < 0.1):
             # Collected the orb - reduce enemy limit
             if self.game.enemy_system.enemy_limit > 1:  # Don't go below 1 enemy
                 self.game.enemy_system.enemy_limit -= 1
-            self.green_orb.cleanup()
-            self.green_orb = None
+            self.remove_green_orb()
 
     def check_blue_orb_collection(self):
         """Check if player has collected the blue orb"""
@@ -110,58 +128,40 @@ class OrbSystem:
             return
             
         orb_pos = self.blue_orb.get_position()
-        player_pos = self.game.player_system.player.get_position()
+        player_pos = self.game.player_system.player.pos
         
         if (abs(player_pos[0] - orb_pos[0]) < 0.1 and 
             abs(player_pos[1] - orb_pos[1]) < 0.1):
             # Collected the blue orb - add 10 seconds to game_start_time
             self.game.enemy_system.game_start_time += 10
-            self.blue_orb.cleanup()
-            self.blue_orb = None
+            self.remove_blue_orb()
 
-    def pulse_green_orb(self, task):
-        """Create pulsing effect for green orb"""
-        if not self.green_orb or not self.green_orb.sprite:
-            return Task.done
-        
-        pulse_speed = 3.0
-        pulse_magnitude = 0.2
-        
-        base_scale = 1.0
-        pulse = math.sin(task.time * pulse_speed) * pulse_magnitude
-        new_scale = base_scale + pulse
-        
-        self.green_orb.sprite.setScale(new_scale)
-        
-        return Task.cont
+    def create_pulse(self, orb):
+        """Create a looping scale pulse for an orb"""
+        period = 2 * math.pi / self.pulse_speed
+        low = 1.0 - self.pulse_magnitude
+        high = 1.0 + self.pulse_magnitude
+        
+        timeline = Timeline("orb_pulse", loop=True)
+        timeline.add_track(orb.set_scale, [
+            (0, 1.0),
+            (period * 0.25, high, "sine_out"),
+            (period * 0.5, 1.0, "sine_in"),
+            (period * 0.75, low, "sine_out"),
+            (period, 1.0, "sine_in")
+        ])
+        return timeline
 
-    def pulse_blue_orb(self, task):
-        """Create pulsing effect for blue orb"""
-        if not self.blue_orb or not self.blue_orb.sprite:
-            return Task.done
-        
-        pulse_speed = 3.0
-        pulse_magnitude = 0.2
-        
-        base_scale = 1.0
-        pulse = math.sin(task.time * pulse_speed) * pulse_magnitude
-        new_scale = base_scale + pulse
-        
-        self.blue_orb.sprite.setScale(new_scale)
-        
-        return Task.cont
+    def reset(self):
+        """Remove the orbs and restart their spawn timers for a new run"""
+        self.cleanup()
+        self.last_orb_spawn_score = 0
+        self.last_blue_orb_spawn_time = self.game.now()
 
     def cleanup(self):
         """Clean up system resources"""
         if self.green_orb:
-            self.green_orb.cleanup()
-            self.green_orb = None
+            self.remove_green_orb()
             
         if self.blue_orb:
-            self.blue_orb.cleanup()
-            self.blue_orb = None
-            
-        # Remove any running tasks
-        taskMgr = self.game.taskMgr
-        taskMgr.remove("pulseGreenOrb")
-        taskMgr.remove("pulseBlueOrb")
\ No newline at end of file
+            self.remove_blue_orb()
\ No newline at end of file
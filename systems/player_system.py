@@ -1,8 +1,10 @@
 import math
-import time
 from direct.task import Task
 from panda3d.core import InputDevice
 from entities.player.player import Player
+from effects.timeline import Timeline
+
+MOVEMENT_KEYS = ['arrow_left', 'arrow_right', 'arrow_up', 'arrow_down']
 
 class PlayerSystem:
     def __init__(self, game):
@@ -11,18 +13,16 @@ class PlayerSystem:
         
         # Movement input state
         self.keys = {}
-        for key in ['arrow_left', 'arrow_right', 'arrow_up', 'arrow_down']:
+        for key in MOVEMENT_KEYS:
             self.keys[key] = False
             
         # Set up key handlers
-        game.accept("arrow_left", self.update_key_map, ["arrow_left", True])
-        game.accept("arrow_left-up", self.update_key_map, ["arrow_left", False])
-        game.accept("arrow_right", self.update_key_map, ["arrow_right", True])
-        game.accept("arrow_right-up", self.update_key_map, ["arrow_right", False])
-        game.accept("arrow_up", self.update_key_map, ["arrow_up", True])
-        game.accept("arrow_up-up", self.update_key_map, ["arrow_up", False])
-        game.accept("arrow_down", self.update_key_map, ["arrow_down", True])
-        game.accept("arrow_down-up", self.update_key_map, ["arrow_down", False])
+        for key in MOVEMENT_KEYS:
+            game.accept(key, self.update_key_map, [key, True])
+            game.accept(key + "-up", self.update_key_map, [key, False])
+
+        # Invincibility flash animation
+        self.invincibility_timeline = None
 
         # Shooting properties
         self.last_fire_time = 0
@@ -37,18 +37,21 @@ class PlayerSystem:
         if self.game.paused or self.game.game_over:
             return Task.cont
 
+        # Distance moved this frame, from a speed in units per second
+        speed = self.player.movement_speed * self.game.frame_dt
+
         # Handle keyboard input
         dx = 0
         dy = 0
         
         if self.keys["arrow_left"]:
-            dx -= self.player.movement_speed
+            dx -= speed
         if self.keys["arrow_right"]:
-            dx += self.player.movement_speed
+            dx += speed
         if self.keys["arrow_up"]:
-            dy += self.player.movement_speed
+            dy += speed
         if self.keys["arrow_down"]:
-            dy -= self.player.movement_speed
+            dy -= speed
             
         # Handle gamepad input if available
         if self.game.gamepad:
@@ -62,24 +65,24 @@ class PlayerSystem:
             if abs(left_y) < deadzone: left_y = 0
             
             # Add gamepad movement
-            dx += left_x * self.player.movement_speed
-            dy += left_y * self.player.movement_speed
+            dx += left_x * speed
+            dy += left_y * speed
             
             # D-pad support
             if self.game.gamepad.findButton("dpad_left").pressed:
-                dx -= self.player.movement_speed
+                dx -= speed
             if self.game.gamepad.findButton("dpad_right").pressed:
-                dx += self.player.movement_speed
+                dx += speed
             if self.game.gamepad.findButton("dpad_up").pressed:
-                dy += self.player.movement_speed
+                dy += speed
             if self.game.gamepad.findButton("dpad_down").pressed:
-                dy -= self.player.movement_speed
+                dy -= speed
 
             # Handle shooting with right analog stick
             right_x = self.game.gamepad.findAxis(InputDevice.Axis.right_x).value
             right_y = self.game.gamepad.findAxis(InputDevice.Axis.right_y).value
             stick_magnitude = math.sqrt(right_x * right_x + right_y * right_y)
-            current_time = time.time()
+            current_time = self.game.now()
             
             if (stick_magnitude > deadzone and 
                 current_time - self.last_fire_time >= self.fire_rate):
@@ -93,27 +96,41 @@ class PlayerSystem:
                     self.game.gun_sound.play()
                 self.last_fire_time = current_time
 
-        # Update position
-        self.player.update_position(dx, dy)
+        # Update position, dashing overrides regular movement
+        if self.player.is_dashing:
+            self.update_dash()
+        else:
+            self.player.update_position(dx, dy)
 
-        # Update invincibility
-        self.update_invincibility()
-        
         return Task.cont
 
-    def update_invincibility(self):
-        """Update player invincibility state"""
-        if self.player.is_invincible:
-            current_time = time.time()
-            time_in_invincibility = current_time - self.player.invincibility_start_time
-            
-            if time_in_invincibility >= self.player.invincibility_duration:
-                self.player.is_invincible = False
-                self.player.sprite.setColorScale(1, 1, 1, 1)  # Reset color
-            else:
-                # Create flashing effect
-                flash = (math.sin(time_in_invincibility * self.player.invincibility_flash_speed) * 0.3) + 0.7
-                self.player.sprite.setColorScale(1, 1, flash, 1)  # Blue-tinted flash
+    def set_invincibility_flash(self, flash):
+        """Tint the player blue by the given flash amount"""
+        self.player.sprite.setColorScale(1, 1, flash, 1)
+
+    def end_invincibility(self):
+        """End the invincibility period and reset the player color"""
+        self.player.is_invincible = False
+        self.player.sprite.setColorScale(1, 1, 1, 1)
+        self.invincibility_timeline = None
+
+    def update_dash(self):
+        """Move the player along the dash and leave a trail behind"""
+        progress = (self.game.now() - self.player.dash_start_time) / self.player.dash_duration
+        
+        if progress >= 1.0:
+            progress = 1.0
+            self.player.is_dashing = False
+        
+        # Ease out so the dash starts fast and settles on the target
+        eased = 1.0 - (1.0 - progress) * (1.0 - progress)
+        start_x, start_y = self.player.dash_start_pos
+        target_x, target_y = self.player.dash_target_pos
+        new_x = start_x + (target_x - start_x) * eased
+        new_y = start_y + (target_y - start_y) * eased
+        self.player.update_position(new_x - self.player.pos[0], new_y - self.player.pos[1])
+        
+        self.game.effects_system.emit_trail_particle(new_x, new_y)
 
     def perform_dash(self, direction_x, direction_y):
         """Perform dash movement"""
@@ -147,22 +164,44 @@ class PlayerSystem:
         
         # Start dash
         self.player.is_dashing = True
-        self.player.dash_start_time = time.time()
-        self.player.last_dash_time = time.time()
+        self.player.dash_start_time = self.game.now()
+        self.player.last_dash_time = self.game.now()
+        
+        self.game.effects_system.emit_trail_particle(self.player.pos[0], self.player.pos[1])
 
         return True
 
     def can_dash(self):
         """Check if player can perform a dash"""
-        current_time = time.time()
+        current_time = self.game.now()
         return (not self.player.is_dashing and 
                 current_time - self.player.last_dash_time >= self.player.dash_cooldown)
 
     def start_invincibility(self):
         """Start player invincibility period"""
         self.player.is_invincible = True
-        self.player.invincibility_start_time = time.time()
+        self.player.invincibility_start_time = self.game.now()
+        
+        # Flash blue between 0.4 and 1.0 until the period runs out
+        period = 2 * math.pi / self.player.invincibility_flash_speed
+        timeline = Timeline("invincibility", duration=self.player.invincibility_duration,
+                            on_finish=self.end_invincibility)
+        timeline.add_track(self.set_invincibility_flash, [
+            (0, 0.7),
+            (period * 0.25, 1.0, "sine_out"),
+            (period * 0.5, 0.7, "sine_in"),
+            (period * 0.75, 0.4, "sine_out"),
+            (period, 0.7, "sine_in")
+        ], loop=True)
+        self.game.timeline_system.stop(self.invincibility_timeline)
+        self.invincibility_timeline = self.game.timeline_system.play(timeline)
 
     def cleanup(self):
         """Clean up system resources"""
+        # Release the key handlers so the old system can be freed on restart
+        for key in MOVEMENT_KEYS:
+            self.game.ignore(key)
+            self.game.ignore(key + "-up")
+        self.game.timeline_system.stop(self.invincibility_timeline)
+        self.invincibility_timeline = None
         self.player.cleanup()
\ No newline at end of file
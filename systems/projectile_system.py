@@ -1,31 +1,50 @@
-from panda3d.core import CardMaker, TransparencyAttrib
+import numpy as np
 from direct.task import Task
-from utils.resource_loader import get_resource_path
+from core.config import bullet_mode
+from effects.bullet_renderer import GpuBulletRenderer
+from utils.collision import sweep_points_vs_boxes
+from utils.projectile_rows import ProjectileRows
 
 class ProjectileSystem:
     def __init__(self, game):
         self.game = game
-        self.projectiles = []  # Player projectiles
-        self.projectile_speed = 0.03
+        self.projectiles = ProjectileRows()  # Player projectiles
+        self.projectile_speed = 1.8  # Units per second
         self.fire_rate = 0.1  # Time in seconds between shots
         self.last_fire_time = 0
+        self.enemy_hit_size = 0.07
+        self.boss_hit_size = 0.3
+
+        # Hit targets, enemies first and the boss last, in rows reused every frame
+        self.targets = np.zeros((64, 2), dtype=np.float64)
+        self.target_half_extents = np.zeros((64, 2), dtype=np.float64)
+
+        # GPU bullet mode keeps projectiles as spawn state moved by a shader
+        self.gpu_bullets = None
+        if bullet_mode.getValue() == "gpu":
+            self.gpu_bullets = GpuBulletRenderer(
+                game.render2d, game.sprite_atlas, "bullet", 0.02,
+                bounds=(-game.aspect_ratio - 0.1, game.aspect_ratio + 0.1, -1.1, 1.1)
+            )
+            self.last_bullet_time = game.actual_game_time
 
     def create_projectile(self, position, direction):
         """Create a new projectile at given position moving in given direction"""
-        cm = CardMaker("projectile")
-        projectile_size = 0.02
-        cm.setFrame(-projectile_size, projectile_size, -projectile_size, projectile_size)
-        projectile = self.game.render2d.attachNewNode(cm.generate())
-        
-        projectile_tex = self.game.loader.loadTexture(get_resource_path("orb.png"))
-        projectile.setTexture(projectile_tex)
-        projectile.setTransparency(TransparencyAttrib.MAlpha)
-        
+        if self.gpu_bullets:
+            self.gpu_bullets.spawn(position[0], position[1],
+                                   direction[0] * self.projectile_speed,
+                                   direction[1] * self.projectile_speed,
+                                   self.game.actual_game_time)
+            self.play_gun_sound()
+            return
+
+        projectile = self.game.sprite_pool.acquire("projectile")
         projectile.setPos(position[0], 0, position[1])
-        projectile.setPythonTag("direction", direction)
-        self.projectiles.append(projectile)
+        self.projectiles.add(projectile, direction[0], direction[1])
+        self.play_gun_sound()
 
-        # Play gun sound if available
+    def play_gun_sound(self):
+        """Play gun sound if available"""
         if hasattr(self.game, 'gun_sound') and self.game.gun_sound:
             self.game.gun_sound.play()
 
@@ -34,86 +53,144 @@ class ProjectileSystem:
         if self.game.paused or self.game.game_over:
             return Task.cont
 
-        # Update projectiles
-        for projectile in self.projectiles[:]:
-            current_pos = projectile.getPos()
-            direction = projectile.getPythonTag("direction")
-            new_x = current_pos[0] + direction[0] * self.projectile_speed
-            new_z = current_pos[2] + direction[1] * self.projectile_speed
-            projectile.setPos(new_x, 0, new_z)
-            
-            # Remove if off screen
-            if (new_x > self.game.aspect_ratio + 0.1 or 
-                new_x < -self.game.aspect_ratio - 0.1 or 
-                new_z > 1.1 or 
-                new_z < -1.1):
-                projectile.removeNode()
-                self.projectiles.remove(projectile)
-                continue
-
-            # Check collisions with enemies
-            self.check_enemy_collisions(projectile, (new_x, new_z))
-            
-            # Check collisions with boss
-            if self.game.boss_system.boss:
-                self.check_boss_collision(projectile, (new_x, new_z))
+        if self.gpu_bullets:
+            self.update_gpu_bullets()
+        elif self.projectiles:
+            self.update_projectiles(self.game.frame_dt)
 
         return Task.cont
 
-    def check_enemy_collisions(self, projectile, proj_pos):
-        """Check projectile collision with enemies"""
-        for enemy in self.game.enemy_system.enemies[:]:
-            enemy_pos = enemy.get_position()
-            if (abs(proj_pos[0] - enemy_pos[0]) < 0.07 and 
-                abs(proj_pos[1] - enemy_pos[1]) < 0.07):
-                # Create explosion effect
-                self.game.effects_system.create_explosion(enemy_pos[0], enemy_pos[1])
-                
-                # Update score
-                self.game.score += 1
-                self.game.ui_system.update_score(self.game.score)
-                
-                # Handle enemy destruction
-                self.game.enemy_system.destroy_enemy(enemy)
-                projectile.removeNode()
-                self.projectiles.remove(projectile)
-                
-                # Check for difficulty increase
-                self.game.enemy_system.check_difficulty_increase()
-                break
-
-    def check_boss_collision(self, projectile, proj_pos):
-        """Check projectile collision with boss"""
-        if not self.game.boss_system.boss:
+    def update_projectiles(self, dt):
+        """Move every projectile by dt seconds and sweep its path for hits"""
+        batcher = self.game.sprite_batcher
+        rows = self.projectiles
+        count = len(rows)
+        slots = rows.slots[:count]
+        starts = np.column_stack((batcher.x[slots], batcher.z[slots])).astype(np.float64)
+        ends = starts + rows.directions[:count] * (self.projectile_speed * dt)
+        batcher.x[slots] = ends[:, 0]
+        batcher.z[slots] = ends[:, 1]
+
+        # Remove projectiles that hit something or left the screen
+        removed = ((np.abs(ends[:, 0]) > self.game.aspect_ratio + 0.1) |
+                   (np.abs(ends[:, 1]) > 1.1))
+        hits = self.resolve_hits(starts, ends)
+        if hits:
+            removed[hits] = True
+        for row in np.flatnonzero(removed)[::-1]:
+            self.remove_projectile(row)
+
+    def remove_projectile(self, row):
+        """Remove a projectile and return its sprite to the pool"""
+        self.game.sprite_pool.release(self.projectiles.remove(row))
+
+    def update_gpu_bullets(self):
+        """Resolve GPU bullet hits analytically over the time since the last update"""
+        bullets = self.gpu_bullets
+        now = self.game.actual_game_time
+        previous = self.last_bullet_time
+        self.last_bullet_time = now
+        bullets.set_time(now)
+        if bullets.count == 0:
             return
+
+        removed = list(bullets.expired(now))
+        removed.extend(self.resolve_hits(bullets.positions_at(previous), bullets.positions_at(now)))
+        if removed:
+            bullets.remove(removed)
+
+    def resolve_hits(self, starts, ends):
+        """Sweep projectile paths against enemies and the boss, returning the projectiles that hit"""
+        # Every target the projectiles can hit, with enemies first and the boss last,
+        # copied straight from the enemy arrays rather than one tuple per enemy
+        enemy_system = self.game.enemy_system
+        enemies = enemy_system.enemies
+        boss = self.game.boss_system.boss
+        hit_boss = boss and not self.game.boss_system.boss_death_sequence
+        n = len(enemies)
+        count = n + 1 if hit_boss else n
+        if count == 0:
+            return []
+        if count > len(self.targets):
+            self.targets = np.zeros((count * 2, 2), dtype=np.float64)
+            self.target_half_extents = np.zeros((count * 2, 2), dtype=np.float64)
+        targets = self.targets[:count]
+        half_extents = self.target_half_extents[:count]
+        targets[:n] = enemy_system.positions[:n]
+        half_extents[:n] = self.enemy_hit_size
+        if hit_boss:
+            targets[n] = boss.pos
+            half_extents[n] = self.boss_hit_size
+
+        toi, target = sweep_points_vs_boxes(starts, ends, targets, half_extents)
+
+        # Apply hits in the order they happened; each enemy only absorbs one projectile
+        hits = []
+        hit_projectiles = np.flatnonzero(target >= 0)
+        destroyed = set()
+        for projectile in hit_projectiles[np.argsort(toi[hit_projectiles], kind='stable')]:
+            index = int(target[projectile])
+            if index < len(enemies):
+                if index in destroyed:
+                    continue
+                destroyed.add(index)
+                self.hit_enemy(enemies[index])
+            elif not self.hit_boss():
+                continue
+            hits.append(int(projectile))
+
+        # Destroy after the loop so target indices stay valid
+        for index in sorted(destroyed, reverse=True):
+            self.game.enemy_system.destroy_enemy(enemies[index])
+            self.game.enemy_system.check_difficulty_increase()
+        return hits
+
+    def hit_enemy(self, enemy):
+        """Show the explosion and score for a projectile hitting an enemy"""
+        enemy_pos = enemy.get_position()
+        self.game.effects_system.create_explosion(enemy_pos[0], enemy_pos[1])
+        
+        # Update score
+        self.game.score += 1
+        self.game.ui_system.update_score(self.game.score)
+
+    def hit_boss(self):
+        """Damage the boss with a projectile, returning False if it can't be hit"""
+        boss_system = self.game.boss_system
+        if not boss_system.boss or boss_system.boss_death_sequence:
+            return False
+
+        boss_pos = boss_system.boss.get_position()
+        # Create explosion effect
+        self.game.effects_system.create_explosion(boss_pos[0], boss_pos[1])
+        
+        # Handle boss damage
+        if boss_system.boss.take_damage():
+            # Boss defeated
+            self.game.score += 10
+            self.game.ui_system.update_score(self.game.score)
+            boss_system.start_death_sequence()
             
-        boss_pos = self.game.boss_system.boss.get_position()
-        if (abs(proj_pos[0] - boss_pos[0]) < 0.3 and 
-            abs(proj_pos[1] - boss_pos[1]) < 0.3):
-            # Create explosion effect
-            self.game.effects_system.create_explosion(boss_pos[0], boss_pos[1])
-            
-            # Handle boss damage
-            if self.game.boss_system.boss.take_damage():
-                # Boss defeated
-                self.game.score += 10
-                self.game.ui_system.update_score(self.game.score)
-                self.game.boss_system.start_death_sequence()
-                
-                # Play death sound
-                if hasattr(self.game, 'enemy_death_sound') and self.game.enemy_death_sound:
-                    self.game.enemy_death_sound.play()
-            else:
-                # Boss still alive
-                if hasattr(self.game, 'enemy_death_sound') and self.game.enemy_death_sound:
-                    self.game.enemy_death_sound.play()
-            
-            # Remove projectile
-            projectile.removeNode()
-            self.projectiles.remove(projectile)
+            # Play death sound
+            if hasattr(self.game, 'enemy_death_sound') and self.game.enemy_death_sound:
+                self.game.enemy_death_sound.play()
+        else:
+            # Boss still alive
+            if hasattr(self.game, 'enemy_death_sound') and self.game.enemy_death_sound:
+                self.game.enemy_death_sound.play()
+        return True
+
+    def reset(self):
+        """Remove every projectile, keeping the GPU bullets' renderer for the next run"""
+        for projectile in self.projectiles.clear():
+            self.game.sprite_pool.release(projectile)
+        if self.gpu_bullets:
+            self.gpu_bullets.clear()
+            self.last_bullet_time = self.game.actual_game_time
 
     def cleanup(self):
         """Clean up system resources"""
-        for projectile in self.projectiles:
-            projectile.removeNode()
-        self.projectiles.clear()
\ No newline at end of file
+        self.reset()
+        if self.gpu_bullets:
+            self.gpu_bullets.destroy()
+            self.gpu_bullets = None
\ No newline at end of file
@@ -0,0 +1,52 @@
+from direct.task import Task
+
+class TimelineSystem:
+    def __init__(self, game):
+        self.game = game
+        self.active = []  # Only running timelines are ever visited
+        self.visiting = []  # Reused copy of active, so callbacks can start and stop timelines
+
+    def play(self, timeline, restart=True):
+        """Start (or restart) advancing a timeline"""
+        if restart:
+            timeline.reset()
+        if timeline not in self.active:
+            self.active.append(timeline)
+        return timeline
+
+    def stop(self, timeline):
+        """Stop a timeline without firing its finish callback"""
+        if timeline is None:
+            return
+        timeline.finished = True
+        if timeline in self.active:
+            self.active.remove(timeline)
+
+    def is_playing(self, timeline):
+        """Check whether a timeline is still running"""
+        return timeline in self.active
+
+    def update(self, task):
+        """Advance every active timeline by the frame's game time"""
+        if not self.active:
+            return Task.cont
+
+        dt = self.game.frame_dt
+        frozen = self.game.paused or self.game.game_over
+
+        visiting = self.visiting
+        visiting.extend(self.active)
+        for timeline in visiting:
+            if frozen and timeline.pausable:
+                continue
+            if not timeline.advance(dt) and timeline in self.active:
+                self.active.remove(timeline)
+        visiting.clear()
+
+        return Task.cont
+
+    def cleanup(self):
+        """Stop all timelines"""
+        for timeline in self.active:
+            timeline.finished = True
+        self.active.clear()
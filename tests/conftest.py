@@ -0,0 +1,57 @@
+import os
+import sys
+import pytest
+from panda3d.core import PNMImage
+
+# Tests import the game's packages from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from core.world import World
+
+# Plain-coloured stand-ins for the game's images, which aren't in the repository:
+# name -> ((width, height), (r, g, b))
+PLACEHOLDER_IMAGES = {
+    "map.png": ((512, 256), (0.2, 0.3, 0.2)),
+    "town.png": ((512, 256), (0.4, 0.3, 0.2)),
+    "player.png": ((32, 32), (0.0, 0.5, 1.0)),
+    "enemy.png": ((64, 64), (1.0, 0.0, 0.0)),
+    "boss1.png": ((256, 256), (0.6, 0.0, 0.6)),
+    "orb.png": ((32, 32), (1.0, 1.0, 0.0)),
+}
+
+def has_images(directory):
+    """Check whether a directory holds every image the game loads"""
+    return all(os.path.exists(os.path.join(directory, "images", name)) for name in PLACEHOLDER_IMAGES)
+
+@pytest.fixture(scope="session", autouse=True)
+def game_assets(tmp_path_factory):
+    """Run from a directory holding the game's images, writing placeholders when there's none"""
+    start = os.getcwd()
+    if has_images(start):
+        yield start
+        return
+    if has_images(REPO_ROOT):
+        directory = REPO_ROOT
+    else:
+        # Like the game, resources are found relative to the working directory
+        directory = str(tmp_path_factory.mktemp("assets"))
+        os.makedirs(os.path.join(directory, "images"))
+        for name, (size, color) in PLACEHOLDER_IMAGES.items():
+            image = PNMImage(size[0], size[1], 4)
+            image.fill(*color)
+            image.alphaFill(1)
+            image.write(os.path.join(directory, "images", name))
+    os.chdir(directory)
+    try:
+        yield directory
+    finally:
+        os.chdir(start)
+
+@pytest.fixture
+def world():
+    """A headless world with a run started"""
+    world = World(seed=0)
+    world.restart(0)
+    yield world
+    world.cleanup()
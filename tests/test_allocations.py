@@ -0,0 +1,53 @@
+import gc
+import sys
+from core.env import VirtualGamepad
+
+def hold_steady(world):
+    """Fire upward forever with every enemy parked where no shot or bullet reaches it
+
+    The boss stands still and keeps firing fast bullets at the invincible
+    player, so projectiles of both kinds are spawned, moved and removed every
+    few frames while nothing dies, nothing new is created and the number in
+    flight soon levels off.
+    """
+    gamepad = VirtualGamepad()
+    world.gamepad = gamepad
+    gamepad.set_sticks(0.0, 0.0, 0.0, 1.0)
+    world.player_system.player.is_invincible = True
+
+    enemy_system = world.enemy_system
+    for row in range(len(enemy_system.enemies)):
+        enemy_system.positions[row] = (-1.5, -0.8 + 0.4 * row)
+        enemy_system.speeds[row] = 0
+    boss_system = world.boss_system
+    boss_system.spawn_boss()
+    boss_system.boss.pos[:] = (1.4, -0.7)
+    boss_system.boss.speed_multiplier = 0
+    boss_system.projectile_speed = 1.2
+
+def retained_blocks(world, steps, dt=1 / 60):
+    """Step the world and count the memory blocks still allocated afterwards"""
+    gc.collect()
+    before = sys.getallocatedblocks()
+    for _ in range(steps):
+        world.step(dt)
+    gc.collect()
+    return sys.getallocatedblocks() - before
+
+def test_steady_steps_retain_no_memory(world):
+    """Steps may allocate temporaries, but none of them may outlive the step"""
+    hold_steady(world)
+    # Pools, buffers and NumPy's own caches fill during warm-up, which ends
+    # well before the blue orb's first spawn
+    retained_blocks(world, 360)
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        retained = retained_blocks(world, 120)
+    finally:
+        if enabled:
+            gc.enable()
+    assert len(world.projectile_system.projectiles) and len(world.boss_system.boss_projectiles)
+    # Far fewer than one block per step; anything kept per step would show up as hundreds
+    assert retained < 16
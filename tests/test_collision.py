@@ -0,0 +1,43 @@
+import numpy as np
+from utils.collision import sweep_points_vs_boxes
+
+def test_fast_point_hits_a_box_it_steps_past():
+    # One step carries the point from well before a 0.1-wide box to well past it
+    starts = np.array([[-1.0, 0.0]])
+    ends = np.array([[1.0, 0.0]])
+    toi, target = sweep_points_vs_boxes(starts, ends, np.array([[0.0, 0.0]]), np.array([[0.05, 0.05]]))
+    assert target[0] == 0
+    assert toi[0] == np.float64(0.475)
+
+def test_point_hits_a_box_moving_across_its_path():
+    # Neither the point nor the box overlaps the other at either end of the step
+    starts = np.array([[0.0, -0.5]])
+    ends = np.array([[0.0, 0.5]])
+    toi, target = sweep_points_vs_boxes(starts, ends, np.array([[-0.5, 0.0]]), np.array([[0.05, 0.05]]),
+                                        np.array([[0.5, 0.0]]))
+    assert target[0] == 0 and 0 < toi[0] < 1
+
+def test_earliest_box_is_reported():
+    starts = np.array([[0.0, 0.0], [0.0, 5.0]])
+    ends = np.array([[1.0, 0.0], [1.0, 5.0]])
+    centers = np.array([[0.8, 0.0], [0.3, 0.0], [0.5, 3.0]])
+    toi, target = sweep_points_vs_boxes(starts, ends, centers, np.full((3, 2), 0.05))
+    assert target.tolist() == [1, -1]
+    assert toi[0] == np.float64(0.25) and np.isinf(toi[1])
+
+def test_projectile_does_not_tunnel_through_an_enemy_in_a_long_frame(world):
+    enemy_system = world.enemy_system
+    count = len(enemy_system.enemies)
+    # Park every enemy but the first out of the way
+    for row in range(1, count):
+        enemy_system.positions[row] = (-1.5, -0.8 + 0.1 * row)
+    enemy_system.positions[0] = (0.0, 0.05)
+
+    projectiles = world.projectile_system
+    projectiles.create_projectile((0.0, -0.4), (0.0, 1.0))
+    # Half a second moves the projectile 0.9 units, clean past the 0.14-wide enemy
+    projectiles.update_projectiles(0.5)
+
+    assert world.score == 1
+    assert len(enemy_system.enemies) == count - 1
+    assert len(projectiles.projectiles) == 0
@@ -0,0 +1,24 @@
+import numpy as np
+
+def settle(enemy_system, radius, strength, count=30, steps=600):
+    """Steer a crowd starting on one spot toward that spot and get its median nearest-neighbour distance"""
+    positions = np.random.default_rng(0).normal(0.0, 0.01, (count, 2))
+    state = (positions, np.full(count, 0.3), np.full(count, radius), np.full(count, strength))
+    active = np.arange(count)
+    dt = np.full(count, 1 / 60)
+    for _ in range(steps):
+        positions[:] = enemy_system.compute_steering(state, (0.0, 0.0), dt, active)
+    distance = np.linalg.norm(positions[:, None] - positions[None], axis=2)
+    np.fill_diagonal(distance, np.inf)
+    return np.median(distance.min(axis=1))
+
+def test_separation_spreads_a_crowd(world):
+    enemy_system = world.enemy_system
+    stacked = settle(enemy_system, 0.12, 0.0)
+    spread = settle(enemy_system, 0.12, 1.5)
+    assert stacked < 0.005
+    assert spread > 0.04
+
+def test_spacing_follows_the_separation_radius(world):
+    enemy_system = world.enemy_system
+    assert settle(enemy_system, 0.24, 1.5) > 1.5 * settle(enemy_system, 0.12, 1.5)
@@ -0,0 +1,58 @@
+import numpy as np
+from utils.flow_field import FlowField
+
+# A 10x10 grid of 0.1 cells with a one-cell-thick diagonal wall from corner to
+# corner, open at one gap, splitting it into the cells above and below the wall
+SIZE = 10
+GAP = (7, 7)  # (column, row)
+
+def make_field():
+    field = FlowField((0.0, 1.0, 0.0, 1.0), 0.1)
+    blocked = np.zeros((SIZE, SIZE), dtype=bool)
+    blocked[np.arange(SIZE), np.arange(SIZE)] = True
+    blocked[GAP[1], GAP[0]] = False
+    field.set_blocked(blocked)
+    return field
+
+def center(column, row):
+    return np.array([[(column + 0.5) * 0.1, (row + 0.5) * 0.1]])
+
+def follow(field, column, row):
+    """Walk the field cell by cell from a cell, returning the cells visited"""
+    path = [(column, row)]
+    for _ in range(SIZE * SIZE):
+        direction = field.sample(center(column, row))[0]
+        if not direction.any():
+            break
+        column += int(np.sign(np.round(direction[0], 6)))
+        row += int(np.sign(np.round(direction[1], 6)))
+        path.append((column, row))
+    return path
+
+def test_paths_go_through_the_gap_not_the_diagonal_wall():
+    field = make_field()
+    field.update(center(1, 8)[0])
+    path = follow(field, 8, 1)
+
+    assert path[-1] == (1, 8)
+    assert GAP in path
+    assert not any(field.blocked[row, column] for column, row in path)
+    # Every step stays on one side of the wall except through the gap
+    for (column, row), (next_column, next_row) in zip(path, path[1:]):
+        assert not field.blocked[row, next_column] and not field.blocked[next_row, column]
+
+def test_no_direction_cuts_a_blocked_corner():
+    field = make_field()
+    field.update(center(1, 8)[0])
+    for row in range(SIZE):
+        for column in range(SIZE):
+            direction = field.sample(center(column, row))[0]
+            dx = int(np.sign(np.round(direction[0], 6)))
+            dy = int(np.sign(np.round(direction[1], 6)))
+            if dx and dy:
+                assert not field.blocked[row, column + dx] and not field.blocked[row + dy, column]
+
+    # Beside the wall, away from the gap, the field leads along the wall
+    # rather than diagonally across it
+    direction = field.sample(center(5, 4))[0]
+    assert not (direction[0] < 0 and direction[1] > 0)
@@ -0,0 +1,19 @@
+import pytest
+
+def move_right(world, frame_rate, seconds=1.0):
+    """Hold right for the given time at a frame rate and return the distance covered"""
+    player_system = world.player_system
+    player_system.keys["arrow_right"] = True
+    start = player_system.player.pos[0]
+    world.frame_dt = 1 / frame_rate
+    for _ in range(round(seconds * frame_rate)):
+        player_system.update(None)
+    player_system.keys["arrow_right"] = False
+    return player_system.player.pos[0] - start
+
+def test_movement_is_independent_of_frame_rate(world):
+    slow = move_right(world, 30)
+    world.player_system.player.update_position(-slow, 0)
+    fast = move_right(world, 120)
+    assert slow == pytest.approx(world.player_system.player.movement_speed)
+    assert fast == pytest.approx(slow)
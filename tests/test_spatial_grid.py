@@ -0,0 +1,59 @@
+import numpy as np
+from utils.spatial_grid import SpatialGrid
+
+RADIUS = 0.1
+
+def crowd(count, density=400, seed=0):
+    """Scatter points uniformly over a square sized to hold them at a given density per unit area"""
+    half = np.sqrt(count / density) / 2
+    points = np.random.default_rng(seed).uniform(-half, half, (count, 2))
+    return points, (-half, half, -half, half)
+
+def close_pairs(points, radius):
+    """Every ordered pair of distinct points closer than radius, found by brute force"""
+    distance = np.linalg.norm(points[:, None] - points[None], axis=2)
+    first, second = np.nonzero(distance < radius)
+    distinct = first != second
+    return set(zip(first[distinct].tolist(), second[distinct].tolist()))
+
+def test_neighbor_pairs_find_every_close_pair():
+    points, bounds = crowd(500)
+    grid = SpatialGrid(bounds, RADIUS)
+    grid.rebuild(points)
+    first, second = grid.neighbor_pairs()
+    found = set(zip(first.tolist(), second.tolist()))
+
+    assert close_pairs(points, RADIUS) <= found
+    # Candidates come only from the same or adjacent cells
+    assert np.all(np.abs(grid.cell_x[first] - grid.cell_x[second]) <= 1)
+    assert np.all(np.abs(grid.cell_y[first] - grid.cell_y[second]) <= 1)
+
+def test_neighbor_pairs_for_queries_index_into_them():
+    points, bounds = crowd(300)
+    grid = SpatialGrid(bounds, RADIUS)
+    grid.rebuild(points)
+    queries = np.arange(0, 300, 7)
+    first, second = grid.neighbor_pairs(queries)
+    every_first, every_second = grid.neighbor_pairs()
+    queried = set(queries.tolist())
+    expected = {(i, j) for i, j in zip(every_first.tolist(), every_second.tolist()) if i in queried}
+    assert set(zip(queries[first].tolist(), second.tolist())) == expected
+
+def test_layers_never_neighbour():
+    points, bounds = crowd(200)
+    grid = SpatialGrid(bounds, RADIUS)
+    # The same points twice, in two layers
+    grid.rebuild(np.concatenate((points, points)), np.repeat([0, 1], 200))
+    first, second = grid.neighbor_pairs()
+    assert np.all((first < 200) == (second < 200))
+
+def test_candidate_pairs_grow_linearly():
+    per_point = []
+    for count in (500, 4000):
+        points, bounds = crowd(count)
+        grid = SpatialGrid(bounds, RADIUS)
+        grid.rebuild(points)
+        per_point.append(len(grid.neighbor_pairs()[0]) / count)
+    # At a fixed crowd density each point has about as many candidates at any count
+    assert per_point[1] < per_point[0] * 1.25
+    assert per_point[1] < 4000 / 20
@@ -0,0 +1,15 @@
+import pytest
+
+def test_removed_sprite_cannot_change_others(world):
+    batcher = world.sprite_batcher
+    removed = batcher.create_sprite("player", 0.02)
+    kept = batcher.create_sprite("player", 0.02)
+    kept.setPos(0.5, 0, -0.25)
+    removed.removeNode()
+
+    with pytest.raises(AssertionError):
+        removed.setPos(0.0, 0, 0.0)
+    with pytest.raises(AssertionError):
+        removed.hide()
+    assert kept.getPos() == (0.5, 0.0, -0.25)
+    assert batcher.shown[kept.index]
@@ -0,0 +1,22 @@
+from panda3d.core import Texture
+from managers.texture_manager import TextureManager
+
+def make_texture(name):
+    """Build a small texture in memory, with no file behind it"""
+    texture = Texture(name)
+    texture.setup2dTexture(16, 16, Texture.T_unsigned_byte, Texture.F_rgba8)
+    texture.setRamImage(bytes(16 * 16 * 4))
+    return texture
+
+def test_in_memory_textures_are_not_evicted():
+    manager = TextureManager(budget_bytes=0)
+    manager.acquire("generated", make_texture)
+    manager.acquire("map.png")
+    manager.release("generated")
+    manager.release("map.png")
+
+    assert manager.entries["generated"].resident
+    assert manager.entries["generated"].texture.hasRamImage()
+    assert not manager.entries["map.png"].resident
+    # What stays in memory is still counted against the budget
+    assert manager.get_resident_bytes() == sum(manager.get_footprint(manager.entries["generated"].texture))
@@ -0,0 +1,50 @@
+import numpy as np
+from core.env import GameEnv
+from core.world import WorldBatch
+from core.vector_env import SharedBuffers, step_batch
+
+# Seeds whose random-action episodes die within a hundred steps
+SEEDS = (1, 5)
+
+def test_batch_matches_single_envs_with_frame_skip():
+    singles = [GameEnv(frame_skip=4) for _ in SEEDS]
+    batch = WorldBatch(len(SEEDS))
+    envs = [GameEnv(world=world, frame_skip=4) for world in batch.worlds]
+    buffers = SharedBuffers(len(envs), envs[0].observation_size)
+    try:
+        for index, seed in enumerate(SEEDS):
+            singles[index].reset(seed=seed)
+            buffers.observations[index] = envs[index].reset(seed=seed)[0]
+
+        # Note the world's clock when the batch resets a finished environment
+        ended_at = [None] * len(envs)
+        for index, env in enumerate(envs):
+            def reset(seed=None, options=None, env=env, index=index):
+                ended_at[index] = env.world.simulated_time
+                return GameEnv.reset(env, seed, options)
+            env.reset = reset
+
+        rngs = [np.random.default_rng(seed) for seed in SEEDS]
+        running = [True] * len(envs)
+        while any(running):
+            buffers.actions[:] = [rng.uniform(-1, 1, 5) for rng in rngs]
+            step_batch(batch, envs, buffers, 0)
+            for index, single in enumerate(singles):
+                if not running[index]:
+                    continue
+                observation, reward, terminated, _, info = single.step(buffers.actions[index])
+                assert buffers.rewards[index] == np.float32(reward)
+                assert buffers.terminated[index] == terminated
+                assert buffers.scores[index] == info["score"]
+                if terminated:
+                    running[index] = False
+                    assert single.world.game_over
+                    # The finished world wasn't stepped past the end of its episode
+                    assert ended_at[index] == single.world.simulated_time
+                else:
+                    np.testing.assert_array_equal(buffers.observations[index], observation)
+    finally:
+        buffers.close(unlink=True)
+        batch.cleanup()
+        for single in singles:
+            single.close()
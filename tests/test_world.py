@@ -0,0 +1,49 @@
+from panda3d.core import NodePath, loadPrcFileData, unloadPrcFile
+from core.world import World
+
+def background_refs(world):
+    """Get the references held on the combat background texture"""
+    return world.texture_manager.entries["map.png"].refs
+
+def test_background_is_released_once():
+    world = World(seed=0)
+    world.restart(0)
+    held = background_refs(world)
+    world.transition_to_town()
+    assert background_refs(world) == held - 1
+    world.cleanup()
+    assert background_refs(world) == held - 1
+
+def test_restart_returns_from_town():
+    world = World(seed=0)
+    world.restart(0)
+    held = background_refs(world)
+    world.transition_to_town()
+    world.restart(0)
+    assert background_refs(world) == held
+    assert not world.background_node.isHidden()
+    assert world.town_area.background_node.isHidden()
+    world.cleanup()
+    assert background_refs(world) == held - 1
+
+def test_gpu_world_cleanup_leaves_no_nodes():
+    page = loadPrcFileData("gpu bullets", "bullet-mode gpu")
+    try:
+        render2d = NodePath("render2d")
+        world = World(render2d, seed=0)
+    finally:
+        unloadPrcFile(page)
+    assert world.projectile_system.gpu_bullets and world.boss_system.gpu_bullets
+
+    # Restarting reuses the renderers that cleanup destroys
+    world.restart(0)
+    world.transition_to_town()
+    world.restart(0)
+    assert world.projectile_system.gpu_bullets and world.boss_system.gpu_bullets
+    for _ in range(30):
+        world.step(1 / 60)
+
+    world.cleanup()
+    assert world.projectile_system.gpu_bullets is None
+    assert world.boss_system.gpu_bullets is None
+    assert render2d.getNumChildren() == 0
@@ -45,6 +45,7 @@ class UISystem:
             mayChange=True,
             bg=(0, 0, 0, 0.5)  # Semi-transparent black background
         )
+        self.debug_shown = None  # Values the debug text was last built from
 
     def update_score(self, score):
         """Update score display"""
@@ -68,14 +69,27 @@ class UISystem:
 
     def update_debug_text(self):
         """Update debug information display"""
-        current_time = self.game.actual_game_time
-        effective_time = self.game.enemy_system.game_start_time - self.game.game_start_time
+        game = self.game
+        batcher = game.sprite_batcher
+        # Times are shown to a tenth of a second, so compare them at that precision
+        shown = (game.enemy_system.enemy_limit,
+                 round((game.enemy_system.game_start_time - game.game_start_time) * 10),
+                 round(game.actual_game_time * 10),
+                 game.level,
+                 batcher.visible_count,
+                 len(batcher.alive) - len(batcher.free_slots))
+        # Rebuilding the text and its geometry is only worth it when something shown changed
+        if shown == self.debug_shown:
+            return
+        self.debug_shown = shown
         
+        enemy_limit, effective_time, current_time, level, visible, sprites = shown
         debug_str = (
-            f"Enemy Limit: {self.game.enemy_system.enemy_limit}\n"
-            f"Game Time: {effective_time:.1f}s\n"
-            f"Boss Time: {current_time:.1f}s\n"
-            f"Level: {self.game.level}"
+            f"Enemy Limit: {enemy_limit}\n"
+            f"Game Time: {effective_time / 10:.1f}s\n"
+            f"Boss Time: {current_time / 10:.1f}s\n"
+            f"Level: {level}\n"
+            f"Sprites: {visible}/{sprites} visible"
         )
         
         self.debug_text.setText(debug_str)
@@ -85,4 +99,28 @@ class UISystem:
         self.score_text.destroy()
         self.game_over_text.destroy()
         self.pause_text.destroy()
-        self.debug_text.destroy()
\ No newline at end of file
+        self.debug_text.destroy()
+
+class HeadlessUI:
+    """Stands in for UISystem in worlds nobody looks at"""
+
+    def update_score(self, score):
+        pass
+
+    def show_game_over(self):
+        pass
+
+    def hide_game_over(self):
+        pass
+
+    def show_pause(self):
+        pass
+
+    def hide_pause(self):
+        pass
+
+    def update_debug_text(self):
+        pass
+
+    def cleanup(self):
+        pass
@@ -0,0 +1,97 @@
+import numpy as np
+
+def swept_box_pairs(starts, ends, centers, half_extents, center_ends=None):
+    """Get (point, box) index arrays of the pairs whose bounding boxes over the step overlap
+
+    This is the broad phase: a pair that touches at any time during the step
+    is always among these. Boxes are sorted by their left edge, so each point
+    only looks at the run of boxes that can reach its x range, and candidates
+    grow with the overlaps found rather than points times boxes.
+    """
+    point_low = np.minimum(starts, ends)
+    point_high = np.maximum(starts, ends)
+    box_low = centers - half_extents
+    box_high = centers + half_extents
+    if center_ends is not None:
+        box_low = np.minimum(box_low, center_ends - half_extents)
+        box_high = np.maximum(box_high, center_ends + half_extents)
+
+    # A box reaching a point's x range starts at most the widest box's width left of it
+    order = np.argsort(box_low[:, 0], kind='stable')
+    left_edges = box_low[order, 0]
+    widest = (box_high[:, 0] - box_low[:, 0]).max()
+    first = np.searchsorted(left_edges, point_low[:, 0] - widest, side='left')
+    run = np.searchsorted(left_edges, point_high[:, 0], side='right') - first
+    total = int(run.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+    # Expand every point into one entry per box in its run
+    points = np.repeat(np.arange(len(starts)), run)
+    within = np.arange(total) - np.repeat(np.cumsum(run) - run, run)
+    boxes = order[np.repeat(first, run) + within]
+    overlap = np.all((point_low[points] <= box_high[boxes]) & (point_high[points] >= box_low[boxes]), axis=1)
+    return points[overlap], boxes[overlap]
+
+def sweep_points_vs_boxes(starts, ends, centers, half_extents, center_ends=None):
+    """Find where each moving point first touches any of a set of axis-aligned boxes
+
+    starts and ends are (n, 2) arrays of point positions at the start and end
+    of the step; centers and half_extents are (m, 2) arrays describing boxes.
+    Boxes that also moved during the step pass their end positions as
+    center_ends, and are swept relative to each point.
+
+    Returns (toi, target): the fraction of the step at first contact (inf
+    when nothing is touched) and the index of the box touched (-1 when none).
+    Only the pairs the broad phase finds are slab tested.
+    """
+    n = len(starts)
+    toi = np.full(n, np.inf)
+    target = np.full(n, -1, dtype=np.intp)
+    if n == 0 or len(centers) == 0:
+        return toi, target
+    points, boxes = swept_box_pairs(starts, ends, centers, half_extents, center_ends)
+    if len(points) == 0:
+        return toi, target
+
+    delta = ends[points] - starts[points]
+    if center_ends is not None:
+        delta -= center_ends[boxes] - centers[boxes]
+    offset = starts[points] - centers[boxes]
+    half = half_extents[boxes]
+
+    # Slab test: on each axis the point is inside the box between t_near and t_far
+    still = delta == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_low = (-half - offset) / delta
+        t_high = (half - offset) / delta
+    inside = np.abs(offset) < half
+    t_near = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t_low, t_high))
+    t_far = np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(t_low, t_high))
+
+    enter = t_near.max(axis=1)
+    leave = t_far.min(axis=1)
+    hit = np.flatnonzero((enter < leave) & (enter <= 1) & (leave >= 0))
+    if len(hit) == 0:
+        return toi, target
+
+    # Each point keeps its earliest contact, the lowest box index on ties
+    times = np.maximum(enter[hit], 0)
+    order = np.lexsort((boxes[hit], times, points[hit]))
+    sorted_points = points[hit][order]
+    earliest = order[np.concatenate(([True], sorted_points[1:] != sorted_points[:-1]))]
+    toi[points[hit][earliest]] = times[earliest]
+    target[points[hit][earliest]] = boxes[hit][earliest]
+    return toi, target
+
+def exit_times(positions, velocities, bounds):
+    """Get how long each point moving in a straight line stays within bounds
+
+    bounds is (min_x, max_x, min_y, max_y); points that never leave get inf.
+    """
+    low = np.array([bounds[0], bounds[2]], dtype=np.float64)
+    high = np.array([bounds[1], bounds[3]], dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(velocities > 0, (high - positions) / velocities,
+                     np.where(velocities < 0, (low - positions) / velocities, np.inf))
+    return np.maximum(t.min(axis=1), 0)
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import math
+import numpy as np
+from panda3d.core import PNMImage
+from utils.resource_loader import get_resource_path
+from utils.debug import out
+
+# The eight neighbour steps (dx, dy) and what each costs to walk
+STEPS = [(dx, dy, math.hypot(dx, dy)) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+
+def obstacle_map_name(background_name):
+    """Get the obstacle map image that goes with an area background"""
+    return os.path.splitext(background_name)[0] + "_obstacles.png"
+
+class FlowField:
+    """Grid of directions leading every cell to one target cell around obstacles
+
+    The field is integrated once per target cell, so its cost does not depend
+    on how many agents sample it.
+    """
+
+    def __init__(self, bounds, cell_size):
+        self.bounds = bounds  # (min_x, max_x, min_y, max_y) covered by the grid
+        self.cell_size = cell_size
+        self.columns = max(1, int(math.ceil((bounds[1] - bounds[0]) / cell_size)))
+        self.rows = max(1, int(math.ceil((bounds[3] - bounds[2]) / cell_size)))
+
+        self.blocked = np.zeros((self.rows, self.columns), dtype=bool)
+        self.has_blocked = False
+        self.cost = np.zeros((self.rows, self.columns), dtype=np.float64)
+        self.directions = np.zeros((self.rows, self.columns, 2), dtype=np.float64)
+        self.target_cell = None
+        self.dirty = True
+
+    def has_obstacles(self):
+        """Check whether any cell is blocked"""
+        return self.has_blocked
+
+    def get_cells(self, positions):
+        """Get the (column, row) grid cell of each of an (n, 2) array of positions"""
+        column = ((positions[:, 0] - self.bounds[0]) / self.cell_size).astype(np.intp)
+        row = ((positions[:, 1] - self.bounds[2]) / self.cell_size).astype(np.intp)
+        return np.clip(column, 0, self.columns - 1), np.clip(row, 0, self.rows - 1)
+
+    def set_blocked(self, blocked):
+        """Replace the obstacle grid, a (rows, columns) bool array"""
+        self.blocked = np.asarray(blocked, dtype=bool)
+        self.has_blocked = bool(self.blocked.any())
+        self.dirty = True
+
+    def load_obstacles(self, image_name, frame):
+        """Load obstacles from an image stretched over frame (min_x, max_x, min_y, max_y)
+
+        Dark pixels are walls. A missing image means the area is open.
+        """
+        blocked = np.zeros((self.rows, self.columns), dtype=bool)
+        path = get_resource_path(image_name)
+        if not os.path.exists(path):
+            out(f"No obstacle map {image_name}, area is open", 3)
+            self.set_blocked(blocked)
+            return
+
+        image = PNMImage(path)
+        width, height = image.getXSize(), image.getYSize()
+        for row in range(self.rows):
+            y = self.bounds[2] + (row + 0.5) * self.cell_size
+            for column in range(self.columns):
+                x = self.bounds[0] + (column + 0.5) * self.cell_size
+                # Image rows run top-down while y runs bottom-up
+                u = (x - frame[0]) / (frame[1] - frame[0])
+                v = (frame[3] - y) / (frame[3] - frame[2])
+                if 0 <= u < 1 and 0 <= v < 1:
+                    blocked[row, column] = image.getBright(int(u * width), int(v * height)) < 0.5
+        out(f"Loaded obstacle map {image_name}: {int(blocked.sum())} blocked cells", 2)
+        self.set_blocked(blocked)
+
+    def update(self, target):
+        """Re-integrate the field if the target changed cell or obstacles changed"""
+        column, row = self.get_cells(np.array([target], dtype=np.float64))
+        cell = (int(column[0]), int(row[0]))
+        if cell == self.target_cell and not self.dirty:
+            return False
+        self.target_cell = cell
+        self.dirty = False
+        self.integrate(cell)
+        return True
+
+    def integrate(self, cell):
+        """Compute every cell's path cost to the target cell, then its step direction"""
+        column, row = cell
+        rows, columns = self.rows, self.columns
+        cost = np.full((rows, columns), np.inf)
+        cost[row, column] = 0
+
+        # What each step costs from each cell. A diagonal step may not cut past
+        # a blocked cell on either side, or paths would squeeze through
+        # one-cell-thick diagonal walls that slide can't stop agents crossing
+        open_cells = np.ones((rows + 2, columns + 2), dtype=bool)
+        open_cells[1:-1, 1:-1] = ~self.blocked
+        step_costs = [np.where(open_cells[1:-1, 1 + dx:1 + dx + columns] & open_cells[1 + dy:1 + dy + rows, 1:-1],
+                               step, np.inf)
+                      for dx, dy, step in STEPS]
+
+        # Relax all cells at once until no path gets shorter; each pass
+        # extends the settled region by one cell
+        padded = np.full((rows + 2, columns + 2), np.inf)
+        while True:
+            padded[1:-1, 1:-1] = cost
+            relaxed = cost.copy()
+            for (dx, dy, _), step_cost in zip(STEPS, step_costs):
+                np.minimum(relaxed, padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + columns] + step_cost, out=relaxed)
+            relaxed[self.blocked] = np.inf
+            relaxed[row, column] = 0
+            if np.array_equal(relaxed, cost):
+                break
+            cost = relaxed
+        self.cost = cost
+
+        # Each cell takes its cheapest allowed step; unreachable cells and the
+        # target cell itself get no direction
+        padded[1:-1, 1:-1] = cost
+        neighbor_costs = np.stack([padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + columns] + step_cost
+                                   for (dx, dy, _), step_cost in zip(STEPS, step_costs)])
+        best = np.argmin(neighbor_costs, axis=0)
+        steps = np.array([(dx / length, dy / length) for dx, dy, length in STEPS])
+        self.directions = steps[best]
+        self.directions[~np.isfinite(cost)] = 0
+        self.directions[row, column] = 0
+
+    def sample(self, positions):
+        """Get the flow direction at each of an (n, 2) array of positions"""
+        column, row = self.get_cells(positions)
+        return self.directions[row, column]
+
+    def slide(self, previous, positions):
+        """Stop points entering blocked cells, letting them slide along walls instead"""
+        column, row = self.get_cells(positions)
+        stuck = np.flatnonzero(self.blocked[row, column])
+        if len(stuck) == 0:
+            return
+
+        # Keep whichever single-axis move stays clear, else stay put
+        old = previous[stuck]
+        new = positions[stuck]
+        x_only = np.column_stack((new[:, 0], old[:, 1]))
+        y_only = np.column_stack((old[:, 0], new[:, 1]))
+        column, row = self.get_cells(x_only)
+        x_clear = ~self.blocked[row, column]
+        column, row = self.get_cells(y_only)
+        y_clear = ~self.blocked[row, column]
+        positions[stuck] = np.where(x_clear[:, None], x_only, np.where(y_clear[:, None], y_only, old))
\ No newline at end of file
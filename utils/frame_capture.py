@@ -0,0 +1,94 @@
+import numpy as np
+from panda3d.core import (GraphicsEngine, GraphicsPipe, GraphicsPipeSelection, GraphicsOutput,
+                          FrameBufferProperties, WindowProperties, Texture, Camera, OrthographicLens,
+                          RenderState, DepthTestAttrib, DepthWriteAttrib, CullFaceAttrib, RenderAttrib)
+
+def make_capture_pipe():
+    """Get a graphics pipe that can render without a display, preferring headless EGL"""
+    selection = GraphicsPipeSelection.getGlobalPtr()
+    # Mesa's EGL renders on a bare server; fall back to the configured display
+    pipe = selection.makeModulePipe("p3headlessgl")
+    if pipe is None or not pipe.isValid():
+        pipe = selection.makeDefaultPipe()
+    if pipe is None or not pipe.isValid():
+        raise RuntimeError("No graphics pipe can render offscreen")
+    return pipe
+
+class FrameCapture:
+    """Renders a 2D scene into an offscreen buffer and reads frames back as arrays
+
+    No window is opened. The buffer copies each captured frame into its
+    texture's RAM image, and the frame handed back is a NumPy view over that
+    image, flipped to top-row-first RGB by strides rather than copied. The
+    next capture overwrites it, so copy any frame that has to be kept.
+
+    The buffer only renders when a frame is captured: on request, or every
+    stride steps counted with count_step. A stride of 0 captures only on
+    request.
+    """
+
+    def __init__(self, scene, size=(320, 180), stride=0, lens=None, camera_parent=None,
+                 engine=None, pipe=None, host=None):
+        self.stride = stride
+        self.steps = 0
+        self.frames = 0  # Frames captured so far
+        self.frame = None
+        self.engine = engine or GraphicsEngine.getGlobalPtr()
+
+        # A host window lends its graphics state, so its textures aren't loaded twice
+        props = FrameBufferProperties()
+        props.setRgbColor(True)
+        props.setRgbaBits(8, 8, 8, 8)
+        self.buffer = self.engine.makeOutput(
+            pipe or make_capture_pipe(), "frame_capture", -10, props, WindowProperties.size(*size),
+            GraphicsPipe.BF_refuse_window, host.getGsg() if host else None, host
+        )
+        if self.buffer is None:
+            raise RuntimeError(f"Couldn't open a {size[0]}x{size[1]} offscreen buffer")
+        self.texture = Texture("frame_capture")
+        self.buffer.addRenderTexture(self.texture, GraphicsOutput.RTM_triggered_copy_ram)
+        self.buffer.setClearColor((0, 0, 0, 1))
+
+        # Same view and 2D render state as ShowBase's camera2d over render2d
+        if lens is None:
+            lens = OrthographicLens()
+            lens.setFilmSize(2, 2)
+            lens.setNearFar(-1000, 1000)
+        camera = Camera("frame_capture", lens)
+        camera.setInitialState(RenderState.make(
+            DepthTestAttrib.make(RenderAttrib.M_none),
+            DepthWriteAttrib.make(DepthWriteAttrib.M_off),
+            CullFaceAttrib.make(CullFaceAttrib.M_cull_none)
+        ))
+        self.camera = (camera_parent or scene).attachNewNode(camera)
+        self.buffer.makeDisplayRegion().setCamera(self.camera)
+
+        # The first frame after the buffer opens comes back blank
+        self.engine.openWindows()
+        self.capture()
+        self.frames = 0
+
+    def count_step(self):
+        """Count a simulation step, returning whether a frame is due on it"""
+        self.steps += 1
+        return self.stride > 0 and self.steps % self.stride == 0
+
+    def capture(self):
+        """Render a frame now and return it as a (height, width, 3) RGB view"""
+        self.buffer.setActive(True)
+        self.buffer.triggerCopy()
+        self.engine.renderFrame()
+        self.buffer.setActive(False)
+        self.frames += 1
+
+        # Rows come bottom up in BGRA order; flip both in the view instead of copying
+        image = np.frombuffer(self.texture.getRamImage(), dtype=np.uint8)
+        image = image.reshape(self.texture.getYSize(), self.texture.getXSize(), 4)
+        self.frame = image[::-1, :, 2::-1]
+        return self.frame
+
+    def cleanup(self):
+        """Close the buffer"""
+        self.frame = None
+        self.engine.removeWindow(self.buffer)
+        self.camera.removeNode()
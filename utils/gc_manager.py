@@ -0,0 +1,101 @@
+import gc
+import time
+from utils.debug import out
+
+class GCManager:
+    """Keeps cyclic garbage collection pauses out of gameplay frames
+
+    Everything alive after loading is frozen so collections never scan it. In
+    safe-point mode automatic collection is off while playing, and the young
+    objects are collected when play stops instead: pausing, game over and
+    area transitions. A young generation grown past young_limit is still
+    collected mid-play so memory can't run away.
+    """
+
+    def __init__(self, safe_points=True, young_limit=10000):
+        self.safe_points = safe_points
+        self.young_limit = young_limit
+        self.idle = True  # Whether the last safe point has been collected
+
+        # Every collection is timed, whoever started it
+        self.collections = 0
+        self.forced = 0  # Young collections run mid-play because young_limit was reached
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.generation_counts = [0, 0, 0]
+        self.collection_start = 0.0
+        gc.callbacks.append(self.on_gc)
+
+    def on_gc(self, phase, info):
+        """Time each garbage collection"""
+        if phase == "start":
+            self.collection_start = time.perf_counter()
+            return
+        ms = (time.perf_counter() - self.collection_start) * 1000
+        self.collections += 1
+        self.generation_counts[info["generation"]] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def start(self):
+        """Freeze the freshly loaded objects and hand collection over to safe points"""
+        gc.collect()
+        gc.freeze()
+        if self.safe_points:
+            gc.disable()
+        out(f"Froze {gc.get_freeze_count()} objects after loading"
+            + (", collecting at safe points" if self.safe_points else ""), 2)
+
+    def update(self, idle_reason=None):
+        """Collect at the first idle frame, or if play has built up too many young objects
+
+        idle_reason names why play has stopped, or is None while playing.
+        """
+        if not self.safe_points:
+            return
+        if idle_reason is None:
+            self.idle = False
+            if gc.get_count()[0] > self.young_limit:
+                self.forced += 1
+                gc.collect(0)
+        elif not self.idle:
+            self.idle = True
+            self.collect(idle_reason)
+
+    def collect(self, reason, refreeze=False):
+        """Run a full collection now, optionally freezing what survives as long-lived"""
+        if refreeze:
+            # Let the previous long-lived objects be scanned again, since
+            # restarts and transitions replace many of them
+            gc.unfreeze()
+        start = time.perf_counter()
+        collected = gc.collect()
+        if refreeze:
+            gc.freeze()
+        out(f"GC at {reason}: {collected} objects collected in {(time.perf_counter() - start) * 1000:.2f} ms", 1)
+
+    def get_stats(self):
+        """Get collection counts and pause times so far"""
+        return {
+            "collections": self.collections,
+            "forced": self.forced,
+            "generations": list(self.generation_counts),
+            "total_ms": self.total_ms,
+            "max_ms": self.max_ms,
+            "frozen": gc.get_freeze_count(),
+        }
+
+    def report(self):
+        """Log collection counts and pause times"""
+        stats = self.get_stats()
+        young, middle, old = stats["generations"]
+        out(f"GC: {stats['collections']} collections (gen0 {young}, gen1 {middle}, gen2 {old}, "
+            f"{stats['forced']} forced mid-play), {stats['total_ms']:.1f} ms total, "
+            f"longest {stats['max_ms']:.2f} ms, {stats['frozen']} objects frozen", 2)
+
+    def stop(self):
+        """Give collection back to Python"""
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        gc.unfreeze()
+        gc.enable()
@@ -0,0 +1,117 @@
+import time
+from panda3d.core import ClockObject, InputDevice
+from utils.debug import out
+
+class IdleMode:
+    """Throttles the game while nothing is happening on screen
+
+    When the game is paused or over, or the player has left the town alone,
+    the simulation task is suspended and the frame rate capped at a low rate.
+    Any button press or stick movement brings both back on the next frame.
+    """
+
+    def __init__(self, game, frame_rate):
+        self.game = game
+        self.frame_rate = frame_rate
+        self.enabled = frame_rate > 0
+        self.idle = False
+        self.pause_delay = 0.5   # Seconds a pause or game over screen is up before idling
+        self.town_delay = 10.0   # Seconds without input in town before idling
+        self.stick_deadzone = 0.2
+        self.last_input = time.time()
+        self.stopped_at = None  # When the game was last paused or ended
+        self.clock = ClockObject.getGlobalClock()
+        self.normal_mode = self.clock.getMode()
+        self.idle_seconds = 0.0  # Time spent idle this session
+        self.idle_start = 0.0
+
+        # Every keyboard and gamepad button press also sends one shared event
+        for thrower in (game.buttonThrowers or []) + game.deviceButtonThrowers:
+            thrower.node().setButtonDownEvent("idle-input")
+        game.accept("idle-input", self.wake)
+
+        # Runs before the game update so a wake-up is simulated the same frame
+        game.taskMgr.add(self.update, "idleMode", sort=-1)
+
+    def wake(self, button=None):
+        """Note input and leave idle mode at once"""
+        self.last_input = time.time()
+        if self.idle:
+            self.exit()
+
+    def has_held_input(self):
+        """Check for input that sends no events while held: movement keys and sticks"""
+        world = self.game.world
+        if any(world.player_system.keys.values()):
+            return True
+        gamepad = world.gamepad
+        if gamepad:
+            for axis in (InputDevice.Axis.left_x, InputDevice.Axis.left_y,
+                         InputDevice.Axis.right_x, InputDevice.Axis.right_y):
+                if abs(gamepad.findAxis(axis).value) > self.stick_deadzone:
+                    return True
+        return False
+
+    def should_idle(self):
+        """Check whether the game has nothing to simulate and nobody is playing"""
+        world = self.game.world
+        # Unpausable timelines (the boss death sequence) keep running while paused
+        if any(not timeline.pausable for timeline in world.timeline_system.active):
+            return False
+        if self.has_held_input():
+            self.last_input = time.time()
+            return False
+        now = time.time()
+        if world.paused or world.game_over:
+            # Give the pause or game over screen a moment, and the game time to
+            # reach its safe point collection, before idling
+            if self.stopped_at is None:
+                self.stopped_at = now
+            return now - max(self.last_input, self.stopped_at) >= self.pause_delay
+        self.stopped_at = None
+        return world.in_town and now - self.last_input >= self.town_delay
+
+    def update(self, task):
+        """Enter or leave idle mode as the game state changes"""
+        if not self.enabled:
+            if self.idle:
+                self.exit()
+            return task.cont
+
+        idle = self.should_idle()
+        if idle and not self.idle:
+            self.enter()
+        elif not idle and self.idle:
+            self.exit()
+        return task.cont
+
+    def enter(self):
+        """Suspend the simulation and cap the frame rate"""
+        self.idle = True
+        self.idle_start = time.time()
+        self.game.taskMgr.remove("gameUpdate")
+        self.normal_mode = self.clock.getMode()
+        self.clock.setMode(ClockObject.MLimited)
+        self.clock.setFrameRate(self.frame_rate)
+        # Show the idle state on the metrics endpoint at once
+        if self.game.metrics:
+            self.game.publish_metrics()
+        out(f"Idle: simulation suspended, rendering at {self.frame_rate:g} fps", 1)
+
+    def exit(self):
+        """Resume the simulation at the full frame rate"""
+        self.idle = False
+        self.idle_seconds += time.time() - self.idle_start
+        self.clock.setMode(self.normal_mode)
+        # The suspended time isn't a frame; start timing again from now
+        self.game.last_time_update = time.time()
+        self.game.taskMgr.add(self.game.update, "gameUpdate")
+        out("Idle: simulation resumed", 1)
+
+    def cleanup(self):
+        """Restore the frame rate and stop watching for idleness"""
+        if self.idle:
+            self.idle = False
+            self.clock.setMode(self.normal_mode)
+        self.game.taskMgr.remove("idleMode")
+        self.game.ignore("idle-input")
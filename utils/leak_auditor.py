@@ -0,0 +1,90 @@
+import gc
+import re
+from collections import Counter, deque
+from panda3d.core import TexturePool
+from utils.debug import out
+
+def node_kind(name):
+    """Strip trailing ids from a node name so numbered copies count together"""
+    return re.sub(r'[_\d]+$', '', name) or name
+
+class LeakAuditor:
+    """Samples live resource counts at checkpoints and flags counts that keep growing
+
+    Checkpoints are taken where the game should return to a known state, such
+    as restarts and area transitions, so anything that grows at every one of
+    them is being left behind.
+    """
+
+    def __init__(self, game, window=3):
+        self.game = game
+        self.window = window  # Consecutive increases before a count is flagged
+        self.samples = deque(maxlen=window + 1)  # Counts at the checkpoints being compared
+        self.flagged = {}     # key -> counts over the growth run
+
+    def sample(self):
+        """Count scene-graph nodes, sprites, textures, tasks, event hooks and Python objects"""
+        game = self.game
+        counts = Counter()
+
+        # Scene-graph nodes under render2d, grouped by name
+        for node_path in game.render2d.findAllMatches("**"):
+            counts["node:" + node_kind(node_path.getName())] += 1
+
+        # Batched sprites never become nodes, so count them from the batcher and pool
+        counts["sprites:alive"] = int(game.world.sprite_batcher.alive.sum())
+        for kind, stats in game.world.sprite_pool.get_stats().items():
+            counts["pool:" + kind] = stats["in_use"] + stats["free"]
+
+        # Textures in the pool or applied in the 2D scene, with their memory
+        textures = {texture for texture in TexturePool.findAllTextures()}
+        textures.update(game.render2d.findAllTextures())
+        counts["textures"] = len(textures)
+        counts["texture_bytes"] = sum(texture.estimateTextureMemory() for texture in textures)
+
+        counts["tasks"] = len(game.taskMgr.getAllTasks())
+        counts["event_hooks"] = sum(len(game.messenger.whoAccepts(event) or ())
+                                    for event in game.messenger.getEvents())
+
+        # Python objects per type, leaving out the auditor's own records
+        own = {id(self.samples), id(self.flagged)}
+        own.update(id(counts) for counts in self.samples)
+        own.update(id(series) for series in self.flagged.values())
+        # Frozen objects aren't listed, so unfreeze for the count; checkpoints
+        # are safe points, where freezing everything again is harmless
+        frozen = gc.get_freeze_count()
+        if frozen:
+            gc.unfreeze()
+        objects = gc.get_objects()
+        if frozen:
+            gc.freeze()
+        for obj in objects:
+            if id(obj) not in own:
+                counts["py:" + type(obj).__name__] += 1
+        return counts
+
+    def checkpoint(self, label):
+        """Record a sample and log any counts that grew at each of the last few checkpoints"""
+        self.samples.append(dict(self.sample()))
+        if len(self.samples) <= self.window:
+            out(f"Leak audit '{label}': baseline {len(self.samples)}/{self.window + 1}", 2)
+            return []
+
+        recent = list(self.samples)
+        growing = []
+        for key in recent[-1]:
+            series = [counts.get(key, 0) for counts in recent]
+            if all(later > earlier for earlier, later in zip(series, series[1:])):
+                growing.append(key)
+                self.flagged[key] = series
+
+        for key in sorted(growing, key=lambda key: self.flagged[key][-1] - self.flagged[key][0], reverse=True):
+            series = self.flagged[key]
+            out(f"Leak audit '{label}': {key} grew at {self.window} checkpoints in a row: "
+                f"{' -> '.join(str(value) for value in series)}", 3)
+        return growing
+
+    def report(self):
+        """Log every count that has been flagged this session"""
+        for key, series in self.flagged.items():
+            out(f"Leak audit: {key} {' -> '.join(str(value) for value in series)}", 3)
\ No newline at end of file
@@ -0,0 +1,129 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from utils.debug import out
+
+# Upper bounds of the frame time histogram buckets, in milliseconds
+FRAME_BUCKETS_MS = [4.0, 8.33, 11.1, 16.7, 20.0, 25.0, 33.3, 50.0, 100.0, 250.0]
+QUANTILES = [0.5, 0.9, 0.99]
+PREFIX = "castle_"
+
+class PerformanceMetrics:
+    """Frame timings collected on the main thread and published as snapshots for the metrics server
+
+    Frames are recorded as they are simulated, while snapshots are published
+    on their own schedule, so the endpoint stays current even when no frames
+    are being simulated. The server thread only ever reads the latest
+    published snapshot, so it never touches the game or Panda3D.
+    """
+
+    def __init__(self, window=600, publish_interval=0.25):
+        self.publish_interval = publish_interval
+        self.recent = np.zeros(window, dtype=np.float64)  # Ring of recent frame times
+        self.recent_count = 0
+        self.bucket_counts = [0] * (len(FRAME_BUCKETS_MS) + 1)
+        self.frame_count = 0
+        self.frame_sum_ms = 0.0
+        self.section_sums = {}
+        self.section_frames = 0
+
+        self.lock = threading.Lock()
+        self.snapshot = None
+
+    def record_frame(self, frame_ms, sections):
+        """Add one frame's time and section timings"""
+        self.recent[self.recent_count % len(self.recent)] = frame_ms
+        self.recent_count += 1
+        self.bucket_counts[bisect.bisect_left(FRAME_BUCKETS_MS, frame_ms)] += 1
+        self.frame_count += 1
+        self.frame_sum_ms += frame_ms
+        for name, ms in sections.items():
+            self.section_sums[name] = self.section_sums.get(name, 0.0) + ms
+        self.section_frames += 1
+
+    def publish(self, gauges):
+        """Freeze the current values and the given gauges into the snapshot the server reads"""
+        recent = self.recent[:min(self.recent_count, len(self.recent))]
+        snapshot = {
+            "buckets": list(self.bucket_counts),
+            "frame_count": self.frame_count,
+            "frame_sum_ms": self.frame_sum_ms,
+            "quantiles": np.quantile(recent, QUANTILES).tolist() if len(recent) else [],
+            # Mean time per frame since the last snapshot
+            "sections": {name: total / self.section_frames for name, total in self.section_sums.items()},
+            "gauges": gauges,
+        }
+        self.section_sums = {}
+        self.section_frames = 0
+        with self.lock:
+            self.snapshot = snapshot
+
+    def render(self):
+        """Format the latest snapshot in the Prometheus text exposition format"""
+        with self.lock:
+            snapshot = self.snapshot
+        if snapshot is None:
+            return ""
+
+        lines = [f"# HELP {PREFIX}frame_time_ms Time between frames in milliseconds",
+                 f"# TYPE {PREFIX}frame_time_ms histogram"]
+        cumulative = 0
+        for bound, count in zip(FRAME_BUCKETS_MS + ["+Inf"], snapshot["buckets"]):
+            cumulative += count
+            lines.append(f'{PREFIX}frame_time_ms_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{PREFIX}frame_time_ms_sum {snapshot['frame_sum_ms']:.3f}")
+        lines.append(f"{PREFIX}frame_time_ms_count {snapshot['frame_count']}")
+
+        if snapshot["quantiles"]:
+            lines += [f"# HELP {PREFIX}recent_frame_time_ms Frame time quantiles over the last {len(self.recent)} frames",
+                      f"# TYPE {PREFIX}recent_frame_time_ms summary"]
+            for quantile, value in zip(QUANTILES, snapshot["quantiles"]):
+                lines.append(f'{PREFIX}recent_frame_time_ms{{quantile="{quantile}"}} {value:.3f}')
+
+        lines += [f"# HELP {PREFIX}section_time_ms Mean time per frame spent in each update section",
+                  f"# TYPE {PREFIX}section_time_ms gauge"]
+        for name, ms in snapshot["sections"].items():
+            lines.append(f'{PREFIX}section_time_ms{{section="{name}"}} {ms:.4f}')
+
+        # Gauges are (metric name, labels, value, help), with counters named *_total;
+        # one HELP/TYPE per name
+        described = set()
+        for name, labels, value, help_text in snapshot["gauges"]:
+            if name not in described:
+                described.add(name)
+                metric_type = "counter" if name.endswith("_total") else "gauge"
+                lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {metric_type}"]
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+            lines.append(f"{PREFIX}{name}{{{label_text}}} {value}" if label_text else f"{PREFIX}{name} {value}")
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """Serves PerformanceMetrics at /metrics on localhost from a background thread"""
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = metrics.render().encode()
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        out(f"Serving metrics at http://{host}:{self.server.server_port}/metrics", 3)
+
+    def shutdown(self):
+        """Stop serving"""
+        self.server.shutdown()
+        self.server.server_close()
\ No newline at end of file
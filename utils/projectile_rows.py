@@ -0,0 +1,44 @@
+import numpy as np
+
+class ProjectileRows:
+    """Live CPU projectiles: their sprites, and sprite slots and unit directions in preallocated rows
+
+    Rows are packed into [0, count), so moving every projectile reads array
+    slices instead of building new arrays each frame. Removing a row moves
+    the last one into it, so remove several in descending row order.
+    """
+
+    def __init__(self, capacity=64):
+        self.sprites = []
+        self.slots = np.zeros(capacity, dtype=np.intp)
+        self.directions = np.zeros((capacity, 2), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def add(self, sprite, direction_x, direction_y):
+        """Add a projectile's sprite moving in a unit direction"""
+        row = len(self.sprites)
+        if row == len(self.slots):
+            self.slots = np.concatenate([self.slots, np.zeros_like(self.slots)])
+            self.directions = np.concatenate([self.directions, np.zeros_like(self.directions)])
+        self.slots[row] = sprite.index
+        self.directions[row, 0] = direction_x
+        self.directions[row, 1] = direction_y
+        self.sprites.append(sprite)
+
+    def remove(self, row):
+        """Remove a row, returning its sprite"""
+        sprite = self.sprites[row]
+        last = len(self.sprites) - 1
+        if row != last:
+            self.sprites[row] = self.sprites[last]
+            self.slots[row] = self.slots[last]
+            self.directions[row] = self.directions[last]
+        self.sprites.pop()
+        return sprite
+
+    def clear(self):
+        """Remove every row, returning their sprites"""
+        sprites, self.sprites = self.sprites, []
+        return sprites
@@ -1,14 +1,19 @@
 import os
 import sys
+import json
 from pathlib import Path
-from panda3d.core import loadPrcFileData
+from panda3d.core import loadPrcFileData, TexturePool, TransparencyAttrib
 from utils.debug import out
 
+COOKED_DIR = "cooked"
+MANIFEST_NAME = "manifest.json"
+
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
     # Define common file extensions
     image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp'}
     sound_extensions = {'.mp3', '.wav', '.ogg', '.flac', '.m4a', '.aac'}
+    cooked_extensions = {'.txo', '.bam', '.json'}
     
     try:
         base_path = sys._MEIPASS
@@ -24,6 +29,8 @@ def get_resource_path(relative_path):
         relative_path = Path("images") / path_obj
     elif extension in sound_extensions:
         relative_path = Path("sounds") / path_obj
+    elif extension in cooked_extensions:
+        relative_path = Path(COOKED_DIR) / path_obj
     
     # Convert to Path object and resolve
     full_path = Path(base_path) / relative_path
@@ -42,6 +49,46 @@ def get_resource_path(relative_path):
     
     return unix_path
 
+_manifest = None
+
+def get_cooked_manifest():
+    """Load the cooked asset manifest written by cook_assets.py"""
+    global _manifest
+    if _manifest is None:
+        _manifest = {}
+        manifest_path = get_resource_path(MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r') as f:
+                    _manifest = json.load(f).get("assets", {})
+            except (OSError, ValueError) as e:
+                out(f"Error reading cooked manifest: {e}", 2)
+    return _manifest
+
+def load_cooked_texture(name):
+    """Load the cooked .txo for an asset name, or None if it was never cooked"""
+    entry = get_cooked_manifest().get(name)
+    if not entry:
+        return None
+    cooked_path = get_resource_path(entry["output"])
+    if not os.path.exists(cooked_path):
+        return None
+    return TexturePool.loadTexture(cooked_path)
+
+def load_texture(name):
+    """Load an image texture, preferring its cooked copy over the source file"""
+    texture = load_cooked_texture(name)
+    if texture is None:
+        texture = TexturePool.loadTexture(get_resource_path(name))
+    return texture
+
+def get_transparency_mode(name):
+    """Get the transparency mode matching how an asset was cooked"""
+    entry = get_cooked_manifest().get(name)
+    if entry and entry.get("premultiplied"):
+        return TransparencyAttrib.MPremultipliedAlpha
+    return TransparencyAttrib.MAlpha
+
 # Add audio configuration
 loadPrcFileData('', 'audio-library-name p3openal_audio')
 loadPrcFileData('', 'win-size 1920 1080')
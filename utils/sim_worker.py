@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+
+class SimulationWorker:
+    """Background thread running one pure-data simulation job at a time
+
+    Jobs read the arrays they are given, write only scratch space of their
+    own, and return new arrays. The main thread applies the results, so the
+    scene graph is never touched off it.
+    """
+
+    def __init__(self, name):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self.job = None
+
+    def submit(self, function, *args):
+        """Start a job; the previous one must have been collected"""
+        self.job = self.executor.submit(function, *args)
+
+    def collect(self):
+        """Wait for the job in flight and return its result, or None if there is none"""
+        if self.job is None:
+            return None
+        job, self.job = self.job, None
+        return job.result()
+
+    def discard(self):
+        """Wait for the job in flight and drop its result"""
+        self.collect()
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Offsets of a cell and its eight neighbours
+NEIGHBOR_OFFSETS = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+
+class SpatialGrid:
+    """Uniform grid bucketing of points, rebuilt once per tick for neighbour queries
+
+    With cells at least as large as the query radius, every neighbour of a
+    point lies in its own or an adjacent cell, so the number of candidate
+    pairs grows with the point count rather than its square. Points can be
+    split into layers that share the bounds but never neighbour each other.
+    """
+
+    def __init__(self, bounds, cell_size):
+        self.bounds = bounds  # (min_x, max_x, min_y, max_y); points outside are clamped to the edge cells
+        self.set_cell_size(cell_size)
+        self.count = 0
+
+    def set_cell_size(self, cell_size):
+        """Resize the grid cells, keeping the covered bounds"""
+        min_x, max_x, min_y, max_y = self.bounds
+        self.cell_size = cell_size
+        self.columns = max(1, int(np.ceil((max_x - min_x) / cell_size)))
+        self.rows = max(1, int(np.ceil((max_y - min_y) / cell_size)))
+
+    def rebuild(self, positions, layers=None):
+        """Bucket an (n, 2) array of positions into cells, optionally in separate layers"""
+        self.count = len(positions)
+        self.cell_x = np.clip(((positions[:, 0] - self.bounds[0]) / self.cell_size).astype(np.intp),
+                              0, self.columns - 1)
+        self.cell_y = np.clip(((positions[:, 1] - self.bounds[2]) / self.cell_size).astype(np.intp),
+                              0, self.rows - 1)
+        # Each layer's rows follow the previous layer's, so cells never border across layers
+        self.layer_rows = 0 if layers is None else layers * self.rows
+        layer_count = 1 if layers is None or self.count == 0 else int(layers.max()) + 1
+        keys = (self.layer_rows + self.cell_y) * self.columns + self.cell_x
+
+        # Points sorted by cell, with each cell's run given by cell_start
+        self.order = np.argsort(keys, kind='stable')
+        counts = np.bincount(keys, minlength=self.columns * self.rows * layer_count)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def neighbor_pairs(self, queries=None):
+        """Get (i, j) index arrays of every pair of distinct points in the same or adjacent cells
+
+        With queries, only pairs for those points are found and i indexes into
+        queries rather than the points.
+        """
+        if queries is None:
+            queries = np.arange(self.count)
+        local = np.arange(len(queries))
+        firsts = []
+        seconds = []
+        for dx, dy in NEIGHBOR_OFFSETS:
+            cell_x = self.cell_x[queries] + dx
+            cell_y = self.cell_y[queries] + dy
+            valid = (cell_x >= 0) & (cell_x < self.columns) & (cell_y >= 0) & (cell_y < self.rows)
+            if not np.isscalar(self.layer_rows):
+                cell_y = cell_y + self.layer_rows[queries]
+            keys = np.where(valid, cell_y * self.columns + cell_x, 0)
+            start = self.cell_start[keys]
+            run = np.where(valid, self.cell_start[keys + 1] - start, 0)
+
+            # Expand every point into one entry per point in the neighbouring cell
+            total = int(run.sum())
+            if total == 0:
+                continue
+            first = np.repeat(local, run)
+            within = np.arange(total) - np.repeat(np.cumsum(run) - run, run)
+            firsts.append(first)
+            seconds.append(self.order[np.repeat(start, run) + within])
+
+        if not firsts:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        first = np.concatenate(firsts)
+        second = np.concatenate(seconds)
+        distinct = queries[first] != second
+        return first[distinct], second[distinct]
\ No newline at end of file
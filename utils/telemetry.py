@@ -0,0 +1,125 @@
+import gc
+import json
+import time
+import atexit
+import struct
+import numpy as np
+from utils.tracer import tracer
+
+# File layout: MAGIC, header length (uint32), JSON header naming the columns
+# and their dtypes, then blocks of (row count (uint32), each column's raw values)
+MAGIC = b"TLM1"
+
+class FrameTimer:
+    """Times consecutive sections of a frame"""
+
+    def __init__(self):
+        self.times = {}  # Section name -> milliseconds in the last frame
+        self.frame_start = 0.0
+        self.last = 0.0
+
+    def start(self):
+        """Begin timing a frame"""
+        self.frame_start = self.last = time.perf_counter()
+
+    def lap(self, name):
+        """Charge the time since the previous lap to a section"""
+        now = time.perf_counter()
+        self.times[name] = (now - self.last) * 1000
+        if tracer.enabled:
+            tracer.add_span(name, int(self.last * 1e6), int(now * 1e6))
+        self.last = now
+
+    def total(self):
+        """Get the milliseconds since the frame started"""
+        return (self.last - self.frame_start) * 1000
+
+class TelemetryRecorder:
+    """Per-frame metrics kept in preallocated NumPy ring buffers and flushed to disk in columnar blocks"""
+
+    def __init__(self, path, columns, capacity=1024):
+        self.path = path
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in columns]
+        self.capacity = capacity
+        self.buffers = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.columns}
+        self.row = 0
+        self.frame = 0
+
+        self.file = open(path, "wb")
+        header = json.dumps({"columns": [[name, dtype.str] for name, dtype in self.columns]}).encode()
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+        # Garbage collections are counted as they happen and charged to the frame
+        self.gc_collections = 0
+        self.gc_ms = 0.0
+        self.gc_start = 0.0
+        gc.callbacks.append(self.on_gc)
+        atexit.register(self.close)
+
+    def on_gc(self, phase, info):
+        """Time each garbage collection"""
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+        else:
+            self.gc_collections += 1
+            self.gc_ms += (time.perf_counter() - self.gc_start) * 1000
+
+    def record(self, values):
+        """Store one frame's metrics, flushing when the buffers fill"""
+        row = self.row
+        buffers = self.buffers
+        buffers["frame"][row] = self.frame
+        buffers["gc_collections"][row] = self.gc_collections
+        buffers["gc_ms"][row] = self.gc_ms
+        for name, value in values.items():
+            buffers[name][row] = value
+        self.gc_collections = 0
+        self.gc_ms = 0.0
+        self.frame += 1
+        self.row = row + 1
+        if self.row == self.capacity:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows to disk as one block"""
+        if self.row == 0 or self.file is None:
+            return
+        self.file.write(struct.pack("<I", self.row))
+        for name, _ in self.columns:
+            self.file.write(self.buffers[name][:self.row].tobytes())
+        self.file.flush()
+        self.row = 0
+
+    def close(self):
+        """Flush what is left and stop recording"""
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+
+def read_telemetry(path):
+    """Read a telemetry file into a dict of column name -> array"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a telemetry file")
+    header_length, = struct.unpack_from("<I", data, 4)
+    offset = 8 + header_length
+    columns = [(name, np.dtype(dtype)) for name, dtype in json.loads(data[8:offset])["columns"]]
+
+    blocks = {name: [] for name, _ in columns}
+    while offset + 4 <= len(data):
+        rows, = struct.unpack_from("<I", data, offset)
+        offset += 4
+        # A session that crashed mid-write leaves a partial last block
+        if offset + rows * sum(dtype.itemsize for _, dtype in columns) > len(data):
+            break
+        for name, dtype in columns:
+            size = rows * dtype.itemsize
+            blocks[name].append(np.frombuffer(data, dtype=dtype, count=rows, offset=offset))
+            offset += size
+    return {name: np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+            for (name, dtype), parts in zip(columns, blocks.values())}
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from utils.debug import out
+
+class Tracer:
+    """Keeps recent timing spans in a ring buffer and dumps them as Chrome trace events
+
+    Load a dump in chrome://tracing or ui.perfetto.dev to see which nested
+    call made a frame slow.
+    """
+
+    def __init__(self, max_events=200000):
+        self.enabled = False
+        self.window_seconds = 5.0
+        self.events = deque(maxlen=max_events)  # (name, start us, duration us, thread id)
+        self.dump_count = 0
+
+    def enable(self, window_seconds):
+        """Start recording, keeping the last window_seconds of spans for dumps"""
+        self.enabled = True
+        self.window_seconds = window_seconds
+
+    def now(self):
+        """Get the trace clock in microseconds"""
+        return time.perf_counter_ns() // 1000
+
+    def add_span(self, name, start, end):
+        """Record a finished span between two trace clock times"""
+        if self.enabled:
+            self.events.append((name, start, end - start, threading.get_ident()))
+
+    @contextmanager
+    def span(self, name):
+        """Record the time spent inside a with block"""
+        if not self.enabled:
+            yield
+            return
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, self.now())
+
+    def dump(self, reason=""):
+        """Write the last window_seconds of spans to a Chrome trace JSON file, returning its path"""
+        cutoff = self.now() - int(self.window_seconds * 1e6)
+        pid = os.getpid()
+        main_thread = threading.main_thread().ident
+        trace_events = [
+            {"name": name, "ph": "X", "ts": start, "dur": duration, "pid": pid, "tid": thread}
+            for name, start, duration, thread in list(self.events) if start >= cutoff
+        ]
+        # Label the threads so the main thread sorts first
+        for thread in {event["tid"] for event in trace_events}:
+            label = "main" if thread == main_thread else f"worker {thread}"
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread,
+                                 "args": {"name": label}})
+
+        self.dump_count += 1
+        path = f"trace_{time.strftime('%Y%m%d_%H%M%S')}_{self.dump_count}.json"
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms",
+                       "otherData": {"reason": reason}}, f)
+        out(f"Wrote {len(trace_events)} trace events to {path} ({reason})", 3)
+        return path
+
+# Shared by every module so spans from anywhere land in one timeline
+tracer = Tracer()
+
+def traced(name):
+    """Decorate a function so each call is recorded as a span"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            start = tracer.now()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.add_span(name, start, tracer.now())
+        return wrapper
+    return decorate
\ No newline at end of file